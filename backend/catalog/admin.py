@@ -0,0 +1,32 @@
+"""
+Admin configuration for Catalog app
+"""
+from django.contrib import admin
+from .models import BoughtTogether, CatalogEntry, CatalogPopularity, TrendingEntry
+
+
+@admin.register(CatalogEntry)
+class CatalogEntryAdmin(admin.ModelAdmin):
+    list_display = ['name', 'source', 'source_id', 'brand', 'category_name', 'price', 'ecoscore_grade', 'is_active', 'updated_at']
+    list_filter = ['source', 'is_active', 'in_stock', 'ecoscore_grade', 'is_eco_friendly']
+    search_fields = ['name', 'brand']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(CatalogPopularity)
+class CatalogPopularityAdmin(admin.ModelAdmin):
+    list_display = ['source', 'source_id', 'score', 'scored_at']
+    list_filter = ['source']
+    readonly_fields = ['scored_at']
+
+
+@admin.register(TrendingEntry)
+class TrendingEntryAdmin(admin.ModelAdmin):
+    list_display = ['source', 'category_slug', 'rank', 'source_id', 'score', 'computed_at']
+    list_filter = ['source', 'category_slug']
+
+
+@admin.register(BoughtTogether)
+class BoughtTogetherAdmin(admin.ModelAdmin):
+    list_display = ['source', 'source_id', 'companion_id', 'count']
+    list_filter = ['source']
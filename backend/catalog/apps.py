@@ -0,0 +1,17 @@
+"""
+Catalog app configuration
+"""
+from django.apps import AppConfig
+
+
+class CatalogConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'catalog'
+    verbose_name = 'Catalog'
+    
+    def ready(self):
+        """Import signal handlers when the app is ready"""
+        try:
+            import catalog.signals
+        except ImportError:
+            pass
@@ -0,0 +1,26 @@
+"""
+Filter backends for Catalog app
+"""
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from .services import CatalogSearchIndex
+
+
+class CatalogSearchFilter(BaseFilterBackend):
+    """
+    Drop-in replacement for SearchFilter backed by the catalog full-text index.
+    The view names its catalog with `catalog_source`; results are ranked by relevance
+    unless the request asks for an explicit ordering.
+    """
+    search_param = api_settings.SEARCH_PARAM
+    ordering_param = api_settings.ORDERING_PARAM
+    
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return CatalogSearchIndex().filter_queryset(
+            queryset, view.catalog_source, query,
+            order_by_rank=not request.query_params.get(self.ordering_param),
+        )
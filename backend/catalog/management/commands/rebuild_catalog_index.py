@@ -0,0 +1,16 @@
+"""
+Management command to rebuild the catalog read model and search index
+"""
+from django.core.management.base import BaseCommand
+from catalog.services import CatalogSearchIndex
+
+
+class Command(BaseCommand):
+    help = 'Re-index every product from the products, ecommerce and merchants apps'
+    
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding catalog index...')
+        stats = CatalogSearchIndex().rebuild()
+        for source, written in stats.items():
+            self.stdout.write(f'  {source}: {written} entries')
+        self.stdout.write(self.style.SUCCESS(f'Catalog index rebuilt with {sum(stats.values())} entries'))
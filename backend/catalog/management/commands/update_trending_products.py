@@ -0,0 +1,16 @@
+"""
+Management command to update the trending product lists; run it periodically
+"""
+from django.core.management.base import BaseCommand
+from catalog.services import TrendingService
+
+
+class Command(BaseCommand):
+    help = 'Fold recent orders, reviews and wishlist adds into decayed popularity scores and re-rank the trending lists'
+    
+    def handle(self, *args, **options):
+        self.stdout.write('Updating trending products...')
+        stats = TrendingService().update()
+        self.stdout.write(f"  Events: {stats['events']}")
+        self.stdout.write(f"  Products with a score: {stats['scored']}")
+        self.stdout.write(self.style.SUCCESS(f"Trending lists rebuilt with {stats['listed']} entries"))
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+    
+    dependencies = [
+    ]
+    
+    operations = [
+        migrations.CreateModel(
+            name='CatalogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('product', 'Product'), ('ecommerce_product', 'Ecommerce Product'), ('merchant_product', 'Merchant Product')], max_length=20)),
+                ('source_id', models.PositiveBigIntegerField()),
+                ('name', models.CharField(max_length=200)),
+                ('brand', models.CharField(blank=True, max_length=100)),
+                ('category', models.CharField(blank=True, help_text='Category and subcategory names', max_length=200)),
+                ('tags', models.TextField(blank=True)),
+                ('description', models.TextField(blank=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Catalog entries',
+                'unique_together': {('source', 'source_id')},
+            },
+        ),
+    ]
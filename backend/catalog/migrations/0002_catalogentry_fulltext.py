@@ -0,0 +1,70 @@
+from django.db import migrations
+
+COLUMNS = ['name', 'brand', 'category', 'tags', 'description']
+
+SQLITE_FORWARD = [
+    # External content table: FTS5 stores only the index and reads rows from catalog_catalogentry
+    f"""CREATE VIRTUAL TABLE catalog_catalogentry_fts USING fts5(
+        {', '.join(COLUMNS)},
+        content='catalog_catalogentry', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER catalog_catalogentry_fts_insert AFTER INSERT ON catalog_catalogentry BEGIN
+        INSERT INTO catalog_catalogentry_fts(rowid, {', '.join(COLUMNS)})
+        VALUES (new.id, {', '.join(f'new.{column}' for column in COLUMNS)});
+    END""",
+    f"""CREATE TRIGGER catalog_catalogentry_fts_delete AFTER DELETE ON catalog_catalogentry BEGIN
+        INSERT INTO catalog_catalogentry_fts(catalog_catalogentry_fts, rowid, {', '.join(COLUMNS)})
+        VALUES ('delete', old.id, {', '.join(f'old.{column}' for column in COLUMNS)});
+    END""",
+    f"""CREATE TRIGGER catalog_catalogentry_fts_update AFTER UPDATE ON catalog_catalogentry BEGIN
+        INSERT INTO catalog_catalogentry_fts(catalog_catalogentry_fts, rowid, {', '.join(COLUMNS)})
+        VALUES ('delete', old.id, {', '.join(f'old.{column}' for column in COLUMNS)});
+        INSERT INTO catalog_catalogentry_fts(rowid, {', '.join(COLUMNS)})
+        VALUES (new.id, {', '.join(f'new.{column}' for column in COLUMNS)});
+    END""",
+    "INSERT INTO catalog_catalogentry_fts(catalog_catalogentry_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS catalog_catalogentry_fts_insert',
+    'DROP TRIGGER IF EXISTS catalog_catalogentry_fts_delete',
+    'DROP TRIGGER IF EXISTS catalog_catalogentry_fts_update',
+    'DROP TABLE IF EXISTS catalog_catalogentry_fts',
+]
+
+POSTGRES_FORWARD = [
+    """ALTER TABLE catalog_catalogentry ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(brand, '') || ' ' || coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(tags, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'D')
+    ) STORED""",
+    'CREATE INDEX catalog_catalogentry_search_idx ON catalog_catalogentry USING GIN (search_vector)',
+]
+
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS catalog_catalogentry_search_idx',
+    'ALTER TABLE catalog_catalogentry DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+    
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
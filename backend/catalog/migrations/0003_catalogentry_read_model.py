@@ -0,0 +1,187 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:59
+
+from django.db import migrations, models
+
+COLUMNS = ['name', 'brand', 'category', 'tags', 'description']
+
+
+def get_triggers(update_of):
+    """FTS5 sync triggers; the update trigger fires on any column unless update_of"""
+    columns = ', '.join(COLUMNS)
+    old = ', '.join(f'old.{column}' for column in COLUMNS)
+    new = ', '.join(f'new.{column}' for column in COLUMNS)
+    update_event = f"UPDATE OF {columns}" if update_of else 'UPDATE'
+    return [
+        'DROP TRIGGER IF EXISTS catalog_catalogentry_fts_insert',
+        'DROP TRIGGER IF EXISTS catalog_catalogentry_fts_delete',
+        'DROP TRIGGER IF EXISTS catalog_catalogentry_fts_update',
+        f"""CREATE TRIGGER catalog_catalogentry_fts_insert AFTER INSERT ON catalog_catalogentry BEGIN
+            INSERT INTO catalog_catalogentry_fts(rowid, {columns}) VALUES (new.id, {new});
+        END""",
+        f"""CREATE TRIGGER catalog_catalogentry_fts_delete AFTER DELETE ON catalog_catalogentry BEGIN
+            INSERT INTO catalog_catalogentry_fts(catalog_catalogentry_fts, rowid, {columns})
+            VALUES ('delete', old.id, {old});
+        END""",
+        f"""CREATE TRIGGER catalog_catalogentry_fts_update AFTER {update_event} ON catalog_catalogentry BEGIN
+            INSERT INTO catalog_catalogentry_fts(catalog_catalogentry_fts, rowid, {columns})
+            VALUES ('delete', old.id, {old});
+            INSERT INTO catalog_catalogentry_fts(rowid, {columns}) VALUES (new.id, {new});
+        END""",
+    ]
+
+
+def create_triggers(update_of):
+    # SQLite rebuilds the table to add columns, which drops its triggers
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor == 'sqlite':
+            for statement in get_triggers(update_of):
+                schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_catalogentry_fulltext'),
+    ]
+    
+    operations = [
+        # Restores the original triggers when unapplied, after the columns are dropped
+        migrations.RunPython(migrations.RunPython.noop, create_triggers(update_of=False)),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='brand_slug',
+            field=models.SlugField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='category_name',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='category_slug',
+            field=models.SlugField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='ecoscore_grade',
+            field=models.CharField(blank=True, max_length=1),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='ecoscore_value',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='image_url',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='in_stock',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='is_biodegradable',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='is_eco_friendly',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='is_featured',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='is_organic',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='is_plastic_free',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='is_recyclable',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='listed_at',
+            field=models.DateTimeField(blank=True, help_text='When the product was created', null=True),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='original_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='rating_average',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='slug',
+            field=models.SlugField(blank=True, help_text='Product slug, blank for merchant products', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='stock_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='subcategory_name',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='catalogentry',
+            name='subcategory_slug',
+            field=models.SlugField(blank=True, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='catalogentry',
+            index=models.Index(fields=['is_active', 'category_slug', 'subcategory_slug'], name='catalog_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogentry',
+            index=models.Index(fields=['is_active', 'brand_slug'], name='catalog_brand_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogentry',
+            index=models.Index(fields=['is_active', 'price'], name='catalog_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogentry',
+            index=models.Index(fields=['is_active', 'ecoscore_value'], name='catalog_ecoscore_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogentry',
+            index=models.Index(fields=['is_active', 'rating_average'], name='catalog_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogentry',
+            index=models.Index(fields=['is_active', 'listed_at'], name='catalog_listed_idx'),
+        ),
+        # Only changes to the indexed text need to touch the full-text index
+        migrations.RunPython(create_triggers(update_of=True), migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:03
+
+from importlib import import_module
+
+from django.db import migrations, models
+import django.utils.timezone
+
+# Altering the column rebuilds the table on SQLite, dropping the full-text triggers again
+create_triggers = import_module('catalog.migrations.0003_catalogentry_read_model').create_triggers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_catalogentry_read_model'),
+    ]
+    
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, create_triggers(update_of=True)),
+        migrations.AlterField(
+            model_name='catalogentry',
+            name='listed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='When the product was created'),
+        ),
+        migrations.RunPython(create_triggers(update_of=True), migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_catalogentry_listed_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='catalogentry',
+            index=models.Index(fields=['updated_at'], name='catalog_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_catalogentry_updated_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('product', 'Product'), ('ecommerce_product', 'Ecommerce Product'), ('merchant_product', 'Merchant Product')], max_length=20)),
+                ('category_slug', models.SlugField(blank=True, help_text='Blank for the list of the whole source', max_length=100)),
+                ('rank', models.PositiveIntegerField()),
+                ('source_id', models.PositiveBigIntegerField()),
+                ('score', models.FloatField()),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'Trending entries',
+                'ordering': ['source', 'category_slug', 'rank'],
+                'indexes': [models.Index(fields=['source', 'category_slug', 'rank'], name='catalog_trending_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CatalogPopularity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('product', 'Product'), ('ecommerce_product', 'Ecommerce Product'), ('merchant_product', 'Merchant Product')], max_length=20)),
+                ('source_id', models.PositiveBigIntegerField()),
+                ('score', models.FloatField(default=0.0)),
+                ('scored_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'Catalog popularity',
+                'indexes': [models.Index(fields=['score'], name='catalog_popularity_idx')],
+                'unique_together': {('source', 'source_id')},
+            },
+        ),
+    ]
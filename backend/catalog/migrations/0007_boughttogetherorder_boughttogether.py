@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0006_trendingentry_catalogpopularity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoughtTogetherOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('product', 'Product'), ('ecommerce_product', 'Ecommerce Product'), ('merchant_product', 'Merchant Product')], help_text="Catalog the order's products belong to", max_length=20)),
+                ('order_id', models.PositiveBigIntegerField()),
+            ],
+            options={
+                'unique_together': {('source', 'order_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='BoughtTogether',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('product', 'Product'), ('ecommerce_product', 'Ecommerce Product'), ('merchant_product', 'Merchant Product')], max_length=20)),
+                ('source_id', models.PositiveBigIntegerField()),
+                ('companion_id', models.PositiveBigIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Bought together',
+                'indexes': [models.Index(fields=['source', 'source_id', '-count'], name='catalog_bought_together_idx'), models.Index(fields=['source', 'companion_id'], name='catalog_bought_companion_idx')],
+                'unique_together': {('source', 'source_id', 'companion_id')},
+            },
+        ),
+    ]
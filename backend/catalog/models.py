@@ -0,0 +1,155 @@
+from django.db import models
+from django.utils import timezone
+
+
+class CatalogEntry(models.Model):
+    """
+    Denormalized read model of a product from any of the catalog apps, kept in sync by signals.
+    Serves cross-catalog browsing in one query; the full-text index over its text columns
+    is maintained by the database (see migration 0002).
+    """
+    SOURCES = [
+        ('product', 'Product'),
+        ('ecommerce_product', 'Ecommerce Product'),
+        ('merchant_product', 'Merchant Product'),
+    ]
+    
+    source = models.CharField(max_length=20, choices=SOURCES)
+    source_id = models.PositiveBigIntegerField()
+    
+    # Indexed text
+    name = models.CharField(max_length=200)
+    brand = models.CharField(max_length=100, blank=True)
+    category = models.CharField(max_length=200, blank=True, help_text="Category and subcategory names")
+    tags = models.TextField(blank=True)
+    description = models.TextField(blank=True)
+    
+    # Normalized category and brand
+    category_name = models.CharField(max_length=100, blank=True)
+    subcategory_name = models.CharField(max_length=100, blank=True)
+    category_slug = models.SlugField(max_length=100, blank=True)
+    subcategory_slug = models.SlugField(max_length=100, blank=True)
+    brand_slug = models.SlugField(max_length=100, blank=True)
+    slug = models.SlugField(max_length=200, blank=True, help_text="Product slug, blank for merchant products")
+    
+    # Pricing and inventory
+    price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    original_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    stock_quantity = models.PositiveIntegerField(default=0)
+    in_stock = models.BooleanField(default=True)
+    
+    # Eco attributes
+    is_eco_friendly = models.BooleanField(default=False)
+    is_organic = models.BooleanField(default=False)
+    is_biodegradable = models.BooleanField(default=False)
+    is_recyclable = models.BooleanField(default=False)
+    is_plastic_free = models.BooleanField(default=False)
+    ecoscore_value = models.FloatField(blank=True, null=True)
+    ecoscore_grade = models.CharField(max_length=1, blank=True)
+    
+    # Reviews
+    rating_average = models.FloatField(default=0.0)
+    rating_count = models.PositiveIntegerField(default=0)
+    
+    image_url = models.CharField(max_length=500, blank=True)
+    is_featured = models.BooleanField(default=False)
+    is_active = models.BooleanField(default=True)
+    listed_at = models.DateTimeField(default=timezone.now, help_text="When the product was created")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['source', 'source_id']
+        verbose_name_plural = 'Catalog entries'
+        indexes = [
+            models.Index(fields=['is_active', 'category_slug', 'subcategory_slug'], name='catalog_category_idx'),
+            models.Index(fields=['is_active', 'brand_slug'], name='catalog_brand_idx'),
+            models.Index(fields=['is_active', 'price'], name='catalog_price_idx'),
+            models.Index(fields=['is_active', 'ecoscore_value'], name='catalog_ecoscore_idx'),
+            models.Index(fields=['is_active', 'rating_average'], name='catalog_rating_idx'),
+            models.Index(fields=['is_active', 'listed_at'], name='catalog_listed_idx'),
+            # Catalog change fingerprints read the latest update
+            models.Index(fields=['updated_at'], name='catalog_updated_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_source_display()} {self.source_id} - {self.name}"
+
+
+class CatalogPopularity(models.Model):
+    """
+    Time-decayed popularity of a catalog product from its orders, reviews and wishlist adds,
+    maintained by TrendingService
+    """
+    source = models.CharField(max_length=20, choices=CatalogEntry.SOURCES)
+    source_id = models.PositiveBigIntegerField()
+    score = models.FloatField(default=0.0)
+    # End of the last event window folded into the score, the instant the score is decayed to
+    scored_at = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ['source', 'source_id']
+        verbose_name_plural = 'Catalog popularity'
+        indexes = [
+            models.Index(fields=['score'], name='catalog_popularity_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.source} {self.source_id} - {self.score:.3f}"
+
+
+class TrendingEntry(models.Model):
+    """
+    A product's place in a precomputed trending list of its source, per category or across all of them
+    """
+    source = models.CharField(max_length=20, choices=CatalogEntry.SOURCES)
+    category_slug = models.SlugField(max_length=100, blank=True, help_text="Blank for the list of the whole source")
+    rank = models.PositiveIntegerField()
+    source_id = models.PositiveBigIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['source', 'category_slug', 'rank']
+        verbose_name_plural = 'Trending entries'
+        indexes = [
+            models.Index(fields=['source', 'category_slug', 'rank'], name='catalog_trending_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.source} {self.category_slug or 'all'} #{self.rank}: {self.source_id}"
+
+
+class BoughtTogether(models.Model):
+    """
+    Number of confirmed orders that contained both a product and a companion, stored for each direction.
+    Only the most frequent companions of each product are kept (see BoughtTogetherService).
+    """
+    source = models.CharField(max_length=20, choices=CatalogEntry.SOURCES)
+    source_id = models.PositiveBigIntegerField()
+    companion_id = models.PositiveBigIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['source', 'source_id', 'companion_id']
+        verbose_name_plural = 'Bought together'
+        indexes = [
+            models.Index(fields=['source', 'source_id', '-count'], name='catalog_bought_together_idx'),
+            models.Index(fields=['source', 'companion_id'], name='catalog_bought_companion_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.source} {self.source_id} + {self.companion_id}: {self.count}"
+
+
+class BoughtTogetherOrder(models.Model):
+    """
+    An order whose basket has been counted in BoughtTogether, so later saves do not count it again
+    """
+    source = models.CharField(max_length=20, choices=CatalogEntry.SOURCES, help_text="Catalog the order's products belong to")
+    order_id = models.PositiveBigIntegerField()
+    
+    class Meta:
+        unique_together = ['source', 'order_id']
+    
+    def __str__(self):
+        return f"{self.source} order {self.order_id}"
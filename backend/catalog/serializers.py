@@ -0,0 +1,20 @@
+"""
+Serializers for Catalog app
+"""
+from rest_framework import serializers
+from .models import CatalogEntry
+
+
+class CatalogEntrySerializer(serializers.ModelSerializer):
+    """Serializer for catalog search results and cross-catalog listings"""
+    
+    class Meta:
+        model = CatalogEntry
+        fields = [
+            'id', 'source', 'source_id', 'name', 'slug', 'brand', 'brand_slug', 'category',
+            'category_name', 'category_slug', 'subcategory_name', 'subcategory_slug',
+            'price', 'original_price', 'stock_quantity', 'in_stock',
+            'is_eco_friendly', 'is_organic', 'is_biodegradable', 'is_recyclable', 'is_plastic_free',
+            'ecoscore_value', 'ecoscore_grade', 'rating_average', 'rating_count',
+            'image_url', 'is_featured', 'is_active', 'listed_at'
+        ]
@@ -0,0 +1,1016 @@
+"""
+Services for the unified product catalog
+"""
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from itertools import permutations
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, Count, F, IntegerField, Max, Q, Sum, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.text import slugify
+
+from ecoswitch_backend.response_cache import bump_version, get_versions
+from .models import BoughtTogether, BoughtTogetherOrder, CatalogEntry, CatalogPopularity, TrendingEntry
+from products.models import Product, ProductReview
+from ecommerce.models import (
+    Product as EcommerceProduct, ProductReview as EcommerceProductReview
+)
+from merchants.models import MerchantOrder, MerchantProduct, OrderItem as MerchantOrderItem
+from customers.models import CustomerOrder, CustomerWishlist, OrderItem as CustomerOrderItem
+from ecoscore.services import EcoScoreCalculationService, OrderEcoImpactService
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogSearchIndex:
+    """
+    Maintains the catalog read model and the full-text product search shared by every product listing.
+    SQLite uses an FTS5 table kept in sync by triggers, Postgres a generated tsvector column with a GIN index.
+    """
+    
+    FTS_TABLE = 'catalog_catalogentry_fts'
+    # bm25 column weights for name, brand, category, tags and description, in FTS5 column order
+    FTS_WEIGHTS = (10.0, 5.0, 3.0, 3.0, 1.0)
+    MAX_TERMS = 8
+    # Relevance ranking stops here; explicitly ordered listings and counts see every match
+    MAX_RESULTS = 1000
+    CHUNK_SIZE = 500
+    
+    # Source -> (model, related fields to load with it)
+    SOURCES = {
+        'product': (Product, ['brand', 'category', 'subcategory']),
+        'ecommerce_product': (EcommerceProduct, ['brand', 'category', 'category__parent']),
+        'merchant_product': (MerchantProduct, []),
+    }
+    ECO_FLAGS = ['is_organic', 'is_biodegradable', 'is_recyclable', 'is_plastic_free']
+    # Eco flag -> word marking it in a free-text certification list
+    CERTIFICATION_FLAGS = {
+        'is_organic': 'organic',
+        'is_biodegradable': 'biodegradable',
+        'is_recyclable': 'recycl',
+        'is_plastic_free': 'plastic free',
+    }
+    # Ecommerce products have no eco-friendly flag; an eco rating this high or any eco flag counts
+    ECO_FRIENDLY_RATING = 4
+    
+    def __init__(self):
+        self.calculation_service = EcoScoreCalculationService()
+    
+    @classmethod
+    def get_terms(cls, query: str) -> List[str]:
+        """Words of a user query; everything else is dropped so it cannot be read as query syntax"""
+        return re.findall(r'\w+', query.lower())[:cls.MAX_TERMS]
+    
+    def search(self, query: str, source: Optional[str] = None, active_only: bool = True,
+               limit: Optional[int] = None) -> List[Tuple[str, int, float]]:
+        """
+        Rank catalog entries against a query, every word matching as a prefix
+        
+        Returns:
+            List of (source, source id, score) tuples, best match first
+        """
+        return [(entry_source, source_id, score) for _, entry_source, source_id, score in
+                self.rank(query, source, active_only, limit)]
+    
+    def rank(self, query: str, source: Optional[str] = None, active_only: bool = True,
+             limit: Optional[int] = None) -> List[Tuple[int, str, int, float]]:
+        """Matching (entry id, source, source id, score) tuples, best match first"""
+        terms = self.get_terms(query)
+        if not terms:
+            return []
+        limit = min(limit or self.MAX_RESULTS, self.MAX_RESULTS)
+        
+        match = self._get_match_sql(terms, source, active_only)
+        if match is None:
+            return self._search_fallback(terms, source, active_only, limit)
+        
+        score, clause, params = match
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT e.id, e.source, e.source_id, {score} AS score {clause} ORDER BY score DESC LIMIT %s',
+                params + [limit],
+            )
+            return [(row[0], row[1], row[2], round(row[3], 4)) for row in cursor.fetchall()]
+    
+    def _get_match_sql(self, terms: Sequence[str], source: Optional[str],
+                       active_only: bool) -> Optional[Tuple[str, str, List[Any]]]:
+        """
+        (score expression, FROM/WHERE clause over entries `e`, params) matching every term,
+        or None when the database has no full-text index
+        """
+        filters, params = [], []
+        if source:
+            filters.append('e.source = %s')
+            params.append(source)
+        if active_only:
+            filters.append('e.is_active')
+        where = ''.join(f' AND {condition}' for condition in filters)
+        
+        if connection.vendor == 'sqlite':
+            # bm25 is lower for better matches
+            score = f'-bm25({self.FTS_TABLE}, {", ".join(map(str, self.FTS_WEIGHTS))})'
+            clause = (
+                f'FROM {self.FTS_TABLE} JOIN catalog_catalogentry e ON e.id = {self.FTS_TABLE}.rowid '
+                f'WHERE {self.FTS_TABLE} MATCH %s{where}'
+            )
+            match = ' '.join(f'"{term}"*' for term in terms)
+        elif connection.vendor == 'postgresql':
+            score = 'ts_rank_cd(e.search_vector, query)'
+            clause = (
+                "FROM catalog_catalogentry e, to_tsquery('english', %s) query "
+                f'WHERE e.search_vector @@ query{where}'
+            )
+            match = ' & '.join(f'{term}:*' for term in terms)
+        else:
+            return None
+        return score, clause, [match] + params
+    
+    @staticmethod
+    def _get_fallback_entries(terms: Sequence[str], source: Optional[str], active_only: bool):
+        """Substring match for databases without a full-text index"""
+        entries = CatalogEntry.objects.all()
+        if source:
+            entries = entries.filter(source=source)
+        if active_only:
+            entries = entries.filter(is_active=True)
+        for term in terms:
+            entries = entries.filter(
+                Q(name__icontains=term) | Q(brand__icontains=term) | Q(category__icontains=term) |
+                Q(tags__icontains=term) | Q(description__icontains=term)
+            )
+        return entries
+    
+    def _search_fallback(self, terms: Sequence[str], source: Optional[str], active_only: bool,
+                         limit: int) -> List[Tuple[int, str, int, float]]:
+        """Unranked substring match for databases without a full-text index"""
+        entries = self._get_fallback_entries(terms, source, active_only)
+        return [
+            (entry_id, entry_source, source_id, 0.0)
+            for entry_id, entry_source, source_id in entries.values_list('id', 'source', 'source_id')[:limit]
+        ]
+    
+    def get_matches(self, query: str, column: str = 'id', source: Optional[str] = None, active_only: bool = True):
+        """
+        Subquery selecting `column` of every entry matching the query, with no result cap,
+        or None when the query has no searchable words
+        """
+        terms = self.get_terms(query)
+        if not terms:
+            return None
+        match = self._get_match_sql(terms, source, active_only)
+        if match is None:
+            return self._get_fallback_entries(terms, source, active_only).values(column)
+        _, clause, params = match
+        return RawSQL(f'SELECT e.{column} {clause}', params)
+    
+    def filter_queryset(self, queryset, source: str, query: str, active_only: bool = True,
+                        order_by_rank: bool = True):
+        """
+        Restrict a product queryset of the given source to search matches: the MAX_RESULTS best,
+        best first, or every match when the caller applies its own ordering
+        """
+        if order_by_rank:
+            ids = [source_id for _, source_id, _ in self.search(query, source, active_only)]
+            return self._filter_ids(queryset, ids)
+        return self._filter_matches(queryset, self.get_matches(query, 'source_id', source, active_only))
+    
+    def filter_entries(self, queryset, query: str, source: Optional[str] = None, active_only: bool = True,
+                       order_by_rank: bool = True):
+        """
+        Restrict a CatalogEntry queryset to search matches: the MAX_RESULTS best, best first,
+        or every match when ordered otherwise
+        """
+        if order_by_rank:
+            ids = [entry_id for entry_id, _, _, _ in self.rank(query, source, active_only)]
+            return self._filter_ids(queryset, ids)
+        return self._filter_matches(queryset, self.get_matches(query, 'id', source, active_only))
+    
+    @staticmethod
+    def _filter_ids(queryset, ids: List[int]):
+        if not ids:
+            return queryset.none()
+        return queryset.filter(pk__in=ids).order_by(Case(
+            *[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+            output_field=IntegerField(),
+        ))
+    
+    @staticmethod
+    def _filter_matches(queryset, matches):
+        if matches is None:
+            return queryset.none()
+        return queryset.filter(pk__in=matches)
+    
+    @staticmethod
+    def get_image_url(thumbnails: Dict[str, Any], original_url: str) -> str:
+        """Listings show the medium thumbnail once it is rendered, the original until then"""
+        return (thumbnails or {}).get('medium', {}).get('webp') or original_url
+    
+    def get_document(self, source: str, product, benchmarks: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Catalog entry fields of a product"""
+        if source == 'product':
+            category = product.category.name
+            subcategory = product.subcategory.name if product.subcategory else ''
+            description = f'{product.short_description} {product.description}'
+            brand = product.brand.name
+            tags = product.tags
+        elif source == 'ecommerce_product':
+            # Ecommerce categories nest one level; the parent is the top-level category
+            parent = product.category.parent
+            category = parent.name if parent else product.category.name
+            subcategory = product.category.name if parent else ''
+            description = f'{product.short_description} {product.description}'
+            brand = product.brand.name
+            tags = []
+        else:
+            category = product.category
+            subcategory = product.subcategory
+            description = product.description
+            brand = product.brand
+            tags = product.tags
+        review_count = getattr(product, 'review_count', 0)
+        
+        document = {
+            'name': product.name,
+            'brand': brand,
+            'category': ' '.join(name for name in [category, subcategory] if name),
+            'tags': ' '.join(str(tag) for tag in tags) if isinstance(tags, list) else '',
+            'description': description.strip(),
+            'category_name': category,
+            'subcategory_name': subcategory,
+            'category_slug': slugify(category),
+            'subcategory_slug': slugify(subcategory),
+            'brand_slug': slugify(brand),
+            'slug': getattr(product, 'slug', ''),
+            'price': product.price,
+            'stock_quantity': product.stock_quantity,
+            'is_featured': product.is_featured,
+            'is_active': product.is_active,
+            'rating_average': round(product.rating_sum / product.review_count, 2) if review_count else 0.0,
+            'rating_count': review_count,
+            'listed_at': product.created_at,
+        }
+        
+        if source == 'ecommerce_product':
+            score = self.calculation_service.score_against_benchmark(
+                product.carbon_footprint, (benchmarks or {}).get(product.category.name.lower())
+            )
+            document.update({
+                'original_price': product.compare_price,
+                'in_stock': product.is_in_stock,
+                'ecoscore_value': score[0] if score else None,
+                'ecoscore_grade': score[1] if score else '',
+                'image_url': self.get_image_url(product.thumbnails, product.primary_image_url),
+                **{flag: getattr(product, flag) for flag in self.ECO_FLAGS},
+            })
+            document['is_eco_friendly'] = (
+                product.eco_rating >= self.ECO_FRIENDLY_RATING or any(document[flag] for flag in self.ECO_FLAGS)
+            )
+        else:
+            certifications = ' '.join(
+                re.sub(r'[-_]', ' ', str(certification)).lower()
+                for certification in (product.eco_certifications if isinstance(product.eco_certifications, list) else [])
+            )
+            document.update({
+                'original_price': product.original_price,
+                'in_stock': product.stock_quantity > 0,
+                'ecoscore_value': product.ecoscore_value if product.ecoscore_grade else None,
+                'ecoscore_grade': product.ecoscore_grade,
+                'image_url': self.get_image_url(
+                    product.thumbnails, product.primary_image.url if product.primary_image else ''
+                ),
+                'is_eco_friendly': product.is_eco_friendly,
+                **{flag: word in certifications for flag, word in self.CERTIFICATION_FLAGS.items()},
+            })
+        return document
+    
+    def index(self, source: str, **filters) -> int:
+        """
+        Upsert the entries of a source's products, all of them or those matching the filters
+        
+        Returns:
+            Number of entries written
+        """
+        model, related = self.SOURCES[source]
+        products = model.objects.filter(**filters).select_related(*related).order_by('pk')
+        # Ecommerce products are scored from their carbon footprint against the category benchmark
+        benchmarks = EcoScoreCalculationService.get_category_benchmarks() if source == 'ecommerce_product' else None
+        written = 0
+        entries = []
+        for product in products.iterator(chunk_size=self.CHUNK_SIZE):
+            entries.append(CatalogEntry(
+                source=source, source_id=product.pk, **self.get_document(source, product, benchmarks)
+            ))
+            if len(entries) >= self.CHUNK_SIZE:
+                written += self._write(entries)
+                entries = []
+        if entries:
+            written += self._write(entries)
+        return written
+    
+    @staticmethod
+    def _write(entries: List[CatalogEntry]) -> int:
+        # Bulk upserts send no post_save, so the version readers compare against is bumped here
+        transaction.on_commit(lambda: bump_version(CatalogEntry))
+        CatalogEntry.objects.bulk_create(
+            entries,
+            update_conflicts=True,
+            unique_fields=['source', 'source_id'],
+            update_fields=[
+                field.name for field in CatalogEntry._meta.concrete_fields
+                if field.name not in ('id', 'source', 'source_id')
+            ],
+        )
+        return len(entries)
+    
+    @staticmethod
+    def remove(source: str, source_ids: Iterable[int]) -> int:
+        deleted, _ = CatalogEntry.objects.filter(source=source, source_id__in=list(source_ids)).delete()
+        if deleted:
+            transaction.on_commit(lambda: bump_version(CatalogEntry))
+        return deleted
+    
+    def rebuild(self) -> Dict[str, int]:
+        """Re-index every source and drop entries whose product no longer exists"""
+        stats = {}
+        for source, (model, _) in self.SOURCES.items():
+            stats[source] = self.index(source)
+            CatalogEntry.objects.filter(source=source).exclude(
+                source_id__in=model.objects.values('pk')
+            ).delete()
+        return stats
+
+
+class CatalogTypeaheadIndex:
+    """
+    In-memory prefix index of product, brand and category names across the catalog apps for autocomplete.
+    Names are kept in a sorted array searched with bisect, every word of a name being a prefix entry point,
+    and ranked by how often their products are ordered and reviewed.
+    """
+    
+    # Name fields per source: (product name, brand, category names)
+    SUGGESTION_FIELDS = {
+        'product': ('name', 'brand__name', ['category__name', 'subcategory__name']),
+        'ecommerce_product': ('name', 'brand__name', ['category__parent__name', 'category__name']),
+        'merchant_product': ('name', 'brand', ['category', 'subcategory']),
+    }
+    KINDS = ('product', 'brand', 'category')
+    # Prefixes shorter than this match much of the index; their results are memoised until the next change
+    SHORT_PREFIX = 3
+    MAX_WORDS = 6
+    # Seconds between catalog fingerprint checks, so keystrokes are answered from memory
+    VERSION_TTL = 2.0
+    # Popularity of unchanged products is only refreshed by a full rebuild
+    REBUILD_INTERVAL = 3600
+    
+    _current = None
+    _checked_at = 0.0
+    _lock = threading.Lock()
+    
+    def __init__(self, version: Tuple):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.known = set()
+        # (source, product id) -> [(kind, text)] names the product contributes to, with its weight
+        self.contributions = {}
+        # (kind, lowercase text) -> {'text', 'kind', 'weight', 'products'}
+        self.terms = {}
+        # Sorted [(lowercase text from one of its words, term key)]
+        self.keys = []
+        self.memo = {}
+    
+    @staticmethod
+    def get_version() -> Tuple:
+        entries = CatalogEntry.objects.aggregate(latest=Max('updated_at'), total=Count('id'))
+        return entries['latest'], entries['total']
+    
+    @classmethod
+    def current(cls) -> 'CatalogTypeaheadIndex':
+        """
+        Return the index for the current catalog. Entries re-indexed since the last check are applied
+        to a copy that then replaces it, so readers never see an index mid-update; deletions and an
+        expired popularity snapshot trigger a full rebuild.
+        """
+        index = cls._current
+        if index is not None and time.monotonic() - cls._checked_at < cls.VERSION_TTL:
+            return index
+        with cls._lock:
+            version = cls.get_version()
+            index = cls._current
+            if index is None or index.version != version:
+                refreshed = index.refresh(version) if index is not None else None
+                index = refreshed or cls.build(version)
+                cls._current = index
+            cls._checked_at = time.monotonic()
+        return index
+    
+    @classmethod
+    def build(cls, version: Tuple) -> 'CatalogTypeaheadIndex':
+        index = cls(version)
+        for source in cls.SUGGESTION_FIELDS:
+            index.known.update((source, source_id) for source_id in CatalogEntry.objects.filter(
+                source=source
+            ).values_list('source_id', flat=True))
+            index.apply_rows(source, index.get_rows(source), index.get_popularity(source))
+        return index
+    
+    def copy(self) -> 'CatalogTypeaheadIndex':
+        """Independent copy that can be changed while readers keep using this index"""
+        index = type(self)(self.version)
+        index.built_at = self.built_at
+        index.known = set(self.known)
+        index.contributions = dict(self.contributions)
+        index.terms = {term_key: dict(term) for term_key, term in self.terms.items()}
+        index.keys = list(self.keys)
+        return index
+    
+    def refresh(self, version: Tuple) -> Optional['CatalogTypeaheadIndex']:
+        """
+        Copy of the index with the entries re-indexed since it was built applied;
+        None when a full rebuild is needed
+        """
+        latest, total = version
+        if self.version[0] is None or time.monotonic() - self.built_at > self.REBUILD_INTERVAL:
+            return None
+        changed = defaultdict(list)
+        for source, source_id in CatalogEntry.objects.filter(
+            updated_at__gte=self.version[0]
+        ).values_list('source', 'source_id'):
+            changed[source].append(source_id)
+        new_keys = {
+            (source, source_id) for source, source_ids in changed.items() for source_id in source_ids
+        } - self.known
+        if len(self.known) + len(new_keys) != total:
+            # Some products were deleted
+            return None
+        index = self.copy()
+        index.known.update(new_keys)
+        for source, source_ids in changed.items():
+            rows = index.get_rows(source, id__in=source_ids)
+            for source_id in set(source_ids) - {row['id'] for row in rows}:
+                index._remove((source, source_id))
+            index.apply_rows(source, rows, index.get_popularity(source, source_ids))
+        index.version = version
+        return index
+    
+    def get_rows(self, source: str, **filters) -> List[Dict[str, Any]]:
+        model, _ = CatalogSearchIndex.SOURCES[source]
+        name, brand, categories = self.SUGGESTION_FIELDS[source]
+        return list(model.objects.filter(**filters).values('id', 'is_active', name, brand, *categories))
+    
+    @staticmethod
+    def get_popularity(source: str, source_ids: Optional[Sequence[int]] = None) -> Dict[int, int]:
+        """Units ordered plus reviews per product"""
+        # (queryset, product id field, count per product)
+        if source == 'product':
+            counts = [(ProductReview.objects.all(), 'product_id', Count('id'))]
+        elif source == 'ecommerce_product':
+            counts = [
+                (EcommerceProductReview.objects.all(), 'product_id', Count('id')),
+                # Customer order items reference ecommerce products by a free-text id
+                (CustomerOrderItem.objects.filter(product_id__regex=r'^[0-9]+$')
+                 .exclude(order__order_status='cancelled')
+                 .annotate(catalog_product_id=Cast('product_id', IntegerField())),
+                 'catalog_product_id', Sum('quantity')),
+            ]
+        else:
+            counts = [(MerchantOrderItem.objects.exclude(order__status='cancelled'), 'product_id', Sum('quantity'))]
+        
+        popularity = defaultdict(int)
+        for queryset, key, total in counts:
+            if source_ids is not None:
+                queryset = queryset.filter(**{f'{key}__in': list(source_ids)})
+            for row in queryset.values(key).annotate(total=total).order_by():
+                popularity[row[key]] += row['total'] or 0
+        return popularity
+    
+    def apply_rows(self, source: str, rows: Iterable[Dict[str, Any]], popularity: Dict[int, int]):
+        name, brand, categories = self.SUGGESTION_FIELDS[source]
+        for row in rows:
+            product_key = (source, row['id'])
+            self._remove(product_key)
+            if not row['is_active']:
+                continue
+            names = [('product', row[name]), ('brand', row[brand])]
+            names.extend(('category', row[field]) for field in categories)
+            names = list(dict.fromkeys((kind, text.strip()) for kind, text in names if text and text.strip()))
+            # Every product counts, popular ones more
+            weight = 1 + popularity.get(row['id'], 0)
+            self.contributions[product_key] = (names, weight)
+            for kind, text in names:
+                self._add_term(kind, text, weight)
+        self.memo.clear()
+    
+    def _add_term(self, kind: str, text: str, weight: int):
+        term_key = (kind, text.lower())
+        term = self.terms.get(term_key)
+        if term is None:
+            term = self.terms[term_key] = {'text': text, 'kind': kind, 'weight': 0, 'products': 0}
+            for key in self.get_keys(term_key[1]):
+                insort(self.keys, (key, term_key))
+        term['weight'] += weight
+        term['products'] += 1
+    
+    def _remove(self, product_key: Tuple[str, int]):
+        names, weight = self.contributions.pop(product_key, ((), 0))
+        for kind, text in names:
+            term_key = (kind, text.lower())
+            term = self.terms[term_key]
+            term['weight'] -= weight
+            term['products'] -= 1
+            if term['products'] <= 0:
+                del self.terms[term_key]
+                for key in self.get_keys(term_key[1]):
+                    del self.keys[bisect_left(self.keys, (key, term_key))]
+        self.memo.clear()
+    
+    @classmethod
+    def get_keys(cls, text: str) -> List[str]:
+        """The text from each of its first words, so 'bamboo toothbrush' is found by 'tooth' too"""
+        words = cls.normalize(text).split(' ')
+        return list(dict.fromkeys(' '.join(words[i:]) for i in range(min(len(words), cls.MAX_WORDS))))
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        return ' '.join(re.findall(r'\w+', text.lower()))
+    
+    def suggest(self, prefix: str, limit: int = 8, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Most popular names with a word starting with the prefix
+        
+        Returns:
+            Up to limit suggestions, highest weight first
+        """
+        prefix = self.normalize(prefix)
+        if not prefix:
+            return []
+        memo_key = (prefix, limit, kind)
+        if memo_key in self.memo:
+            return self.memo[memo_key]
+        
+        matches = set()
+        position = bisect_left(self.keys, (prefix,))
+        while position < len(self.keys) and self.keys[position][0].startswith(prefix):
+            term_key = self.keys[position][1]
+            if kind is None or term_key[0] == kind:
+                matches.add(term_key)
+            position += 1
+        suggestions = [
+            dict(self.terms[term_key])
+            for term_key in heapq.nlargest(limit, sorted(matches), key=lambda term_key: self.terms[term_key]['weight'])
+        ]
+        if len(prefix) < self.SHORT_PREFIX:
+            self.memo[memo_key] = suggestions
+        return suggestions
+
+
+class CatalogFacetService:
+    """
+    Facet counts for a filtered catalog listing in one grouped query.
+    Entries are grouped by every facet dimension at once and the groups are rolled up in Python,
+    so each facet is counted with every selection applied except its own. Groups are cached per
+    normalized filter until the catalog changes.
+    """
+    
+    # Facet -> (grouped column, label column)
+    FACETS = {
+        'category': ('category_slug', 'category_name'),
+        'brand': ('brand_slug', 'brand'),
+        'grade': ('ecoscore_grade', None),
+    }
+    ECO_FLAGS = ['is_organic', 'is_plastic_free', 'is_recyclable', 'is_biodegradable', 'is_eco_friendly']
+    # Lower bounds of the price buckets; the last one is open-ended
+    PRICE_BUCKETS = [0, 10, 25, 50, 100, 250]
+    ALL_FACETS = list(FACETS) + ['price', 'eco']
+    CACHE_SIZE = 256
+    
+    _cache = OrderedDict()
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def get_version() -> str:
+        """Catalog version counter, bumped whenever entries are written or removed"""
+        return get_versions([CatalogEntry])
+    
+    def get_groups(self, filters: Dict[str, Any], search: str = '') -> List[Dict[str, Any]]:
+        """Entry counts per combination of facet values among active entries matching the filters"""
+        key = (tuple(sorted((lookup, str(value)) for lookup, value in filters.items())),
+               tuple(CatalogSearchIndex.get_terms(search)))
+        version = self.get_version()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == version:
+                self._cache.move_to_end(key)
+                return cached[1]
+        
+        queryset = CatalogEntry.objects.filter(is_active=True, **filters)
+        if key[1]:
+            queryset = CatalogSearchIndex().filter_entries(queryset, search, filters.get('source'), order_by_rank=False)
+        columns = [column for facet in self.FACETS.values() for column in facet if column]
+        groups = list(
+            queryset.annotate(price_bucket=Case(
+                *[When(price__lt=bound, then=position - 1) for position, bound in enumerate(self.PRICE_BUCKETS) if position],
+                default=len(self.PRICE_BUCKETS) - 1,
+                output_field=IntegerField(),
+            ))
+            .values(*columns, 'price_bucket', *self.ECO_FLAGS)
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        
+        with self._lock:
+            self._cache[key] = (version, groups)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return groups
+    
+    def get_facets(self, filters: Dict[str, Any], selections: Dict[str, Any], search: str = '',
+                   facets: Optional[Sequence[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Count the requested facets
+        
+        Args:
+            filters: Entry lookups applied to every facet (source, price range, ...)
+            selections: Selected facet values keyed by grouped column or eco flag
+            search: Optional full-text query
+            facets: Facet names, all of them by default
+        """
+        facets = [facet for facet in (facets or self.ALL_FACETS) if facet in self.ALL_FACETS]
+        groups = self.get_groups(filters, search)
+        
+        def matches(group, ignored):
+            return all(
+                group[column] == value for column, value in selections.items() if column != ignored
+            )
+        
+        results = {}
+        for facet in facets:
+            counts, labels = defaultdict(int), {}
+            if facet == 'eco':
+                for flag in self.ECO_FLAGS:
+                    counts[flag] += sum(group['count'] for group in groups if group[flag] and matches(group, flag))
+                results[facet] = [{'value': flag, 'count': counts[flag]} for flag in self.ECO_FLAGS]
+                continue
+            
+            column, label = self.FACETS.get(facet, ('price_bucket', None))
+            for group in groups:
+                if group[column] in ('', None) or not matches(group, column):
+                    continue
+                counts[group[column]] += group['count']
+                if label:
+                    labels[group[column]] = group[label]
+            
+            if facet == 'price':
+                results[facet] = [
+                    {
+                        'value': position,
+                        'min': bound,
+                        'max': self.PRICE_BUCKETS[position + 1] if position + 1 < len(self.PRICE_BUCKETS) else None,
+                        'count': counts[position],
+                    }
+                    for position, bound in enumerate(self.PRICE_BUCKETS) if counts[position]
+                ]
+            else:
+                # Grades read best first; other facets most common first
+                order = sorted(counts) if facet == 'grade' else sorted(counts, key=lambda value: (-counts[value], value))
+                results[facet] = [
+                    {'value': value, 'label': labels.get(value, value), 'count': counts[value]} for value in order
+                ]
+        return results
+
+
+class TrendingService:
+    """
+    Trending lists from time-decayed popularity: every order, review and wishlist add loses half its weight
+    each TRENDING_HALF_LIFE_HOURS. Scores are stored decayed to the end of the last processed window, so a
+    run decays the live scores by one factor, folds in only the events since then and re-ranks the products
+    that still have a score. Runs must not overlap; schedule update_trending_products from a single place.
+    """
+    
+    # Weight of one event when it happens; an order line counts once whatever its quantity
+    EVENT_WEIGHTS = {'order': 3.0, 'review': 2.0, 'wishlist': 1.0}
+    # Scores decayed below this are dropped from the rankings
+    MIN_SCORE = 1e-3
+    # Events this recent may belong to transactions still open, so they wait for the next run
+    SETTLE_DELAY = timedelta(minutes=1)
+    CHUNK_SIZE = 2000
+    
+    def __init__(self, half_life_hours: Optional[float] = None, list_size: Optional[int] = None):
+        self.half_life = timedelta(hours=half_life_hours or settings.TRENDING_HALF_LIFE_HOURS)
+        self.list_size = list_size or settings.TRENDING_LIST_SIZE
+        # The heaviest event decays below MIN_SCORE after this long, so older events never matter
+        self.lookback = self.half_life * math.log2(max(self.EVENT_WEIGHTS.values()) / self.MIN_SCORE)
+    
+    def decay(self, elapsed: timedelta) -> float:
+        return 0.5 ** (elapsed / self.half_life)
+    
+    @staticmethod
+    def get_event_sources() -> List[Tuple[str, str, Any, str, str]]:
+        """(catalog source, event kind, queryset, product id field, event time field) of every kind of event"""
+        # Customer order items and wishlists reference ecommerce products by a free-text id
+        def with_catalog_id(queryset):
+            return queryset.filter(product_id__regex=r'^[0-9]+$').annotate(
+                catalog_product_id=Cast('product_id', IntegerField())
+            )
+        
+        return [
+            ('product', 'review', ProductReview.objects.all(), 'product_id', 'created_at'),
+            ('ecommerce_product', 'review', EcommerceProductReview.objects.filter(is_approved=True),
+             'product_id', 'created_at'),
+            ('ecommerce_product', 'order',
+             with_catalog_id(CustomerOrderItem.objects.exclude(order__order_status__in=['cancelled', 'returned'])),
+             'catalog_product_id', 'order__created_at'),
+            ('ecommerce_product', 'wishlist', with_catalog_id(CustomerWishlist.objects.all()),
+             'catalog_product_id', 'created_at'),
+            ('merchant_product', 'order', MerchantOrderItem.objects.exclude(order__status='cancelled'),
+             'product_id', 'order__created_at'),
+        ]
+    
+    def update(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Fold the events since the last run into the scores and rebuild the trending lists
+        
+        Returns:
+            Number of events read, products with a live score and list entries written
+        """
+        until = (now or timezone.now()) - self.SETTLE_DELAY
+        with transaction.atomic():
+            last = CatalogPopularity.objects.aggregate(last=Max('scored_at'))['last']
+            # Without a previous run, or after a long pause, events before the lookback no longer count
+            start = max(last, until - self.lookback) if last else until - self.lookback
+            until = max(until, start)
+            
+            scores = {
+                (source, source_id): score * self.decay(until - scored_at)
+                for source, source_id, score, scored_at in CatalogPopularity.objects.filter(
+                    score__gt=0
+                ).values_list('source', 'source_id', 'score', 'scored_at').iterator(chunk_size=self.CHUNK_SIZE)
+            }
+            events = 0
+            for source, kind, queryset, key, time_field in self.get_event_sources():
+                weight = self.EVENT_WEIGHTS[kind]
+                rows = queryset.filter(**{f'{time_field}__gt': start, f'{time_field}__lte': until}).values_list(
+                    key, time_field
+                ).order_by()
+                for source_id, happened_at in rows.iterator(chunk_size=self.CHUNK_SIZE):
+                    scores[(source, source_id)] = scores.get((source, source_id), 0.0) + weight * self.decay(
+                        until - happened_at
+                    )
+                    events += 1
+            
+            # Products that fell below the threshold keep a zero row, which still records this run
+            live = {key: score for key, score in scores.items() if score >= self.MIN_SCORE}
+            keys = list(scores)
+            for offset in range(0, len(keys), self.CHUNK_SIZE):
+                CatalogPopularity.objects.bulk_create(
+                    [
+                        CatalogPopularity(source=source, source_id=source_id, score=live.get((source, source_id), 0.0),
+                                          scored_at=until)
+                        for source, source_id in keys[offset:offset + self.CHUNK_SIZE]
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['source', 'source_id'],
+                    update_fields=['score', 'scored_at'],
+                )
+            listed = self.rank(live, until)
+        transaction.on_commit(lambda: bump_version(TrendingEntry))
+        return {'events': events, 'scored': len(live), 'listed': listed}
+    
+    def rank(self, scores: Dict[Tuple[str, int], float], computed_at: datetime) -> int:
+        """Replace the trending lists with the top scored active products of each source and category"""
+        candidates = defaultdict(list)
+        for source in CatalogSearchIndex.SOURCES:
+            source_ids = [source_id for entry_source, source_id in scores if entry_source == source]
+            for offset in range(0, len(source_ids), self.CHUNK_SIZE):
+                for source_id, category_slug in CatalogEntry.objects.filter(
+                    source=source, source_id__in=source_ids[offset:offset + self.CHUNK_SIZE], is_active=True
+                ).values_list('source_id', 'category_slug'):
+                    candidate = (scores[(source, source_id)], source_id)
+                    candidates[(source, '')].append(candidate)
+                    if category_slug:
+                        candidates[(source, category_slug)].append(candidate)
+        
+        entries = [
+            TrendingEntry(
+                source=source, category_slug=category_slug, rank=rank, source_id=source_id, score=score,
+                computed_at=computed_at,
+            )
+            for (source, category_slug), group in candidates.items()
+            for rank, (score, source_id) in enumerate(heapq.nlargest(self.list_size, group), start=1)
+        ]
+        TrendingEntry.objects.all().delete()
+        TrendingEntry.objects.bulk_create(entries, batch_size=500)
+        return len(entries)
+
+
+class BoughtTogetherService:
+    """
+    Item-to-item co-occurrence index of confirmed orders for "frequently bought together" bundles.
+    Each basket adds one to the count of every ordered pair of its products. A product keeps only its
+    NEIGHBOURS most frequent companions; the slack over the bundles served lets a rising pair climb
+    before it could be pruned.
+    """
+    
+    # Catalog source -> (order model, order status field); customer orders hold ecommerce products
+    ORDER_SOURCES = {
+        'ecommerce_product': (CustomerOrder, 'order_status'),
+        'merchant_product': (MerchantOrder, 'status'),
+    }
+    CONFIRMED_STATUSES = OrderEcoImpactService.CONFIRMED_STATUSES
+    NEIGHBOURS = 100
+    MAX_BUNDLE_SIZE = 20
+    # Bulk orders say little about affinity and would add pairs quadratic in their size
+    MAX_BASKET_SIZE = 30
+    
+    def __init__(self, chunk_size: int = 500):
+        self.chunk_size = chunk_size
+    
+    def get_baskets(self, source: str, order_ids: Sequence[int]) -> Dict[int, set]:
+        """Distinct product ids of each order"""
+        if source == 'ecommerce_product':
+            # Customer order items reference ecommerce products by a free-text id
+            rows = CustomerOrderItem.objects.filter(order_id__in=order_ids, product_id__regex=r'^[0-9]+$').annotate(
+                catalog_product_id=Cast('product_id', IntegerField())
+            ).values_list('order_id', 'catalog_product_id')
+        else:
+            rows = MerchantOrderItem.objects.filter(order_id__in=order_ids).values_list('order_id', 'product_id')
+        baskets = defaultdict(set)
+        for order_id, product_id in rows.order_by():
+            baskets[order_id].add(product_id)
+        return baskets
+    
+    def record_orders(self, source: str, order_ids: Sequence[int]) -> int:
+        """
+        Count the baskets of the confirmed orders among order_ids that are not in the index yet
+        
+        Returns:
+            Number of orders counted
+        """
+        model, status_field = self.ORDER_SOURCES[source]
+        try:
+            with transaction.atomic():
+                recorded = BoughtTogetherOrder.objects.filter(source=source, order_id__in=order_ids).values('order_id')
+                new_ids = list(
+                    model.objects.filter(id__in=order_ids, **{f'{status_field}__in': self.CONFIRMED_STATUSES})
+                    .exclude(id__in=recorded).values_list('id', flat=True)
+                )
+                # Orders saved before their items are counted by a later save
+                baskets = self.get_baskets(source, new_ids) if new_ids else {}
+                if not baskets:
+                    return 0
+                # Marking first makes a concurrent run over the same orders fail instead of counting them twice
+                BoughtTogetherOrder.objects.bulk_create(
+                    [BoughtTogetherOrder(source=source, order_id=order_id) for order_id in baskets], batch_size=500
+                )
+                self.add_baskets(source, baskets.values())
+        except IntegrityError:
+            logger.info('Orders %s were counted by a concurrent run', order_ids)
+            return 0
+        return len(baskets)
+    
+    def get_pairs(self, baskets: Iterable[set]) -> Counter:
+        """Number of baskets holding each ordered (product, companion) pair"""
+        pairs = Counter()
+        for basket in baskets:
+            if 2 <= len(basket) <= self.MAX_BASKET_SIZE:
+                pairs.update(permutations(basket, 2))
+        return pairs
+    
+    def add_baskets(self, source: str, baskets: Iterable[set]):
+        deltas = self.get_pairs(baskets)
+        if not deltas:
+            return
+        
+        product_ids = sorted({source_id for source_id, _ in deltas})
+        increments = defaultdict(list)
+        existing = set()
+        for offset in range(0, len(product_ids), self.chunk_size):
+            for pk, source_id, companion_id in BoughtTogether.objects.filter(
+                source=source, source_id__in=product_ids[offset:offset + self.chunk_size]
+            ).values_list('id', 'source_id', 'companion_id'):
+                if (source_id, companion_id) in deltas:
+                    existing.add((source_id, companion_id))
+                    increments[deltas[(source_id, companion_id)]].append(pk)
+        # Pairs sharing an increment are updated together
+        for amount, ids in increments.items():
+            for offset in range(0, len(ids), self.chunk_size):
+                BoughtTogether.objects.filter(id__in=ids[offset:offset + self.chunk_size]).update(
+                    count=F('count') + amount
+                )
+        BoughtTogether.objects.bulk_create(
+            [
+                BoughtTogether(source=source, source_id=source_id, companion_id=companion_id, count=count)
+                for (source_id, companion_id), count in deltas.items() if (source_id, companion_id) not in existing
+            ],
+            batch_size=500,
+            # A pair another order inserted meanwhile keeps that order's count; rebuild recounts exactly
+            ignore_conflicts=True,
+        )
+        self.prune(source, product_ids)
+    
+    def prune(self, source: str, product_ids: Sequence[int]):
+        """Drop the least frequent companions of products that have more than NEIGHBOURS"""
+        for offset in range(0, len(product_ids), self.chunk_size):
+            crowded = BoughtTogether.objects.filter(
+                source=source, source_id__in=product_ids[offset:offset + self.chunk_size]
+            ).values('source_id').annotate(companions=Count('id')).filter(
+                companions__gt=self.NEIGHBOURS
+            ).values_list('source_id', flat=True)
+            for source_id in list(crowded):
+                pruned = BoughtTogether.objects.filter(source=source, source_id=source_id).order_by(
+                    '-count', 'companion_id'
+                ).values_list('id', flat=True)[self.NEIGHBOURS:]
+                BoughtTogether.objects.filter(id__in=list(pruned)).delete()
+    
+    def get_bundle(self, source: str, source_ids: Sequence[int], limit: int = 10) -> List[Tuple[int, int]]:
+        """
+        Active products most often bought with the given ones, excluding them, in one indexed read
+        
+        Returns:
+            (product id, number of orders) pairs, most frequent first
+        """
+        counts = Counter()
+        for companion_id, count in BoughtTogether.objects.filter(
+            source=source, source_id__in=list(source_ids)
+        ).values_list('companion_id', 'count'):
+            counts[companion_id] += count
+        for source_id in source_ids:
+            counts.pop(source_id, None)
+        
+        # Look up a few more than needed so inactive products can be skipped
+        candidates = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit * 3]
+        active = set(CatalogEntry.objects.filter(
+            source=source, source_id__in=[companion_id for companion_id, _ in candidates], is_active=True
+        ).values_list('source_id', flat=True))
+        return [(companion_id, count) for companion_id, count in candidates if companion_id in active][:limit]
+    
+    @staticmethod
+    def remove(source: str, source_ids: Iterable[int]):
+        source_ids = list(source_ids)
+        BoughtTogether.objects.filter(
+            Q(source_id__in=source_ids) | Q(companion_id__in=source_ids), source=source
+        ).delete()
+    
+    def rebuild(self) -> Dict[str, int]:
+        """
+        Recount every confirmed order from scratch. Orders are read in id-ordered chunks and their pairs
+        counted in memory; each source's rows are then replaced in one transaction, so bundles are served
+        from the previous counts until the new ones are complete.
+        
+        Returns:
+            Number of orders counted per source
+        """
+        stats = {}
+        for source, (model, status_field) in self.ORDER_SOURCES.items():
+            orders = model.objects.filter(**{f'{status_field}__in': self.CONFIRMED_STATUSES})
+            pairs = Counter()
+            counted_ids = []
+            last_id = 0
+            while True:
+                order_ids = list(
+                    orders.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:self.chunk_size]
+                )
+                if not order_ids:
+                    break
+                last_id = order_ids[-1]
+                baskets = self.get_baskets(source, order_ids)
+                counted_ids.extend(baskets)
+                pairs.update(self.get_pairs(baskets.values()))
+            
+            # Same companions prune() would keep
+            companions = defaultdict(list)
+            for (source_id, companion_id), count in pairs.items():
+                companions[source_id].append((count, -companion_id))
+            entries = [
+                BoughtTogether(source=source, source_id=source_id, companion_id=-negative_id, count=count)
+                for source_id, counts in companions.items()
+                for count, negative_id in heapq.nlargest(self.NEIGHBOURS, counts)
+            ]
+            
+            with transaction.atomic():
+                BoughtTogether.objects.filter(source=source).delete()
+                BoughtTogetherOrder.objects.filter(source=source).delete()
+                BoughtTogether.objects.bulk_create(entries, batch_size=500)
+                BoughtTogetherOrder.objects.bulk_create(
+                    [BoughtTogetherOrder(source=source, order_id=order_id) for order_id in counted_ids], batch_size=500
+                )
+                # Orders confirmed while the counts were being read are added as live ones are
+                recorded = BoughtTogetherOrder.objects.filter(source=source).values('order_id')
+                pending = list(orders.exclude(id__in=recorded).order_by('id').values_list('id', flat=True))
+                counted = len(counted_ids)
+                for offset in range(0, len(pending), self.chunk_size):
+                    counted += self.record_orders(source, pending[offset:offset + self.chunk_size])
+            stats[source] = counted
+        return stats
@@ -0,0 +1,125 @@
+"""
+Signal handlers keeping the catalog read model and search index in sync with the product apps
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from products.models import Product, Category, Subcategory, Brand, ProductReview
+from ecommerce.models import (
+    Product as EcommerceProduct, Category as EcommerceCategory, Brand as EcommerceBrand,
+    ProductReview as EcommerceProductReview
+)
+from merchants.models import MerchantOrder, MerchantProduct
+from customers.models import CustomerOrder
+from ecoscore.models import EcoScoreBenchmark
+from .services import BoughtTogetherService, CatalogSearchIndex
+
+# Saves that only touch other fields (SEO, shipping, ...) leave the catalog entry unchanged
+INDEXED_FIELDS = {
+    'name', 'slug', 'description', 'short_description', 'brand', 'category', 'subcategory', 'tags',
+    'price', 'original_price', 'compare_price', 'stock_quantity', 'track_inventory', 'primary_image',
+    'primary_image_url', 'thumbnails',
+    'is_eco_friendly', 'eco_certifications', 'eco_rating', 'is_organic', 'is_biodegradable', 'is_recyclable',
+    'is_plastic_free', 'carbon_footprint', 'ecoscore_value', 'ecoscore_grade', 'is_featured', 'is_active'
+}
+PRODUCT_SOURCES = {
+    Product: 'product',
+    EcommerceProduct: 'ecommerce_product',
+    MerchantProduct: 'merchant_product',
+}
+ORDER_SOURCES = {
+    CustomerOrder: 'ecommerce_product',
+    MerchantOrder: 'merchant_product',
+}
+
+
+def schedule_index(source, **filters):
+    transaction.on_commit(lambda: CatalogSearchIndex().index(source, **filters))
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=EcommerceProduct)
+@receiver(post_save, sender=MerchantProduct)
+def index_product(sender, instance, update_fields=None, **kwargs):
+    """Re-index a product once its save is committed"""
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    schedule_index(PRODUCT_SOURCES[sender], pk=instance.pk)
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=EcommerceProduct)
+@receiver(post_delete, sender=MerchantProduct)
+def remove_product(sender, instance, **kwargs):
+    CatalogSearchIndex.remove(PRODUCT_SOURCES[sender], [instance.pk])
+    BoughtTogetherService.remove(PRODUCT_SOURCES[sender], [instance.pk])
+
+
+@receiver(post_save, sender=ProductReview)
+@receiver(post_delete, sender=ProductReview)
+def index_reviewed_product(sender, instance, **kwargs):
+    """Entries carry review aggregates"""
+    schedule_index('product', pk=instance.product_id)
+
+
+@receiver(post_save, sender=EcommerceProductReview)
+@receiver(post_delete, sender=EcommerceProductReview)
+def index_reviewed_ecommerce_product(sender, instance, **kwargs):
+    schedule_index('ecommerce_product', pk=instance.product_id)
+
+
+@receiver(post_save, sender=EcoScoreBenchmark)
+def index_benchmarked_products(sender, instance, **kwargs):
+    """Ecommerce products are scored against their category benchmark"""
+    schedule_index('ecommerce_product', category__name__iexact=instance.category)
+
+
+@receiver(post_save, sender=Brand)
+def index_brand_products(sender, instance, created=False, **kwargs):
+    """Brand and category names are copied into the entries of their products"""
+    if not created:
+        schedule_index('product', brand_id=instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def index_category_products(sender, instance, created=False, **kwargs):
+    if not created:
+        schedule_index('product', category_id=instance.pk)
+
+
+@receiver(post_save, sender=Subcategory)
+def index_subcategory_products(sender, instance, created=False, **kwargs):
+    if not created:
+        schedule_index('product', subcategory_id=instance.pk)
+
+
+@receiver(post_save, sender=EcommerceBrand)
+def index_ecommerce_brand_products(sender, instance, created=False, **kwargs):
+    if not created:
+        schedule_index('ecommerce_product', brand_id=instance.pk)
+
+
+@receiver(post_save, sender=EcommerceCategory)
+def index_ecommerce_category_products(sender, instance, created=False, **kwargs):
+    if not created:
+        # Child categories carry the parent's name too
+        transaction.on_commit(lambda: CatalogSearchIndex().index(
+            'ecommerce_product', pk__in=EcommerceProduct.objects.filter(
+                Q(category_id=instance.pk) | Q(category__parent_id=instance.pk)
+            ).values('pk')
+        ))
+
+
+@receiver(post_save, sender=CustomerOrder)
+@receiver(post_save, sender=MerchantOrder)
+def record_bought_together(sender, instance, **kwargs):
+    """Count the order's basket in the bought-together index once it is confirmed"""
+    source = ORDER_SOURCES[sender]
+    _, status_field = BoughtTogetherService.ORDER_SOURCES[source]
+    if getattr(instance, status_field) not in BoughtTogetherService.CONFIRMED_STATUSES:
+        return
+    
+    order_id = instance.pk
+    transaction.on_commit(lambda: BoughtTogetherService().record_orders(source, [order_id]))
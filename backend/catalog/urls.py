@@ -0,0 +1,17 @@
+"""
+URLs for Catalog app
+"""
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from . import views
+
+router = DefaultRouter()
+router.register(r'products', views.CatalogEntryViewSet, basename='catalog-product')
+
+urlpatterns = [
+    path('', include(router.urls)),
+    path('search/', views.catalog_search, name='catalog-search'),
+    path('autocomplete/', views.catalog_autocomplete, name='catalog-autocomplete'),
+    path('trending/', views.catalog_trending, name='catalog-trending'),
+    path('bought-together/', views.catalog_bought_together, name='catalog-bought-together'),
+]
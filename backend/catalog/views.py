@@ -0,0 +1,258 @@
+"""
+Views for Catalog app
+"""
+from django.conf import settings
+from django.db.models import F
+from django.utils.text import slugify
+from rest_framework import status, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from ecoswitch_backend.pagination import KeysetPagination
+from ecoswitch_backend.response_cache import cache_response
+from .models import CatalogEntry, TrendingEntry
+from .serializers import CatalogEntrySerializer
+from customers.models import CartItem
+from .services import BoughtTogetherService, CatalogFacetService, CatalogSearchIndex, CatalogTypeaheadIndex
+
+
+class CatalogEntryViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Products of every catalog app from the denormalized catalog, filtered and sorted on indexed columns
+    """
+    serializer_class = CatalogEntrySerializer
+    permission_classes = [AllowAny]
+    pagination_class = KeysetPagination
+    
+    SORTS = {
+        'price_asc': ['price', 'id'],
+        'price_desc': ['-price', 'id'],
+        'ecoscore': [F('ecoscore_value').desc(nulls_last=True), 'id'],
+        'rating': ['-rating_average', '-rating_count', 'id'],
+        'newest': ['-listed_at', '-id'],
+    }
+    # Query parameter -> (lookup, value parser)
+    FILTERS = {
+        'source': ('source', str),
+        'category': ('category_slug', str),
+        'subcategory': ('subcategory_slug', str),
+        'brand': ('brand_slug', str),
+        'grade': ('ecoscore_grade', str.upper),
+        'min_price': ('price__gte', float),
+        'max_price': ('price__lte', float),
+        'min_score': ('ecoscore_value__gte', float),
+        'min_rating': ('rating_average__gte', float),
+    }
+    FLAGS = ['in_stock', 'is_eco_friendly', 'is_organic', 'is_biodegradable', 'is_recyclable',
+             'is_plastic_free', 'is_featured']
+    
+    def get_filters(self) -> dict:
+        params = self.request.query_params
+        filters = {}
+        for param, (lookup, parse) in self.FILTERS.items():
+            value = params.get(param)
+            if value:
+                try:
+                    filters[lookup] = parse(value)
+                except ValueError:
+                    raise ValidationError({param: 'Invalid value'})
+        for flag in self.FLAGS:
+            if params.get(flag) == 'true':
+                filters[flag] = True
+        return filters
+    
+    def get_queryset(self):
+        queryset = CatalogEntry.objects.filter(is_active=True)
+        params = self.request.query_params
+        filters = self.get_filters()
+        queryset = queryset.filter(**filters)
+        
+        # Search, ranked by relevance unless a sort is requested
+        search = params.get('search')
+        sort = params.get('sort')
+        if search:
+            queryset = CatalogSearchIndex().filter_entries(
+                queryset, search, filters.get('source'), order_by_rank=not sort
+            )
+        if sort or not search:
+            queryset = queryset.order_by(*self.SORTS.get(sort, self.SORTS['newest']))
+        return queryset
+    
+    def get_facets(self):
+        """Counts of the facets named in the facets parameter, for the current filters"""
+        facets = [facet for facet in self.request.query_params.get('facets', '').split(',') if facet]
+        if 'all' in facets:
+            facets = None
+        filters = self.get_filters()
+        # Facet selections are rolled up per facet; the other filters narrow every count
+        facet_columns = {column for column, _ in CatalogFacetService.FACETS.values()}
+        facet_columns.update(CatalogFacetService.ECO_FLAGS)
+        selections = {lookup: value for lookup, value in filters.items() if lookup in facet_columns}
+        filters = {lookup: value for lookup, value in filters.items() if lookup not in facet_columns}
+        return CatalogFacetService().get_facets(
+            filters, selections, self.request.query_params.get('search', ''), facets
+        )
+    
+    def list(self, request, *args, **kwargs):
+        """Listing page, with facet counts in the same response when facets are requested"""
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get('facets') and isinstance(response.data, dict):
+            response.data['facets'] = self.get_facets()
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Facet counts only; facets=all or a comma-separated list of category, brand, grade, price, eco"""
+        return Response({'facets': self.get_facets()})
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def catalog_search(request):
+    """
+    Relevance-ranked search across every product catalog
+    """
+    query = request.query_params.get('q', '').strip()
+    source = request.query_params.get('source') or None
+    if not CatalogSearchIndex.get_terms(query):
+        return Response({'error': 'Query parameter q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if source and source not in CatalogSearchIndex.SOURCES:
+        return Response({
+            'error': f"source must be one of {', '.join(CatalogSearchIndex.SOURCES)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    ranked = CatalogSearchIndex().search(query, source, limit=limit)
+    entries = {
+        (entry.source, entry.source_id): entry
+        for entry in CatalogEntry.objects.filter(
+            source__in={entry_source for entry_source, _, _ in ranked},
+            source_id__in=[source_id for _, source_id, _ in ranked],
+        )
+    }
+    results = []
+    for entry_source, source_id, score in ranked:
+        entry = entries.get((entry_source, source_id))
+        if entry is None:
+            continue
+        data = CatalogEntrySerializer(entry).data
+        data['score'] = score
+        results.append(data)
+    
+    return Response({'query': query, 'count': len(results), 'results': results})
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def catalog_autocomplete(request):
+    """
+    Typeahead suggestions of product, brand and category names, served from memory
+    """
+    query = request.query_params.get('q', '')
+    kind = request.query_params.get('kind') or None
+    if kind and kind not in CatalogTypeaheadIndex.KINDS:
+        return Response({
+            'error': f"kind must be one of {', '.join(CatalogTypeaheadIndex.KINDS)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(max(int(request.query_params.get('limit', 8)), 1), 20)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    suggestions = CatalogTypeaheadIndex.current().suggest(query, limit, kind)
+    return Response({'query': query, 'suggestions': suggestions})
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@cache_response(CatalogEntry, TrendingEntry)
+def catalog_trending(request):
+    """
+    Trending products of one catalog source, overall or in one category, read from the precomputed lists
+    """
+    source = request.query_params.get('source', 'ecommerce_product')
+    if source not in CatalogSearchIndex.SOURCES:
+        return Response({
+            'error': f"source must be one of {', '.join(CatalogSearchIndex.SOURCES)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    category = slugify(request.query_params.get('category', ''))
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), settings.TRENDING_LIST_SIZE)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    trending = TrendingEntry.objects.filter(source=source, category_slug=category).order_by('rank')[:limit]
+    scores = {entry.source_id: entry.score for entry in trending}
+    entries = {
+        entry.source_id: entry
+        for entry in CatalogEntry.objects.filter(source=source, source_id__in=list(scores), is_active=True)
+    }
+    results = []
+    for source_id, score in scores.items():
+        entry = entries.get(source_id)
+        if entry is None:
+            continue
+        data = CatalogEntrySerializer(entry).data
+        data['score'] = round(score, 3)
+        results.append(data)
+    
+    return Response({'source': source, 'category': category, 'count': len(results), 'results': results})
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def catalog_bought_together(request):
+    """
+    Products frequently bought together with a product (?product_id=), several (?product_ids=1,2)
+    or the signed-in customer's cart (?cart=true, ecommerce products)
+    """
+    source = request.query_params.get('source', 'ecommerce_product')
+    if source not in BoughtTogetherService.ORDER_SOURCES:
+        return Response({
+            'error': f"source must be one of {', '.join(BoughtTogetherService.ORDER_SOURCES)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(max(int(request.query_params.get('limit', 5)), 1), BoughtTogetherService.MAX_BUNDLE_SIZE)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if request.query_params.get('cart', '').lower() == 'true':
+        if not request.user.is_authenticated or source != 'ecommerce_product':
+            return Response(
+                {'error': 'Cart bundles need a signed-in customer and ecommerce products'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        product_ids = [
+            int(product_id) for product_id in CartItem.objects.filter(
+                cart__customer__user=request.user
+            ).values_list('product_id', flat=True) if product_id.isdigit()
+        ]
+    else:
+        raw_ids = request.query_params.get('product_ids') or request.query_params.get('product_id', '')
+        try:
+            product_ids = [int(product_id) for product_id in raw_ids.split(',') if product_id.strip()]
+        except ValueError:
+            return Response({'error': 'product ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if not product_ids:
+            return Response({'error': 'product_id, product_ids or cart is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    bundle = BoughtTogetherService().get_bundle(source, product_ids[:50], limit=limit)
+    entries = {
+        entry.source_id: entry
+        for entry in CatalogEntry.objects.filter(source=source, source_id__in=[source_id for source_id, _ in bundle])
+    }
+    results = []
+    for source_id, count in bundle:
+        entry = entries.get(source_id)
+        if entry is None:
+            continue
+        data = CatalogEntrySerializer(entry).data
+        data['orders_together'] = count
+        results.append(data)
+    
+    return Response({'source': source, 'product_ids': product_ids, 'count': len(results), 'results': results})
@@ -4,6 +4,13 @@ from django.apps import AppConfig
 class CustomersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'customers'
+    
+    def ready(self):
+        """Import signal handlers when the app is ready"""
+        try:
+            import customers.signals
+        except ImportError:
+            pass
 
 
 
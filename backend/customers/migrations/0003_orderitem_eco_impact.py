@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_cart_cartitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='co2_saved',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='ecoscore_grade',
+            field=models.CharField(blank=True, max_length=1),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_orderitem_eco_impact'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='ecoscore_value',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
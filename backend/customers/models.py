@@ -130,6 +130,11 @@ class OrderItem(models.Model):
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
     
+    # Eco impact snapshot, filled in when the order is confirmed
+    co2_saved = models.DecimalField(max_digits=8, decimal_places=2, default=0)  # kg CO2 saved vs category benchmark
+    ecoscore_value = models.FloatField(null=True, blank=True)
+    ecoscore_grade = models.CharField(max_length=1, blank=True)
+    
     def __str__(self):
         return f"{self.product_name} x {self.quantity} - {self.order.order_number}"
 
@@ -204,6 +209,8 @@ class Cart(models.Model):
     Shopping cart for customers
     """
     customer = models.ForeignKey(CustomerProfile, on_delete=models.CASCADE, related_name='cart')
+    # Bumped with updated_at whenever an item is added, changed or removed
+    version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -0,0 +1,16 @@
+"""
+Signal handlers for Customers app
+"""
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Cart, CartItem
+
+
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def bump_cart_version(sender, instance, **kwargs):
+    """Item changes are what the cart's ETag has to follow"""
+    Cart.objects.filter(pk=instance.cart_id).update(version=F('version') + 1, updated_at=timezone.now())
@@ -1,7 +1,7 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q, Sum, Count, Avg
+from django.db.models import Sum, Count, Avg
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 from datetime import timedelta
@@ -16,6 +16,8 @@ from .serializers import (
     OrderItemSerializer, CustomerWishlistSerializer, CustomerReviewSerializer,
     CustomerRecommendationSerializer
 )
+from catalog.services import CatalogSearchIndex
+from ecoswitch_backend.pagination import KeysetPagination
 
 
 class CustomerProfileViewSet(viewsets.ModelViewSet):
@@ -460,6 +462,9 @@ def customer_dashboard(request):
     return Response(dashboard_data)
 
 
+BROWSE_SORT_FIELDS = ['created_at', 'price', 'name', 'ecoscore_value', 'stock_quantity']
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def browse_products(request):
@@ -480,19 +485,23 @@ def browse_products(request):
     min_price = request.query_params.get('min_price')
     max_price = request.query_params.get('max_price')
     eco_friendly = request.query_params.get('eco_friendly')
-    sort_by = request.query_params.get('sort_by', 'created_at')
+    sort_by = request.query_params.get('sort_by')
     sort_order = request.query_params.get('sort_order', 'desc')
     
+    # Sortable columns; pages are read with a cursor on (sort field, id)
+    if sort_by and sort_by not in BROWSE_SORT_FIELDS:
+        return Response({
+            'error': f"sort_by must be one of {', '.join(BROWSE_SORT_FIELDS)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
     # Build queryset
     queryset = MerchantProduct.objects.filter(is_active=True)
     
     # Apply filters
     if search:
-        queryset = queryset.filter(
-            Q(name__icontains=search) |
-            Q(description__icontains=search) |
-            Q(brand__icontains=search) |
-            Q(category__icontains=search)
+        # Ranked by relevance unless a sort is requested
+        queryset = CatalogSearchIndex().filter_queryset(
+            queryset, 'merchant_product', search, order_by_rank=not sort_by
         )
     
     if category:
@@ -508,19 +517,16 @@ def browse_products(request):
         queryset = queryset.filter(is_eco_friendly=True)
     
     # Apply sorting
-    if sort_order == 'desc':
-        queryset = queryset.order_by(f'-{sort_by}')
-    else:
-        queryset = queryset.order_by(sort_by)
+    if sort_by or not search:
+        sort_by = sort_by or 'created_at'
+        if sort_order == 'desc':
+            queryset = queryset.order_by(f'-{sort_by}')
+        else:
+            queryset = queryset.order_by(sort_by)
     
     # Pagination
-    page_size = int(request.query_params.get('page_size', 20))
-    page = int(request.query_params.get('page', 1))
-    start = (page - 1) * page_size
-    end = start + page_size
-    
-    products = queryset[start:end]
-    total_count = queryset.count()
+    paginator = KeysetPagination()
+    products = paginator.paginate_queryset(queryset, request)
     
     # Serialize products
     from merchants.serializers import MerchantProductSerializer
@@ -528,10 +534,7 @@ def browse_products(request):
     
     return Response({
         'products': product_data,
-        'total_count': total_count,
-        'page': page,
-        'page_size': page_size,
-        'total_pages': (total_count + page_size - 1) // page_size
+        **paginator.get_page_info()
     })
 
 
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class EcommerceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ecommerce'
+    
+    def ready(self):
+        """Import signal handlers when the app is ready"""
+        try:
+            import ecommerce.signals
+        except ImportError:
+            pass
@@ -0,0 +1,43 @@
+"""
+Management command to delete media blobs that no row references any more
+"""
+import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from ecoswitch_backend.storage import ContentAddressedStorage, get_reference_counts
+
+
+class Command(BaseCommand):
+    help = 'Delete content-addressed media blobs that no file field or stored media URL references'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report unreferenced blobs without deleting them')
+        parser.add_argument(
+            '--grace-hours', type=float, default=24,
+            help='Keep blobs written more recently than this, as their rows may not be committed yet'
+        )
+    
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError('DEFAULT_FILE_STORAGE is not the content-addressed storage')
+        
+        references = get_reference_counts()
+        cutoff = time.time() - options['grace_hours'] * 3600
+        blobs = removed = freed = shared = 0
+        for name, size, modified in default_storage.list_blobs():
+            blobs += 1
+            if references[name] > 1:
+                shared += 1
+            if references[name] or modified > cutoff:
+                continue
+            if not options['dry_run']:
+                default_storage.remove_blob(name)
+            removed += 1
+            freed += size
+        
+        self.stdout.write(f'  {blobs} blobs, {shared} shared by several rows')
+        action = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {removed} unreferenced blobs ({freed / 1024 / 1024:.1f} MB)'
+        ))
@@ -0,0 +1,27 @@
+"""
+Management command to recompute the denormalized review counters on products
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from ecoswitch_backend.review_counters import reconcile
+from ecommerce.models import Product as EcommerceProduct, ProductReview as EcommerceProductReview
+from products.models import Product, ProductReview
+
+
+class Command(BaseCommand):
+    help = 'Recompute review counts and rating histograms of products and ecommerce products from their reviews'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Products updated per query')
+    
+    def handle(self, *args, **options):
+        sources = [
+            ('products', Product, ProductReview, Q()),
+            ('ecommerce', EcommerceProduct, EcommerceProductReview, Q(is_approved=True)),
+        ]
+        total = 0
+        for label, product_model, review_model, counted in sources:
+            corrected = reconcile(product_model, review_model, counted, chunk_size=options['chunk_size'])
+            self.stdout.write(f'  {label}: {corrected} products corrected')
+            total += corrected
+        self.stdout.write(self.style.SUCCESS(f'Review counters reconciled, {total} products corrected'))
@@ -0,0 +1,24 @@
+"""
+Management command to render thumbnails of product images uploaded before thumbnails existed
+"""
+from django.core.management.base import BaseCommand
+from ecoswitch_backend.thumbnails import needs_thumbnails, try_update_thumbnails
+from ecommerce.models import ProductImage as EcommerceProductImage
+from merchants.models import MerchantProduct
+from products.models import Product, ProductImage
+
+
+class Command(BaseCommand):
+    help = 'Render missing or stale thumbnails of product, ecommerce and merchant product images'
+    
+    def handle(self, *args, **options):
+        # Ecommerce products copy the thumbnails of their primary image when it is saved
+        models = [Product, ProductImage, EcommerceProductImage, MerchantProduct]
+        total = 0
+        for model in models:
+            pending = [instance.pk for instance in model.objects.order_by('pk').iterator() if needs_thumbnails(instance)]
+            for pk in pending:
+                try_update_thumbnails(model, pk)
+            self.stdout.write(f'  {model._meta.label}: {len(pending)} images')
+            total += len(pending)
+        self.stdout.write(self.style.SUCCESS(f'Thumbnails rendered for {total} images'))
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:09
+
+from django.db import migrations, models
+from django.db.models import Q
+
+from ecoswitch_backend.review_counters import reconcile
+
+
+def backfill_review_counters(apps, schema_editor):
+    reconcile(apps.get_model('ecommerce', 'Product'), apps.get_model('ecommerce', 'ProductReview'), Q(is_approved=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecommerce', '0002_product_ecommerce_p_is_acti_73f561_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_review_counters, migrations.RunPython.noop),
+    ]
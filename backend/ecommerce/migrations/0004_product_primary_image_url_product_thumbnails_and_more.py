@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:14
+
+from django.db import migrations, models
+
+
+def backfill_primary_image_url(apps, schema_editor):
+    """Thumbnails are rendered by the render_thumbnails command; the primary image only needs copying"""
+    Product = apps.get_model('ecommerce', 'Product')
+    ProductImage = apps.get_model('ecommerce', 'ProductImage')
+    products = {}
+    for image in ProductImage.objects.order_by('product_id', '-is_primary', 'sort_order', 'created_at').iterator():
+        if image.product_id not in products and image.image:
+            products[image.product_id] = Product(pk=image.product_id, primary_image_url=image.image.url)
+    Product.objects.bulk_update(products.values(), ['primary_image_url'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecommerce', '0003_product_rating_1_count_product_rating_2_count_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='primary_image_url',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(backfill_primary_image_url, migrations.RunPython.noop),
+    ]
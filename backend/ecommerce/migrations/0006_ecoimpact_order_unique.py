@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:53
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def drop_duplicate_impacts(apps, schema_editor):
+    """Keep the first impact recorded for each order"""
+    EcoImpact = apps.get_model('ecommerce', 'EcoImpact')
+    first_ids = EcoImpact.objects.values('order_id').annotate(first_id=Min('id')).values('first_id')
+    EcoImpact.objects.exclude(id__in=first_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecommerce', '0005_productimage_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_impacts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='ecoimpact',
+            constraint=models.UniqueConstraint(fields=('order',), name='ecommerce_ecoimpact_order_unique'),
+        ),
+    ]
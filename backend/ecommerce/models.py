@@ -1,7 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 import uuid
+from ecoswitch_backend.review_counters import get_counted_state, move_review
 
 
 class Category(models.Model):
@@ -85,6 +86,10 @@ class Product(models.Model):
     is_plastic_free = models.BooleanField(default=False)
     carbon_footprint = models.DecimalField(max_digits=8, decimal_places=2, blank=True, null=True)  # kg CO2
     
+    # Primary image and its thumbnails, copied from the ProductImage rows so listings need no extra queries
+    primary_image_url = models.CharField(max_length=500, blank=True)
+    thumbnails = models.JSONField(default=dict, blank=True)
+    
     # SEO
     meta_title = models.CharField(max_length=200, blank=True)
     meta_description = models.CharField(max_length=300, blank=True)
@@ -93,6 +98,15 @@ class Product(models.Model):
     is_active = models.BooleanField(default=True)
     is_featured = models.BooleanField(default=False)
     
+    # Review counters, kept in step with the approved reviews (see ecoswitch_backend.review_counters)
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -104,6 +118,7 @@ class Product(models.Model):
             models.Index(fields=['brand', 'is_active']),
             models.Index(fields=['price']),
             models.Index(fields=['eco_rating']),
+            models.Index(fields=['is_active', 'created_at']),
         ]
     
     def __str__(self):
@@ -122,6 +137,24 @@ class Product(models.Model):
         if self.compare_price and self.compare_price > self.price:
             return round(((self.compare_price - self.price) / self.compare_price) * 100, 1)
         return 0
+    
+    @property
+    def rating_average(self):
+        return round(self.rating_sum / self.review_count, 1) if self.review_count else 0.0
+    
+    @property
+    def rating_histogram(self):
+        return {rating: getattr(self, f'rating_{rating}_count') for rating in range(1, 6)}
+    
+    def update_primary_image(self):
+        """Copy the primary image, or the first one when none is flagged, onto the product"""
+        image = self.images.order_by('-is_primary', 'sort_order', 'created_at').first()
+        primary_image_url = image.image.url if image and image.image else ''
+        thumbnails = image.thumbnails if image else {}
+        if (primary_image_url, thumbnails) != (self.primary_image_url, self.thumbnails):
+            self.primary_image_url = primary_image_url
+            self.thumbnails = thumbnails
+            self.save(update_fields=['primary_image_url', 'thumbnails', 'updated_at'])
 
 
 class ProductImage(models.Model):
@@ -133,14 +166,21 @@ class ProductImage(models.Model):
     alt_text = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     sort_order = models.PositiveIntegerField(default=0)
+    # Variant URLs by size and format (see ecoswitch_backend.thumbnails)
+    thumbnails = models.JSONField(default=dict, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['sort_order', 'created_at']
     
     def __str__(self):
         return f"{self.product.name} - Image {self.sort_order}"
+    
+    @property
+    def thumbnail_source(self):
+        return self.image or None
 
 
 class ProductVariant(models.Model):
@@ -182,6 +222,13 @@ class ProductReview(models.Model):
     
     def __str__(self):
         return f"{self.product.name} - {self.user.email} - {self.rating} stars"
+    
+    def save(self, *args, **kwargs):
+        """Save and move the review's contribution to the product counters in one transaction"""
+        with transaction.atomic():
+            previous = ProductReview.objects.select_for_update().filter(pk=self.pk).first() if self.pk else None
+            super().save(*args, **kwargs)
+            move_review(Product, get_counted_state(previous), get_counted_state(self))
 
 
 class Coupon(models.Model):
@@ -313,5 +360,11 @@ class EcoImpact(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        constraints = [
+            # An order's impact is credited to the leaderboard and challenges once
+            models.UniqueConstraint(fields=['order'], name='ecommerce_ecoimpact_order_unique'),
+        ]
+    
     def __str__(self):
         return f"{self.user.email} - {self.order.order_number} - Eco Impact"
\ No newline at end of file
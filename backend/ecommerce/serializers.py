@@ -5,6 +5,7 @@ from .models import (
     ProductReview, Coupon, Payment, ShippingMethod, OrderTracking, EcoImpact
 )
 from customers.models import Cart, CartItem, CustomerProfile, CustomerOrder, OrderItem, CustomerWishlist
+from ecoswitch_backend.thumbnails import get_absolute_thumbnails
 
 User = get_user_model()
 
@@ -26,10 +27,11 @@ class BrandSerializer(serializers.ModelSerializer):
 class ProductImageSerializer(serializers.ModelSerializer):
     """Serializer for product images"""
     image_url = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
     
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'image_url', 'alt_text', 'is_primary', 'sort_order']
+        fields = ['id', 'image', 'image_url', 'thumbnails', 'alt_text', 'is_primary', 'sort_order']
     
     def get_image_url(self, obj):
         """Get full image URL"""
@@ -39,6 +41,9 @@ class ProductImageSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.image.url)
             return obj.image.url
         return None
+    
+    def get_thumbnails(self, obj):
+        return get_absolute_thumbnails(obj.thumbnails, self.context.get('request'))
 
 
 class ProductVariantSerializer(serializers.ModelSerializer):
@@ -65,17 +70,18 @@ class ProductListSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     brand_name = serializers.CharField(source='brand.name', read_only=True)
     primary_image = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
     discount_percentage = serializers.ReadOnlyField()
     is_in_stock = serializers.ReadOnlyField()
     is_low_stock = serializers.ReadOnlyField()
-    average_rating = serializers.SerializerMethodField()
-    review_count = serializers.SerializerMethodField()
+    # Read from the product's review counters
+    average_rating = serializers.FloatField(source='rating_average', read_only=True)
     
     class Meta:
         model = Product
         fields = [
             'id', 'name', 'slug', 'short_description', 'category_name', 'brand_name',
-            'price', 'compare_price', 'primary_image', 'discount_percentage',
+            'price', 'compare_price', 'primary_image', 'thumbnails', 'discount_percentage',
             'stock_quantity', 'is_in_stock', 'is_low_stock', 'eco_rating',
             'is_organic', 'is_biodegradable', 'is_recyclable', 'is_plastic_free',
             'carbon_footprint', 'is_featured', 'average_rating', 'review_count',
@@ -83,28 +89,17 @@ class ProductListSerializer(serializers.ModelSerializer):
         ]
     
     def get_primary_image(self, obj):
-        """Get primary product image URL"""
-        try:
-            primary_image = obj.images.filter(is_primary=True).first()
-            if primary_image and primary_image.image:
-                request = self.context.get('request')
-                if request:
-                    return request.build_absolute_uri(primary_image.image.url)
-                return primary_image.image.url
+        """Get primary product image URL, stored on the product"""
+        if not obj.primary_image_url:
             return None
-        except Exception:
-            return None
-    
-    def get_average_rating(self, obj):
-        """Calculate average rating from reviews"""
-        reviews = obj.reviews.filter(is_approved=True)
-        if reviews.exists():
-            return round(reviews.aggregate(avg_rating=serializers.Avg('rating'))['avg_rating'], 1)
-        return 0.0
+        request = self.context.get('request')
+        if request:
+            return request.build_absolute_uri(obj.primary_image_url)
+        return obj.primary_image_url
     
-    def get_review_count(self, obj):
-        """Get total review count"""
-        return obj.reviews.filter(is_approved=True).count()
+    def get_thumbnails(self, obj):
+        """Small and medium WebP/JPEG variants of the primary image, once rendered"""
+        return get_absolute_thumbnails(obj.thumbnails, self.context.get('request'))
 
 
 class ProductDetailSerializer(ProductListSerializer):
@@ -113,11 +108,12 @@ class ProductDetailSerializer(ProductListSerializer):
     variants = ProductVariantSerializer(many=True, read_only=True)
     reviews = ProductReviewSerializer(many=True, read_only=True)
     description = serializers.CharField()
+    rating_histogram = serializers.ReadOnlyField()
     
     class Meta(ProductListSerializer.Meta):
         fields = ProductListSerializer.Meta.fields + [
             'description', 'sku', 'images', 'variants', 'reviews',
-            'meta_title', 'meta_description'
+            'meta_title', 'meta_description', 'rating_histogram'
         ]
 
 
@@ -184,7 +180,8 @@ class OrderItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = ['id', 'product_id', 'product_name', 'product_image', 
-                 'quantity', 'unit_price', 'total_price']
+                 'quantity', 'unit_price', 'total_price', 'co2_saved', 'ecoscore_value',
+                 'ecoscore_grade']
 
 
 class CustomerOrderSerializer(serializers.ModelSerializer):
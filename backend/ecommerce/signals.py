@@ -0,0 +1,37 @@
+"""
+Signal handlers for Ecommerce app
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ecoswitch_backend.review_counters import get_counted_state, move_review
+from ecoswitch_backend.thumbnails import schedule_thumbnails
+from .models import Product, ProductImage, ProductReview
+
+
+@receiver(post_delete, sender=ProductReview)
+def remove_review_from_counters(sender, instance, **kwargs):
+    """
+    Deletions, including cascades from users, run inside the deletion's transaction;
+    saves update the counters in ProductReview.save
+    """
+    move_review(Product, get_counted_state(instance), None)
+
+
+@receiver(post_save, sender=ProductImage)
+def update_product_image(sender, instance, **kwargs):
+    """
+    Render thumbnails of a new or replaced image in the background, and copy the primary image
+    onto its product; saving the rendered thumbnails runs this again to copy them too
+    """
+    schedule_thumbnails(instance)
+    product = Product.objects.filter(pk=instance.product_id).first()
+    if product is not None:
+        product.update_primary_image()
+
+
+@receiver(post_delete, sender=ProductImage)
+def remove_product_image(sender, instance, **kwargs):
+    product = Product.objects.filter(pk=instance.product_id).first()
+    if product is not None:
+        product.update_primary_image()
@@ -21,11 +21,17 @@ from .serializers import (
     WishlistItemSerializer, AddToWishlistSerializer
 )
 from customers.models import Cart, CartItem, CustomerProfile, CustomerOrder, OrderItem, CustomerWishlist
+from ecoscore.services import EcoAlternativeIndex, EcoScoreCalculationService
+from catalog.services import CatalogSearchIndex
+from ecoswitch_backend.conditional import ConditionalGetMixin
+from ecoswitch_backend.pagination import KeysetPagination
+from ecoswitch_backend.response_cache import cache_response
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
 
+@cache_response(Category)
 class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for product categories"""
     queryset = Category.objects.filter(is_active=True)
@@ -33,6 +39,7 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.AllowAny]
 
 
+@cache_response(Brand)
 class BrandViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for product brands"""
     queryset = Brand.objects.filter(is_active=True)
@@ -40,10 +47,16 @@ class BrandViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.AllowAny]
 
 
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+class ProductViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for products with filtering and search capabilities"""
-    queryset = Product.objects.filter(is_active=True).select_related('category', 'brand').prefetch_related('images', 'reviews')
+    queryset = Product.objects.filter(is_active=True).select_related('category', 'brand')
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
+    conditional_fields = ('updated_at', 'category__updated_at', 'brand__updated_at')
+    conditional_detail_fields = ('images__updated_at', 'variants__updated_at', 'reviews__updated_at')
+    
+    MAX_COMPARE_PRODUCTS = 10
+    ECO_CERTIFICATIONS = ['is_organic', 'is_biodegradable', 'is_recyclable', 'is_plastic_free']
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -52,6 +65,9 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
     
     def get_queryset(self):
         queryset = super().get_queryset()
+        # Listings read the image and ratings stored on the product; only the detail view nests them
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('images', 'reviews')
         
         # Filter by category
         category = self.request.query_params.get('category')
@@ -84,13 +100,13 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         if is_plastic_free == 'true':
             queryset = queryset.filter(is_plastic_free=True)
         
-        # Search
+        # Search, ranked by relevance unless a sort is requested
         search = self.request.query_params.get('search')
+        sort = self.request.query_params.get('sort')
         if search:
-            queryset = queryset.filter(name__icontains=search)
+            queryset = CatalogSearchIndex().filter_queryset(queryset, 'ecommerce_product', search, order_by_rank=not sort)
         
         # Sort
-        sort = self.request.query_params.get('sort')
         if sort == 'price_asc':
             queryset = queryset.order_by('price')
         elif sort == 'price_desc':
@@ -100,10 +116,81 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         elif sort == 'newest':
             queryset = queryset.order_by('-created_at')
         elif sort == 'popular':
-            queryset = queryset.order_by('-reviews__rating')
+            queryset = queryset.order_by('-review_count', '-rating_sum')
         
         return queryset
     
+    @action(detail=False, methods=['get'])
+    def compare(self, request):
+        """Compare products side by side, one list per attribute in the requested order"""
+        try:
+            product_ids = list(dict.fromkeys(
+                int(product_id) for product_id in request.query_params.get('ids', '').split(',') if product_id.strip()
+            ))
+        except ValueError:
+            return Response(
+                {'error': 'ids must be a comma-separated list of product ids'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 2 <= len(product_ids) <= self.MAX_COMPARE_PRODUCTS:
+            return Response(
+                {'error': f'Between 2 and {self.MAX_COMPARE_PRODUCTS} product ids are required'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Ratings and the primary image are stored on the products
+        products = Product.objects.filter(id__in=product_ids, is_active=True).select_related(
+            'category', 'brand'
+        ).in_bulk()
+        calculation_service = EcoScoreCalculationService()
+        benchmarks = calculation_service.get_category_benchmarks()
+        
+        found_ids = [product_id for product_id in product_ids if product_id in products]
+        columns = {key: [] for key in [
+            'name', 'slug', 'brand', 'category', 'image', 'price', 'compare_price', 'discount_percentage',
+            'is_in_stock', 'ecoscore', 'grade', 'carbon_footprint', 'benchmark_impact', 'co2_saved',
+            'eco_rating', 'certifications', 'average_rating', 'review_count'
+        ]}
+        for product_id in found_ids:
+            product = products[product_id]
+            benchmark_impact = benchmarks.get(product.category.name.lower())
+            score, grade = calculation_service.score_against_benchmark(
+                product.carbon_footprint, benchmark_impact
+            ) or (None, '')
+            carbon_footprint = float(product.carbon_footprint) if product.carbon_footprint is not None else None
+            
+            columns['name'].append(product.name)
+            columns['slug'].append(product.slug)
+            columns['brand'].append(product.brand.name)
+            columns['category'].append(product.category.name)
+            columns['image'].append(
+                request.build_absolute_uri(product.primary_image_url) if product.primary_image_url else None
+            )
+            columns['price'].append(product.price)
+            columns['compare_price'].append(product.compare_price)
+            columns['discount_percentage'].append(product.discount_percentage)
+            columns['is_in_stock'].append(product.is_in_stock)
+            columns['ecoscore'].append(score)
+            columns['grade'].append(grade)
+            columns['carbon_footprint'].append(carbon_footprint)
+            columns['benchmark_impact'].append(benchmark_impact)
+            columns['co2_saved'].append(
+                round(max(benchmark_impact - carbon_footprint, 0.0), 2)
+                if score is not None else None
+            )
+            columns['eco_rating'].append(product.eco_rating)
+            columns['certifications'].append([
+                field for field in self.ECO_CERTIFICATIONS if getattr(product, field)
+            ])
+            columns['average_rating'].append(product.rating_average)
+            columns['review_count'].append(product.review_count)
+        
+        return Response({
+            'ids': found_ids,
+            'missing_ids': [product_id for product_id in product_ids if product_id not in products],
+            'columns': columns,
+        })
+    
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def add_review(self, request, pk=None):
         """Add a product review"""
@@ -124,10 +211,13 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class CartViewSet(viewsets.ModelViewSet):
+class CartViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for shopping cart management with comprehensive functionality"""
     serializer_class = CartSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Item changes bump the cart's version and updated_at
+    conditional_fields = ('updated_at', 'version')
+    conditional_per_user = True
     
     def get_queryset(self):
         customer_profile = get_object_or_404(CustomerProfile, user=self.request.user)
@@ -135,7 +225,13 @@ class CartViewSet(viewsets.ModelViewSet):
         return Cart.objects.filter(customer=customer_profile)
     
     def list(self, request, *args, **kwargs):
-        """Get current user's cart with all items"""
+        """Get current user's cart with all items, or a 304 when it has not changed"""
+        return self.get_conditional_response(
+            request, self.get_validators(self.get_queryset(), self.conditional_fields),
+            lambda: self.get_cart_response(request)
+        )
+    
+    def get_cart_response(self, request):
         try:
             customer_profile = get_object_or_404(CustomerProfile, user=request.user)
             cart, created = Cart.objects.get_or_create(customer=customer_profile)
@@ -313,15 +409,46 @@ class CartViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    def _get_product_image_url(self, product):
-        """Helper method to get product image URL"""
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def alternatives(self, request):
+        """Greener products in the same category at a similar price for every cart item"""
         try:
-            primary_image = product.images.filter(is_primary=True).first()
-            if primary_image and primary_image.image:
-                return primary_image.image.url
-            return ''
-        except Exception:
-            return ''
+            limit = min(max(int(request.query_params.get('limit', 3)), 1), 10)
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        customer_profile = get_object_or_404(CustomerProfile, user=request.user)
+        items = CartItem.objects.filter(cart__customer=customer_profile).values(
+            'id', 'product_id', 'product_name', 'quantity'
+        )
+        index = EcoAlternativeIndex.current()
+        
+        results = []
+        for item in items:
+            product_id = int(item['product_id']) if item['product_id'].isdigit() else None
+            alternatives = index.alternatives(product_id, limit)
+            for alternative in alternatives:
+                if alternative['image']:
+                    alternative['image'] = request.build_absolute_uri(alternative['image'])
+            current = index.describe(product_id) or {}
+            results.append({
+                'item_id': item['id'],
+                'product_id': item['product_id'],
+                'product_name': item['product_name'],
+                'quantity': item['quantity'],
+                'ecoscore': current.get('ecoscore'),
+                'grade': current.get('grade', ''),
+                'alternatives': alternatives,
+            })
+        
+        return Response({'items': results})
+    
+    def _get_product_image_url(self, product):
+        """Helper method to get product image URL, preferring the small thumbnail"""
+        return (product.thumbnails or {}).get('small', {}).get('jpeg') or product.primary_image_url
 
 
 class OrderViewSet(viewsets.ModelViewSet):
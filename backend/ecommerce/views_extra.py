@@ -14,6 +14,7 @@ from .serializers import (
     EcoImpactSerializer, WishlistItemSerializer, AddToWishlistSerializer
 )
 from customers.models import Cart, CartItem, CustomerProfile, CustomerOrder, OrderItem, CustomerWishlist
+from ecoswitch_backend.response_cache import cache_response
 from .models import Product
 
 logger = logging.getLogger(__name__)
@@ -190,6 +191,7 @@ class CouponViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.AllowAny]
 
 
+@cache_response(ShippingMethod)
 class ShippingMethodViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for shipping methods (read-only)"""
     queryset = ShippingMethod.objects.filter(is_active=True)
@@ -0,0 +1,77 @@
+"""
+Declarative achievement rules evaluated against per-user purchase aggregates
+"""
+from typing import Dict
+
+
+# Metrics available to rules, computed per user from confirmed orders:
+#   purchase_count   - items bought (quantities summed)
+#   order_count      - confirmed orders
+#   co2_saved        - kg CO2 saved against category benchmarks
+#   a_grade_share    - share of graded items with EcoScore grade A
+#   high_grade_count - items with EcoScore grade A or B
+#   high_grade_share - share of graded items with EcoScore grade A or B
+ACHIEVEMENT_RULES = [
+    {
+        'type': 'green_shopper',
+        'name': 'Green Shopper',
+        'description': 'You consistently choose environmentally friendly products!',
+        'metric': 'high_grade_share',
+        'threshold': 0.7,
+        'min_purchases': 1,
+        'eco_score_threshold': 70.0,
+        'badge_icon': '🌱',
+        'badge_color': '#4CAF50',
+    },
+    {
+        'type': 'eco_champion',
+        'name': 'Eco Champion',
+        'description': 'You are a true champion of sustainability!',
+        'metric': 'a_grade_share',
+        'threshold': 0.9,
+        'min_purchases': 1,
+        'eco_score_threshold': 90.0,
+        'badge_icon': '🏆',
+        'badge_color': '#2E7D32',
+    },
+    {
+        'type': 'carbon_reducer',
+        'name': 'Carbon Reducer',
+        'description': 'You have saved over 10 kg of CO2 through your choices!',
+        'metric': 'co2_saved',
+        'threshold': 10.0,
+        'min_purchases': 1,
+        'eco_score_threshold': 0.0,
+        'badge_icon': '🌍',
+        'badge_color': '#0288D1',
+    },
+    {
+        'type': 'sustainability_leader',
+        'name': 'Sustainability Leader',
+        'description': 'You have bought 25 A or B grade products!',
+        'metric': 'high_grade_count',
+        'threshold': 25,
+        'min_purchases': 25,
+        'eco_score_threshold': 60.0,
+        'badge_icon': '⭐',
+        'badge_color': '#F9A825',
+    },
+    {
+        'type': 'eco_explorer',
+        'name': 'Eco Explorer',
+        'description': 'You have completed 5 eco-conscious orders!',
+        'metric': 'order_count',
+        'threshold': 5,
+        'min_purchases': 5,
+        'eco_score_threshold': 0.0,
+        'badge_icon': '🧭',
+        'badge_color': '#7B1FA2',
+    },
+]
+
+
+def rule_is_met(rule: Dict, metrics: Dict) -> bool:
+    """Whether a user's aggregated metrics satisfy an achievement rule"""
+    if metrics['purchase_count'] < rule['min_purchases']:
+        return False
+    return metrics[rule['metric']] >= rule['threshold']
@@ -4,7 +4,8 @@ Admin configuration for EcoScore app
 from django.contrib import admin
 from .models import (
     EcoInventProcess, ProductEcoMapping, EcoScoreBenchmark, 
-    EcoScore, EcoScoreHistory, UserEcoAchievement
+    EcoScore, EcoScoreHistory, EcoScoreUncertainty, UserEcoAchievement, EcoLeaderboardEntry,
+    EcoChallenge, ChallengeProgress, ParetoFrontierPoint
 )
 
 
@@ -54,12 +55,23 @@ class EcoScoreAdmin(admin.ModelAdmin):
     get_product_name.short_description = 'Product Name'
 
 
+@admin.register(EcoScoreUncertainty)
+class EcoScoreUncertaintyAdmin(admin.ModelAdmin):
+    list_display = ['ecoinvent_process', 'benchmark', 'score_p5', 'score_p50', 'score_p95', 'most_likely_grade', 'iterations', 'calculated_at']
+    list_filter = ['most_likely_grade', 'benchmark__category']
+    search_fields = ['ecoinvent_process__name', 'ecoinvent_process__code']
+    readonly_fields = ['calculated_at']
+    list_select_related = ['ecoinvent_process', 'benchmark']
+
+
 @admin.register(EcoScoreHistory)
 class EcoScoreHistoryAdmin(admin.ModelAdmin):
-    list_display = ['get_product_name', 'old_score', 'new_score', 'old_grade', 'new_grade', 'created_at']
-    list_filter = ['old_grade', 'new_grade', 'created_at']
+    list_display = ['get_product_name', 'old_score', 'new_score', 'old_grade', 'new_grade', 'is_compacted', 'created_at']
+    list_filter = ['old_grade', 'new_grade', 'is_compacted', 'created_at']
     search_fields = ['product__name', 'merchant_product__name']
     readonly_fields = ['created_at']
+    list_select_related = ['product', 'merchant_product']
+    show_full_result_count = False
     
     def get_product_name(self, obj):
         if obj.product:
@@ -75,4 +87,36 @@ class UserEcoAchievementAdmin(admin.ModelAdmin):
     list_display = ['user', 'achievement_name', 'achievement_type', 'is_earned', 'earned_at']
     list_filter = ['achievement_type', 'is_earned', 'earned_at']
     search_fields = ['user__email', 'achievement_name']
-    readonly_fields = ['earned_at']
\ No newline at end of file
+    readonly_fields = ['earned_at']
+
+
+@admin.register(EcoLeaderboardEntry)
+class EcoLeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'window', 'period_start', 'total_co2_saved', 'total_purchases', 'updated_at']
+    list_filter = ['window', 'period_start']
+    search_fields = ['user__email']
+    readonly_fields = ['updated_at']
+    list_select_related = ['user']
+
+
+@admin.register(EcoChallenge)
+class EcoChallengeAdmin(admin.ModelAdmin):
+    list_display = ['title', 'metric', 'target', 'points', 'starts_at', 'ends_at', 'is_active', 'is_closed']
+    list_filter = ['metric', 'is_active', 'is_closed']
+    search_fields = ['title', 'description']
+
+
+@admin.register(ChallengeProgress)
+class ChallengeProgressAdmin(admin.ModelAdmin):
+    list_display = ['user', 'challenge', 'progress', 'is_completed', 'completed_at']
+    list_filter = ['is_completed', 'challenge']
+    search_fields = ['user__email', 'challenge__title']
+    list_select_related = ['user', 'challenge']
+
+
+@admin.register(ParetoFrontierPoint)
+class ParetoFrontierPointAdmin(admin.ModelAdmin):
+    list_display = ['catalog', 'category', 'subcategory', 'product', 'merchant_product', 'price', 'score_value']
+    list_filter = ['catalog', 'category']
+    readonly_fields = ['updated_at']
+    list_select_related = ['product', 'merchant_product__merchant']
\ No newline at end of file
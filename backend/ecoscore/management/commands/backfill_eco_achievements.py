@@ -0,0 +1,37 @@
+"""
+Management command to evaluate achievement rules for every user
+"""
+from django.core.management.base import BaseCommand, CommandError
+from ecoscore.services import EcoScoreGamificationService
+
+
+class Command(BaseCommand):
+    help = 'Evaluate all achievement rules for all users in streaming chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Users evaluated per aggregate query',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('chunk-size must be positive')
+        
+        service = EcoScoreGamificationService(chunk_size=options['chunk_size'])
+        
+        self.stdout.write('Evaluating achievements...')
+        total_users = 0
+        total_achievements = 0
+        for users, achievements in service.backfill():
+            total_users += users
+            total_achievements += achievements
+            self.stdout.write(f'Processed {total_users} users...')
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Awarded or refreshed {total_achievements} achievements for {total_users} users'
+            )
+        )
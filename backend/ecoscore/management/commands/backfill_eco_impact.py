@@ -0,0 +1,46 @@
+"""
+Management command to compute EcoImpact rows for historical confirmed orders
+"""
+from django.core.management.base import BaseCommand, CommandError
+from ecoscore.services import OrderEcoImpactService, EcoLeaderboardService
+
+
+class Command(BaseCommand):
+    help = 'Backfill EcoImpact rows for confirmed orders in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Orders processed per chunk',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute orders that already have an EcoImpact row',
+        )
+        parser.add_argument(
+            '--challenges',
+            action='store_true',
+            help='Also count backfilled orders towards the challenges open when they were placed',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('chunk-size must be positive')
+        
+        service = OrderEcoImpactService(chunk_size=options['chunk_size'])
+        
+        self.stdout.write('Backfilling order eco impact...')
+        total = 0
+        for chunk_number, created in enumerate(service.backfill(force=options['force'], challenges=options['challenges']), start=1):
+            total += created
+            self.stdout.write(f'Chunk {chunk_number}: {created} orders')
+        
+        if options['force']:
+            # Recomputed orders were already counted in the leaderboard totals
+            self.stdout.write('Rebuilding eco leaderboard...')
+            EcoLeaderboardService().rebuild()
+        
+        self.stdout.write(self.style.SUCCESS(f'Created EcoImpact rows for {total} orders'))
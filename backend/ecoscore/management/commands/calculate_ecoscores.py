@@ -6,7 +6,7 @@ from django.db import transaction
 from products.models import Product
 from merchants.models import MerchantProduct
 from ecoscore.models import EcoInventProcess, ProductEcoMapping
-from ecoscore.services import EcoScoreCalculationService
+from ecoscore.services import EcoScoreCalculationService, ProcessMappingSuggestionService
 from ecoscore.mapping_data import get_ecoinvent_mapping
 
 
@@ -34,12 +34,20 @@ class Command(BaseCommand):
             type=str,
             help='Calculate EcoScores for products in specific category only',
         )
+        parser.add_argument(
+            '--min-confidence',
+            type=float,
+            default=0.5,
+            help='Minimum confidence for similarity-based mappings when no rule matches',
+        )
 
     def handle(self, *args, **options):
         force = options['force']
         product_id = options.get('product_id')
         merchant_product_id = options.get('merchant_product_id')
         category = options.get('category')
+        self.min_confidence = options['min_confidence']
+        self.suggestions = None
         
         self.stdout.write('Starting EcoScore calculation...')
         
@@ -207,6 +215,37 @@ class Command(BaseCommand):
                 self.style.WARNING(f'⚠ Could not calculate EcoScore for merchant product "{merchant_product.name}"')
             )
     
+    def _get_suggestion(self, kind, instance):
+        """Best similarity suggestion for an unmapped product, computed for all of them at once"""
+        if self.suggestions is None:
+            self.suggestions = ProcessMappingSuggestionService().suggest_unmapped()
+        ranked = self.suggestions.get((kind, instance.id))
+        return ranked[0] if ranked else None
+    
+    def _create_suggested_mapping(self, kind, instance):
+        """Map a product that no keyword rule matched to its most similar process"""
+        label = kind.replace('_', ' ')
+        suggestion = self._get_suggestion(kind, instance)
+        if not suggestion or suggestion['confidence'] < self.min_confidence:
+            self.stdout.write(
+                self.style.WARNING(f'No ecoinvent mapping found for {label} "{instance.name}"')
+            )
+            return
+        
+        mapping = ProductEcoMapping.objects.create(
+            **{kind: instance},
+            ecoinvent_process_id=suggestion['ecoinvent_process_id'],
+            mapping_confidence=suggestion['confidence'],
+            functional_unit='per item',
+            functional_unit_value=1.0,
+            mapping_notes=f"Suggested by text similarity (score {suggestion['similarity']:.2f})"
+        )
+        
+        self.stdout.write(
+            f'Created suggested mapping for {label} "{instance.name}" -> {mapping.ecoinvent_process.name} '
+            f'(confidence {suggestion["confidence"]:.2f})'
+        )
+    
     def _create_product_mapping(self, product):
         """Create ecoinvent mapping for a Product"""
         try:
@@ -220,9 +259,7 @@ class Command(BaseCommand):
             )
             
             if not mapping_data:
-                self.stdout.write(
-                    self.style.WARNING(f'No ecoinvent mapping found for product "{product.name}"')
-                )
+                self._create_suggested_mapping('product', product)
                 return
             
             # Get or create ecoinvent process
@@ -268,9 +305,7 @@ class Command(BaseCommand):
             )
             
             if not mapping_data:
-                self.stdout.write(
-                    self.style.WARNING(f'No ecoinvent mapping found for merchant product "{merchant_product.name}"')
-                )
+                self._create_suggested_mapping('merchant_product', merchant_product)
                 return
             
             # Get or create ecoinvent process
@@ -0,0 +1,13 @@
+"""
+Management command to close eco challenges whose time window has ended
+"""
+from django.core.management.base import BaseCommand
+from ecoscore.services import EcoChallengeService
+
+
+class Command(BaseCommand):
+    help = 'Close all eco challenges whose window has ended'
+
+    def handle(self, *args, **options):
+        closed = EcoChallengeService().close_finished()
+        self.stdout.write(self.style.SUCCESS(f'Closed {closed} challenges'))
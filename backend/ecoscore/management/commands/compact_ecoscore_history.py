@@ -0,0 +1,75 @@
+"""
+Management command to compact EcoScore history older than the retention window
+"""
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from ecoscore.services import EcoScoreHistoryRetentionService
+
+
+class Command(BaseCommand):
+    help = 'Compact EcoScore history to one row per product per period beyond the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            help='Keep full history for this many days (defaults to ECOSCORE_HISTORY_RETENTION_DAYS)',
+        )
+        parser.add_argument(
+            '--period',
+            choices=sorted(EcoScoreHistoryRetentionService.PERIOD_TRUNCATORS),
+            help='Downsampling period (defaults to ECOSCORE_HISTORY_COMPACTION_PERIOD)',
+        )
+        parser.add_argument(
+            '--archive-dir',
+            type=str,
+            help='Write compacted and removed rows to a gzip JSONL file in this directory',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of products processed per batch',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be compacted without changing any rows',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            service = EcoScoreHistoryRetentionService(
+                retention_days=options.get('retention_days'),
+                period=options.get('period'),
+                batch_size=options['batch_size'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        
+        archive_path = None
+        archive_dir = options.get('archive_dir')
+        if archive_dir:
+            os.makedirs(archive_dir, exist_ok=True)
+            archive_path = os.path.join(
+                archive_dir,
+                f"ecoscore_history_{timezone.now().strftime('%Y%m%d%H%M%S')}.jsonl.gz"
+            )
+        
+        self.stdout.write(
+            f'Compacting EcoScore history older than {service.retention_days} days '
+            f'(cutoff {service.get_cutoff():%Y-%m-%d}) by {service.period}...'
+        )
+        stats = service.compact(archive_path=archive_path, dry_run=options['dry_run'])
+        
+        self.stdout.write(f"Rows scanned: {stats['scanned']}")
+        self.stdout.write(f"Periods compacted: {stats['groups']}")
+        self.stdout.write(f"Rows removed: {stats['deleted']}")
+        if archive_path and stats['groups']:
+            self.stdout.write(f'Archived rows to {archive_path}')
+        
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run - no rows were changed'))
+        else:
+            self.stdout.write(self.style.SUCCESS('EcoScore history compaction completed successfully!'))
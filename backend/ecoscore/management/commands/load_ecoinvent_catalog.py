@@ -0,0 +1,65 @@
+"""
+Management command to stream an ecoinvent process or benchmark catalog into the database
+"""
+import time
+from django.core.management.base import BaseCommand, CommandError
+from ecoscore.services import EcoInventCatalogLoader
+
+
+class Command(BaseCommand):
+    help = 'Load an ecoinvent process catalog (or benchmarks) from a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='CSV or JSONL file with code, name, category, unit, location and default_impact columns',
+        )
+        parser.add_argument(
+            '--kind',
+            choices=sorted(EcoInventCatalogLoader.CATALOGS),
+            default='processes',
+            help='Catalog to load (default: processes)',
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='File format (default: guessed from the file extension)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Rows validated and upserted per chunk',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate and diff the catalog without writing to the database',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('chunk-size must be positive')
+        
+        loader = EcoInventCatalogLoader(options['kind'], chunk_size=options['chunk_size'])
+        
+        self.stdout.write(f"Loading {options['kind']} from {options['path']}...")
+        started = time.perf_counter()
+        try:
+            stats = loader.load_file(options['path'], options.get('format'), dry_run=options['dry_run'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+        elapsed = time.perf_counter() - started
+        
+        for error in stats['errors']:
+            self.stdout.write(self.style.WARNING(f'Skipped {error}'))
+        
+        self.stdout.write(f"Created: {stats['created']}")
+        self.stdout.write(f"Updated: {stats['updated']}")
+        self.stdout.write(f"Unchanged: {stats['unchanged']}")
+        self.stdout.write(f"Invalid: {stats['invalid']}")
+        
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run - no changes were written'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Catalog loaded in {elapsed:.2f}s'))
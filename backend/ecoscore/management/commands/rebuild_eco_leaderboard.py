@@ -0,0 +1,28 @@
+"""
+Management command to rebuild or prune the eco leaderboard running totals
+"""
+from django.core.management.base import BaseCommand
+from ecoscore.services import EcoLeaderboardService
+
+
+class Command(BaseCommand):
+    help = 'Recompute leaderboard totals from orders and drop rolled-over weekly/monthly periods'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prune-only',
+            action='store_true',
+            help='Only delete rolled-over periods without recomputing totals',
+        )
+
+    def handle(self, *args, **options):
+        service = EcoLeaderboardService()
+        
+        if options['prune_only']:
+            deleted = service.prune()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} rolled-over leaderboard entries'))
+            return
+        
+        self.stdout.write('Rebuilding eco leaderboard...')
+        written = service.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Leaderboard rebuilt with {written} entries'))
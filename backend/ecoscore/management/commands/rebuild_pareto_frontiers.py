@@ -0,0 +1,14 @@
+"""
+Management command to rebuild the price vs EcoScore Pareto frontiers
+"""
+from django.core.management.base import BaseCommand
+from ecoscore.services import ParetoFrontierService
+
+
+class Command(BaseCommand):
+    help = 'Recompute the price vs EcoScore frontier of every category and subcategory'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding Pareto frontiers...')
+        written = ParetoFrontierService().rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Frontiers rebuilt with {written} points'))
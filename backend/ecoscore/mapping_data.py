@@ -357,45 +357,32 @@ def create_ecoinvent_processes():
     """
     Create ecoinvent process records in the database
     """
-    from .models import EcoInventProcess
+    from .services import EcoInventCatalogLoader
     
-    created_count = 0
-    updated_count = 0
-    
-    for category, mappings in ECOINVENT_MAPPINGS.items():
-        for mapping_key, data in mappings.items():
-            process, created = EcoInventProcess.objects.get_or_create(
-                code=data['code'],
-                defaults={
-                    'name': data['name'],
-                    'category': data['category'],
-                    'subcategory': category,
-                    'unit': data['unit'],
-                    'description': f"Ecoinvent process for {data['name']}",
-                    'is_active': True
-                }
-            )
-            
-            if created:
-                created_count += 1
-            else:
-                # Update existing record
-                process.name = data['name']
-                process.category = data['category']
-                process.subcategory = category
-                process.unit = data['unit']
-                process.is_active = True
-                process.save()
-                updated_count += 1
+    rows = (
+        {
+            'code': data['code'],
+            'name': data['name'],
+            'category': data['category'],
+            'subcategory': category,
+            'unit': data['unit'],
+            'description': f"Ecoinvent process for {data['name']}",
+            'default_impact': data['default_impact'],
+            'is_active': True
+        }
+        for category, mappings in ECOINVENT_MAPPINGS.items()
+        for data in mappings.values()
+    )
     
-    return created_count, updated_count
+    stats = EcoInventCatalogLoader('processes').load(rows)
+    return stats['created'], stats['updated']
 
 
 def create_benchmarks():
     """
     Create benchmark records for EcoScore normalization
     """
-    from .models import EcoScoreBenchmark
+    from .services import EcoInventCatalogLoader
     
     benchmarks_data = [
         {
@@ -448,23 +435,5 @@ def create_benchmarks():
         }
     ]
     
-    created_count = 0
-    updated_count = 0
-    
-    for benchmark_data in benchmarks_data:
-        benchmark, created = EcoScoreBenchmark.objects.get_or_create(
-            category=benchmark_data['category'],
-            subcategory=benchmark_data['subcategory'],
-            defaults=benchmark_data
-        )
-        
-        if created:
-            created_count += 1
-        else:
-            # Update existing benchmark
-            for key, value in benchmark_data.items():
-                setattr(benchmark, key, value)
-            benchmark.save()
-            updated_count += 1
-    
-    return created_count, updated_count
+    stats = EcoInventCatalogLoader('benchmarks').load(benchmarks_data)
+    return stats['created'], stats['updated']
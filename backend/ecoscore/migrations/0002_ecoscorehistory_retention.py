@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecoscore', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ecoscorehistory',
+            name='is_compacted',
+            field=models.BooleanField(default=False, help_text='Row summarizes several changes within one retention period'),
+        ),
+        migrations.AddIndex(
+            model_name='ecoscorehistory',
+            index=models.Index(fields=['product', '-created_at'], name='ecoscore_hist_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ecoscorehistory',
+            index=models.Index(fields=['merchant_product', '-created_at'], name='ecoscore_hist_mproduct_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ecoscorehistory',
+            index=models.Index(fields=['created_at'], name='ecoscore_hist_created_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:27
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecoscore', '0002_ecoscorehistory_retention'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ecoinventprocess',
+            name='geometric_std_dev',
+            field=models.FloatField(blank=True, help_text='Geometric standard deviation of the lognormal impact distribution', null=True, validators=[django.core.validators.MinValueValidator(1.0)]),
+        ),
+        migrations.CreateModel(
+            name='EcoScoreUncertainty',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('iterations', models.PositiveIntegerField()),
+                ('impact_value', models.FloatField(help_text='Deterministic impact used as the distribution median')),
+                ('geometric_std_dev', models.FloatField(help_text='Geometric standard deviation used for sampling')),
+                ('impact_p5', models.FloatField()),
+                ('impact_p50', models.FloatField()),
+                ('impact_p95', models.FloatField()),
+                ('score_p5', models.FloatField()),
+                ('score_p50', models.FloatField()),
+                ('score_p95', models.FloatField()),
+                ('grade_probabilities', models.JSONField(default=dict)),
+                ('most_likely_grade', models.CharField(choices=[('A', 'A - Highly Sustainable'), ('B', 'B - Good'), ('C', 'C - Average'), ('D', 'D - Poor'), ('E', 'E - Very Poor')], max_length=1)),
+                ('calculated_at', models.DateTimeField(auto_now=True)),
+                ('benchmark', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uncertainty_results', to='ecoscore.ecoscorebenchmark')),
+                ('ecoinvent_process', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uncertainty_results', to='ecoscore.ecoinventprocess')),
+            ],
+            options={
+                'verbose_name': 'EcoScore Uncertainty',
+                'verbose_name_plural': 'EcoScore Uncertainties',
+                'ordering': ['ecoinvent_process', 'benchmark'],
+                'unique_together': {('ecoinvent_process', 'benchmark')},
+            },
+        ),
+    ]
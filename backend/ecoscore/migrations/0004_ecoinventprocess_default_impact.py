@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:29
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecoscore', '0003_ecoscoreuncertainty'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ecoinventprocess',
+            name='default_impact',
+            field=models.FloatField(blank=True, help_text='Default impact in kg CO2-eq per unit when no LCA calculation is available', null=True, validators=[django.core.validators.MinValueValidator(0.0)]),
+        ),
+        migrations.AlterField(
+            model_name='ecoinventprocess',
+            name='name',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+    ]
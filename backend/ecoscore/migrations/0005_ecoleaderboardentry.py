@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ecoscore', '0004_ecoinventprocess_default_impact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EcoLeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(choices=[('all_time', 'All Time'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], max_length=10)),
+                ('period_start', models.DateField(help_text='First day of the week or month; fixed date for all-time totals')),
+                ('total_co2_saved', models.FloatField(default=0.0)),
+                ('total_ecoscore', models.FloatField(default=0.0, help_text='Sum of EcoScores over graded purchased items')),
+                ('graded_purchases', models.PositiveIntegerField(default=0)),
+                ('total_purchases', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eco_leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['window', 'period_start', '-total_co2_saved'], name='ecoscore_lb_rank_idx')],
+                'unique_together': {('user', 'window', 'period_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:43
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ecoscore', '0005_ecoleaderboardentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EcoChallenge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('metric', models.CharField(choices=[('a_grade_items', 'A grade items bought'), ('high_grade_items', 'A or B grade items bought'), ('items', 'Items bought'), ('orders', 'Orders completed'), ('co2_saved', 'kg CO2 saved')], max_length=20)),
+                ('target', models.FloatField(validators=[django.core.validators.MinValueValidator(0.0)])),
+                ('points', models.PositiveIntegerField(default=0)),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('is_closed', models.BooleanField(default=False, help_text='Set once the window has ended and progress is final')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['ends_at', 'id'],
+                'indexes': [models.Index(fields=['is_closed', 'starts_at', 'ends_at'], name='ecoscore_challenge_open_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChallengeProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('progress', models.FloatField(default=0.0)),
+                ('is_completed', models.BooleanField(default=False)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='ecoscore.ecochallenge')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eco_challenge_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('challenge', 'user')},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('merchants', '0004_remove_merchantprofile_address_and_more'),
+        ('ecommerce', '0001_initial'),
+        ('ecoscore', '0006_ecochallenge_challengeprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParetoFrontierPoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('catalog', models.CharField(choices=[('product', 'Catalog Product'), ('merchant_product', 'Merchant Product')], max_length=20)),
+                ('category', models.CharField(help_text='Lowercased category name', max_length=100)),
+                ('subcategory', models.CharField(blank=True, help_text='Blank for the frontier of the whole category', max_length=100)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('score_value', models.FloatField()),
+                ('score_grade', models.CharField(blank=True, max_length=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('merchant_product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='frontier_points', to='merchants.merchantproduct')),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='frontier_points', to='ecommerce.product')),
+            ],
+            options={
+                'ordering': ['price'],
+                'indexes': [models.Index(fields=['catalog', 'category', 'subcategory', 'price'], name='ecoscore_frontier_idx')],
+            },
+        ),
+    ]
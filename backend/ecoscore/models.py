@@ -8,13 +8,23 @@ class EcoInventProcess(models.Model):
     """
     Ecoinvent database process mapping
     """
-    name = models.CharField(max_length=200, unique=True)
+    name = models.CharField(max_length=200, db_index=True)
     code = models.CharField(max_length=100, unique=True)
     category = models.CharField(max_length=100)
     subcategory = models.CharField(max_length=100, blank=True)
     unit = models.CharField(max_length=50)
     description = models.TextField(blank=True)
     location = models.CharField(max_length=100, default='GLO')  # Global
+    default_impact = models.FloatField(
+        null=True, blank=True,
+        validators=[MinValueValidator(0.0)],
+        help_text="Default impact in kg CO2-eq per unit when no LCA calculation is available"
+    )
+    geometric_std_dev = models.FloatField(
+        null=True, blank=True,
+        validators=[MinValueValidator(1.0)],
+        help_text="Geometric standard deviation of the lognormal impact distribution"
+    )
     is_active = models.BooleanField(default=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
@@ -167,6 +177,42 @@ class EcoScore(models.Model):
         return descriptions.get(self.score_grade, 'Unknown')
 
 
+class EcoScoreUncertainty(models.Model):
+    """
+    Monte Carlo uncertainty bands for an ecoinvent process against a benchmark
+    """
+    ecoinvent_process = models.ForeignKey(EcoInventProcess, on_delete=models.CASCADE, related_name='uncertainty_results')
+    benchmark = models.ForeignKey(EcoScoreBenchmark, on_delete=models.CASCADE, related_name='uncertainty_results')
+    
+    # Simulation inputs
+    iterations = models.PositiveIntegerField()
+    impact_value = models.FloatField(help_text="Deterministic impact used as the distribution median")
+    geometric_std_dev = models.FloatField(help_text="Geometric standard deviation used for sampling")
+    
+    # Percentiles
+    impact_p5 = models.FloatField()
+    impact_p50 = models.FloatField()
+    impact_p95 = models.FloatField()
+    score_p5 = models.FloatField()
+    score_p50 = models.FloatField()
+    score_p95 = models.FloatField()
+    
+    # Share of iterations landing in each grade, e.g. {'A': 0.7, 'B': 0.3, ...}
+    grade_probabilities = models.JSONField(default=dict)
+    most_likely_grade = models.CharField(max_length=1, choices=EcoScore.SCORE_GRADES)
+    
+    calculated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['ecoinvent_process', 'benchmark']
+        ordering = ['ecoinvent_process', 'benchmark']
+        verbose_name = 'EcoScore Uncertainty'
+        verbose_name_plural = 'EcoScore Uncertainties'
+    
+    def __str__(self):
+        return f"{self.ecoinvent_process.name} - {self.benchmark.category} (p50 score {self.score_p50:.1f})"
+
+
 class EcoScoreHistory(models.Model):
     """
     Historical tracking of EcoScore changes
@@ -181,11 +227,17 @@ class EcoScoreHistory(models.Model):
     
     change_reason = models.CharField(max_length=200, help_text="Reason for the score change")
     change_notes = models.TextField(blank=True)
+    is_compacted = models.BooleanField(default=False, help_text="Row summarizes several changes within one retention period")
     
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', '-created_at'], name='ecoscore_hist_product_idx'),
+            models.Index(fields=['merchant_product', '-created_at'], name='ecoscore_hist_mproduct_idx'),
+            models.Index(fields=['created_at'], name='ecoscore_hist_created_idx'),
+        ]
     
     def __str__(self):
         product_name = self.product.name if self.product else self.merchant_product.name
@@ -233,4 +285,136 @@ class UserEcoAchievement(models.Model):
         ordering = ['-earned_at', '-created_at']
     
     def __str__(self):
-        return f"{self.user.email} - {self.achievement_name}"
\ No newline at end of file
+        return f"{self.user.email} - {self.achievement_name}"
+
+
+class EcoLeaderboardEntry(models.Model):
+    """
+    Running eco totals per user for one leaderboard window and period
+    """
+    from django.contrib.auth import get_user_model
+    User = get_user_model()
+    
+    WINDOWS = [
+        ('all_time', 'All Time'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='eco_leaderboard_entries')
+    window = models.CharField(max_length=10, choices=WINDOWS)
+    period_start = models.DateField(help_text="First day of the week or month; fixed date for all-time totals")
+    
+    total_co2_saved = models.FloatField(default=0.0)
+    total_ecoscore = models.FloatField(default=0.0, help_text="Sum of EcoScores over graded purchased items")
+    graded_purchases = models.PositiveIntegerField(default=0)
+    total_purchases = models.PositiveIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['user', 'window', 'period_start']
+        indexes = [
+            models.Index(fields=['window', 'period_start', '-total_co2_saved'], name='ecoscore_lb_rank_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.email} - {self.window} {self.period_start} ({self.total_co2_saved:.1f} kg CO2)"
+    
+    @property
+    def average_ecoscore(self):
+        if not self.graded_purchases:
+            return 0.0
+        return self.total_ecoscore / self.graded_purchases
+
+
+class EcoChallenge(models.Model):
+    """
+    Time-windowed eco challenge with a target on an order metric
+    """
+    METRICS = [
+        ('a_grade_items', 'A grade items bought'),
+        ('high_grade_items', 'A or B grade items bought'),
+        ('items', 'Items bought'),
+        ('orders', 'Orders completed'),
+        ('co2_saved', 'kg CO2 saved'),
+    ]
+    
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    metric = models.CharField(max_length=20, choices=METRICS)
+    target = models.FloatField(validators=[MinValueValidator(0.0)])
+    points = models.PositiveIntegerField(default=0)
+    
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    is_active = models.BooleanField(default=True)
+    is_closed = models.BooleanField(default=False, help_text="Set once the window has ended and progress is final")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['ends_at', 'id']
+        indexes = [
+            models.Index(fields=['is_closed', 'starts_at', 'ends_at'], name='ecoscore_challenge_open_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.title} ({self.starts_at:%Y-%m-%d} - {self.ends_at:%Y-%m-%d})"
+
+
+class ChallengeProgress(models.Model):
+    """
+    A user's running progress counter for one challenge
+    """
+    from django.contrib.auth import get_user_model
+    User = get_user_model()
+    
+    challenge = models.ForeignKey(EcoChallenge, on_delete=models.CASCADE, related_name='progress')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='eco_challenge_progress')
+    progress = models.FloatField(default=0.0)
+    is_completed = models.BooleanField(default=False)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['challenge', 'user']
+    
+    def __str__(self):
+        return f"{self.user.email} - {self.challenge.title}: {self.progress:g}/{self.challenge.target:g}"
+
+
+class ParetoFrontierPoint(models.Model):
+    """
+    A product that no other product in its category beats on both price and EcoScore
+    """
+    CATALOGS = [
+        ('product', 'Catalog Product'),
+        ('merchant_product', 'Merchant Product'),
+    ]
+    
+    catalog = models.CharField(max_length=20, choices=CATALOGS)
+    category = models.CharField(max_length=100, help_text="Lowercased category name")
+    subcategory = models.CharField(max_length=100, blank=True, help_text="Blank for the frontier of the whole category")
+    
+    product = models.ForeignKey('ecommerce.Product', on_delete=models.CASCADE, related_name='frontier_points', null=True, blank=True)
+    merchant_product = models.ForeignKey(MerchantProduct, on_delete=models.CASCADE, related_name='frontier_points', null=True, blank=True)
+    
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    score_value = models.FloatField()
+    score_grade = models.CharField(max_length=1, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['price']
+        indexes = [
+            models.Index(fields=['catalog', 'category', 'subcategory', 'price'], name='ecoscore_frontier_idx'),
+        ]
+    
+    def __str__(self):
+        group = f"{self.category}/{self.subcategory}" if self.subcategory else self.category
+        return f"{group}: {self.price} - EcoScore {self.score_value:.1f}"
\ No newline at end of file
@@ -4,7 +4,8 @@ Serializers for EcoScore app
 from rest_framework import serializers
 from .models import (
     EcoInventProcess, ProductEcoMapping, EcoScoreBenchmark, 
-    EcoScore, EcoScoreHistory, UserEcoAchievement
+    EcoScore, EcoScoreHistory, EcoScoreUncertainty, UserEcoAchievement,
+    EcoChallenge, ChallengeProgress, ParetoFrontierPoint
 )
 from products.models import Product
 from merchants.models import MerchantProduct
@@ -17,7 +18,7 @@ class EcoInventProcessSerializer(serializers.ModelSerializer):
         model = EcoInventProcess
         fields = [
             'id', 'name', 'code', 'category', 'subcategory', 
-            'unit', 'description', 'location', 'is_active',
+            'unit', 'description', 'location', 'default_impact', 'geometric_std_dev', 'is_active',
             'created_at', 'updated_at'
         ]
 
@@ -83,6 +84,23 @@ class EcoScoreSerializer(serializers.ModelSerializer):
         return None
 
 
+class EcoScoreUncertaintySerializer(serializers.ModelSerializer):
+    """Serializer for EcoScoreUncertainty"""
+    process_name = serializers.CharField(source='ecoinvent_process.name', read_only=True)
+    process_code = serializers.CharField(source='ecoinvent_process.code', read_only=True)
+    benchmark_category = serializers.CharField(source='benchmark.category', read_only=True)
+    
+    class Meta:
+        model = EcoScoreUncertainty
+        fields = [
+            'id', 'ecoinvent_process', 'process_name', 'process_code',
+            'benchmark', 'benchmark_category', 'iterations', 'impact_value',
+            'geometric_std_dev', 'impact_p5', 'impact_p50', 'impact_p95',
+            'score_p5', 'score_p50', 'score_p95', 'grade_probabilities',
+            'most_likely_grade', 'calculated_at'
+        ]
+
+
 class EcoScoreHistorySerializer(serializers.ModelSerializer):
     """Serializer for EcoScoreHistory"""
     product_name = serializers.SerializerMethodField()
@@ -92,7 +110,7 @@ class EcoScoreHistorySerializer(serializers.ModelSerializer):
         fields = [
             'id', 'product', 'merchant_product', 'old_score', 'new_score',
             'old_grade', 'new_grade', 'change_reason', 'change_notes',
-            'product_name', 'created_at'
+            'is_compacted', 'product_name', 'created_at'
         ]
     
     def get_product_name(self, obj):
@@ -173,6 +191,56 @@ class MerchantProductEcoScoreSummarySerializer(serializers.ModelSerializer):
         return None
 
 
+class ChallengeProgressSerializer(serializers.ModelSerializer):
+    """Serializer for a user's ChallengeProgress"""
+    target = serializers.FloatField(source='challenge.target', read_only=True)
+    percent_complete = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ChallengeProgress
+        fields = ['challenge', 'progress', 'target', 'percent_complete', 'is_completed', 'completed_at']
+    
+    def get_percent_complete(self, obj):
+        if not obj.challenge.target:
+            return 100.0
+        return round(min(obj.progress / obj.challenge.target, 1.0) * 100, 1)
+
+
+class EcoChallengeSerializer(serializers.ModelSerializer):
+    """Serializer for EcoChallenge with the requesting user's progress"""
+    metric_display = serializers.CharField(source='get_metric_display', read_only=True)
+    my_progress = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = EcoChallenge
+        fields = [
+            'id', 'title', 'description', 'metric', 'metric_display', 'target',
+            'points', 'starts_at', 'ends_at', 'is_closed', 'my_progress'
+        ]
+    
+    def get_my_progress(self, obj):
+        progress = self.context.get('progress', {}).get(obj.id)
+        if progress is None:
+            return None
+        return ChallengeProgressSerializer(progress).data
+
+
+class ParetoFrontierPointSerializer(serializers.ModelSerializer):
+    """Serializer for a point on a category's price vs EcoScore frontier"""
+    name = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ParetoFrontierPoint
+        fields = [
+            'id', 'catalog', 'category', 'subcategory', 'product', 'merchant_product',
+            'name', 'price', 'score_value', 'score_grade', 'updated_at'
+        ]
+    
+    def get_name(self, obj):
+        product = obj.product if obj.catalog == 'product' else obj.merchant_product
+        return product.name if product else None
+
+
 class EcoScoreLeaderboardSerializer(serializers.Serializer):
     """Serializer for EcoScore leaderboard"""
     user_id = serializers.IntegerField()
@@ -1,18 +1,51 @@
 """
 EcoScore calculation services using Brightway2 and ecoinvent data
 """
+import csv
+import gzip
+import hashlib
+import heapq
+import json
 import logging
-from typing import Optional, Dict, Any, Tuple
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Sequence, Tuple
 from decimal import Decimal
+from io import BytesIO
+from xml.sax.saxutils import escape
+import numpy as np
+from scipy import sparse
+from PIL import Image, ImageDraw, ImageFont
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import (
+    Avg, Case, Count, DateField, F, FloatField, IntegerField, Max, OuterRef, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Cast, Coalesce, Lower, TruncDay, TruncMonth, TruncWeek
 from django.utils import timezone
-from django.db import transaction
+from django.db import IntegrityError, transaction
 
 from .models import (
     EcoInventProcess, ProductEcoMapping, EcoScoreBenchmark, 
-    EcoScore, EcoScoreHistory
+    EcoScore, EcoScoreHistory, EcoScoreUncertainty, UserEcoAchievement, EcoLeaderboardEntry,
+    EcoChallenge, ChallengeProgress, ParetoFrontierPoint
 )
+from .achievement_rules import ACHIEVEMENT_RULES, rule_is_met
 from products.models import Product
 from merchants.models import MerchantProduct
+from customers.models import CustomerOrder, OrderItem
+from ecommerce.models import EcoImpact, Product as EcommerceProduct
 
 logger = logging.getLogger(__name__)
 
@@ -78,6 +111,14 @@ class LCACalculationService:
         }
         
         if impact == 0.0:
+            # Prefer the catalog's default impact when one was loaded
+            default_impact = EcoInventProcess.objects.filter(
+                code=ecoinvent_code, default_impact__isnull=False
+            ).values_list('default_impact', flat=True).first()
+            if default_impact is not None:
+                logger.warning(f"Using catalog default impact {default_impact} for {ecoinvent_code}")
+                return default_impact * functional_unit
+            
             # Try to determine fallback based on process name
             process_name = ecoinvent_code.lower()
             for key, fallback_value in fallback_impacts.items():
@@ -143,6 +184,21 @@ class EcoScoreCalculationService:
         
         return round(score, 1), grade
     
+    @staticmethod
+    def get_category_benchmarks() -> Dict[str, float]:
+        """Active benchmark impact keyed by lowercased category name"""
+        return {
+            category.lower(): impact
+            for category, impact in EcoScoreBenchmark.objects.filter(is_active=True)
+            .values_list('category', 'benchmark_impact')
+        }
+    
+    def score_against_benchmark(self, raw_impact, benchmark_impact: Optional[float]) -> Optional[Tuple[float, str]]:
+        """EcoScore and grade of a catalog product's stored impact, or None when it cannot be scored"""
+        if raw_impact is None or not benchmark_impact:
+            return None
+        return self.calculate_ecoscore(float(raw_impact) / benchmark_impact)
+    
     def get_benchmark_for_product(self, product) -> Optional[EcoScoreBenchmark]:
         """
         Get appropriate benchmark for a product based on its category
@@ -334,93 +390,1820 @@ class EcoScoreGamificationService:
     Service for handling gamification and achievements
     """
     
-    def __init__(self):
-        pass
+    def __init__(self, chunk_size: int = 1000):
+        self.chunk_size = chunk_size
+    
+    def get_user_metrics(self, user_ids: Sequence[int]) -> Dict[int, Dict[str, float]]:
+        """
+        Aggregate the purchase metrics used by ACHIEVEMENT_RULES for many users in one query
+        """
+        graded = ~Q(ecoscore_grade='')
+        high_grade = Q(ecoscore_grade__in=['A', 'B'])
+        rows = (
+            OrderItem.objects.filter(
+                order__customer__user_id__in=user_ids,
+                order__order_status__in=OrderEcoImpactService.CONFIRMED_STATUSES,
+            )
+            .values('order__customer__user_id')
+            .annotate(
+                purchase_count=Sum('quantity'),
+                order_count=Count('order', distinct=True),
+                co2_saved=Sum('co2_saved'),
+                graded_count=Coalesce(Sum('quantity', filter=graded), 0),
+                a_grade_count=Coalesce(Sum('quantity', filter=Q(ecoscore_grade='A')), 0),
+                high_grade_count=Coalesce(Sum('quantity', filter=high_grade), 0),
+            )
+        )
+        
+        metrics = {}
+        for row in rows:
+            graded_count = row['graded_count']
+            metrics[row['order__customer__user_id']] = {
+                'purchase_count': row['purchase_count'],
+                'order_count': row['order_count'],
+                'co2_saved': float(row['co2_saved'] or 0),
+                'high_grade_count': row['high_grade_count'],
+                'a_grade_share': row['a_grade_count'] / graded_count if graded_count else 0.0,
+                'high_grade_share': row['high_grade_count'] / graded_count if graded_count else 0.0,
+            }
+        return metrics
+    
+    def evaluate_users(self, user_ids: Sequence[int]) -> int:
+        """
+        Evaluate every achievement rule for the given users and upsert earned achievements
+        
+        Returns:
+            Number of achievements awarded or refreshed
+        """
+        now = timezone.now()
+        achievements = []
+        for user_id, metrics in self.get_user_metrics(user_ids).items():
+            for rule in ACHIEVEMENT_RULES:
+                if not rule_is_met(rule, metrics):
+                    continue
+                achievements.append(UserEcoAchievement(
+                    user_id=user_id,
+                    achievement_type=rule['type'],
+                    achievement_name=rule['name'],
+                    description=rule['description'],
+                    eco_score_threshold=rule['eco_score_threshold'],
+                    purchase_count_threshold=rule['min_purchases'],
+                    total_co2_saved=metrics['co2_saved'],
+                    is_earned=True,
+                    earned_at=now,
+                    badge_icon=rule['badge_icon'],
+                    badge_color=rule['badge_color'],
+                ))
+        
+        # earned_at is left out of the update so existing achievements keep their original date
+        UserEcoAchievement.objects.bulk_create(
+            achievements,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['user', 'achievement_type'],
+            update_fields=[
+                'achievement_name', 'description', 'eco_score_threshold',
+                'purchase_count_threshold', 'total_co2_saved', 'is_earned',
+                'badge_icon', 'badge_color', 'updated_at'
+            ],
+        )
+        return len(achievements)
+    
+    def check_achievements(self, user) -> int:
+        """Evaluate achievements for a single user from their confirmed orders"""
+        return self.evaluate_users([user.id])
     
-    def check_achievements(self, user, cart_items):
+    def backfill(self) -> Iterator[Tuple[int, int]]:
+        """Evaluate all users in id-ordered chunks, yielding (users, achievements) per chunk"""
+        user_model = get_user_model()
+        last_id = 0
+        while True:
+            user_ids = list(
+                user_model.objects.filter(id__gt=last_id)
+                .order_by('id').values_list('id', flat=True)[:self.chunk_size]
+            )
+            if not user_ids:
+                break
+            last_id = user_ids[-1]
+            yield len(user_ids), self.evaluate_users(user_ids)
+
+
+class EcoScoreHistoryRetentionService:
+    """
+    Service for compacting old EcoScore history rows
+    
+    History older than the retention window is downsampled to one row per
+    product per period. The surviving row keeps the first old score/grade and
+    the last new score/grade of the period, so grade transitions stay visible.
+    """
+    
+    PERIOD_TRUNCATORS = {
+        'day': TruncDay,
+        'week': TruncWeek,
+        'month': TruncMonth,
+    }
+    OWNER_FIELDS = ('product_id', 'merchant_product_id')
+    ROW_FIELDS = [
+        'id', 'product_id', 'merchant_product_id', 'old_score', 'new_score',
+        'old_grade', 'new_grade', 'change_reason', 'change_notes',
+        'is_compacted', 'created_at'
+    ]
+    
+    def __init__(self, retention_days: Optional[int] = None, period: Optional[str] = None,
+                 batch_size: int = 500):
+        self.retention_days = (
+            retention_days if retention_days is not None
+            else settings.ECOSCORE_HISTORY_RETENTION_DAYS
+        )
+        self.period = period or settings.ECOSCORE_HISTORY_COMPACTION_PERIOD
+        if self.period not in self.PERIOD_TRUNCATORS:
+            raise ValueError(
+                f"Unsupported compaction period '{self.period}', "
+                f"expected one of {', '.join(self.PERIOD_TRUNCATORS)}"
+            )
+        self.batch_size = batch_size
+    
+    def get_cutoff(self):
+        """Rows created before this moment are eligible for compaction"""
+        return timezone.now() - timedelta(days=self.retention_days)
+    
+    def compact(self, archive_path: Optional[str] = None, dry_run: bool = False) -> Dict[str, int]:
         """
-        Check and award achievements based on cart items
+        Compact history rows older than the retention window
         
         Args:
-            user: User instance
-            cart_items: List of cart items with EcoScore data
+            archive_path: Optional path of a gzip JSONL file receiving every row
+                that is merged or removed, written before the row is changed
+            dry_run: Only count what would be compacted
+            
+        Returns:
+            Dictionary with scanned, groups, compacted and deleted counts
         """
+        stats = {'scanned': 0, 'groups': 0, 'compacted': 0, 'deleted': 0}
+        old_rows = EcoScoreHistory.objects.filter(created_at__lt=self.get_cutoff())
+        truncate = self.PERIOD_TRUNCATORS[self.period]
+        
+        archive = None
+        if archive_path and not dry_run:
+            archive = gzip.open(archive_path, 'wt', encoding='utf-8')
+        
         try:
-            from .models import UserEcoAchievement
+            for owner_field in self.OWNER_FIELDS:
+                # Owners are loaded in chunks so the table being rewritten is
+                # never iterated with an open cursor
+                owner_ids = list(
+                    old_rows.filter(**{f'{owner_field}__isnull': False})
+                    .order_by(owner_field)
+                    .values_list(owner_field, flat=True)
+                    .distinct()
+                )
+                for start in range(0, len(owner_ids), self.batch_size):
+                    chunk = owner_ids[start:start + self.batch_size]
+                    rows = list(
+                        old_rows.filter(**{f'{owner_field}__in': chunk})
+                        .annotate(period_start=truncate('created_at'))
+                        .order_by(owner_field, 'period_start', 'created_at', 'id')
+                        .values(*self.ROW_FIELDS, 'period_start')
+                    )
+                    stats['scanned'] += len(rows)
+                    self._compact_rows(rows, owner_field, archive, dry_run, stats)
+        finally:
+            if archive:
+                archive.close()
+        
+        logger.info(
+            f"Compacted EcoScore history older than {self.retention_days} days: "
+            f"{stats['compacted']} rows kept for {stats['groups']} periods, {stats['deleted']} deleted"
+        )
+        return stats
+    
+    def _compact_rows(self, rows, owner_field: str, archive, dry_run: bool, stats: Dict[str, int]):
+        """Merge each (owner, period) group of rows into its first row"""
+        updates = []
+        delete_ids = []
+        
+        for (owner_id, period_start), group in groupby(rows, key=itemgetter(owner_field, 'period_start')):
+            group = list(group)
+            if len(group) < 2:
+                continue
             
-            # Calculate cart metrics
-            total_items = len(cart_items)
-            eco_score_a_items = sum(1 for item in cart_items if item.get('ecoscore_grade') == 'A')
-            eco_score_b_items = sum(1 for item in cart_items if item.get('ecoscore_grade') == 'B')
-            high_eco_items = eco_score_a_items + eco_score_b_items
+            first, last = group[0], group[-1]
+            stats['groups'] += 1
+            stats['compacted'] += 1
+            stats['deleted'] += len(group) - 1
+            if dry_run:
+                continue
             
-            # Calculate total CO2 saved (compared to average products)
-            total_co2_saved = sum(
-                item.get('co2_saved', 0) for item in cart_items
+            if archive:
+                for row in group:
+                    archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+            
+            updates.append(EcoScoreHistory(
+                id=first['id'],
+                new_score=last['new_score'],
+                new_grade=last['new_grade'],
+                change_reason='Compacted history',
+                change_notes=(
+                    f"{len(group)} changes between {first['created_at']:%Y-%m-%d} and "
+                    f"{last['created_at']:%Y-%m-%d} compacted by {self.period}"
+                ),
+                is_compacted=True,
+            ))
+            delete_ids.extend(row['id'] for row in group[1:])
+        
+        if not updates:
+            return
+        
+        with transaction.atomic():
+            EcoScoreHistory.objects.bulk_update(
+                updates,
+                ['new_score', 'new_grade', 'change_reason', 'change_notes', 'is_compacted'],
+                batch_size=self.batch_size
             )
+            for start in range(0, len(delete_ids), self.batch_size):
+                EcoScoreHistory.objects.filter(
+                    id__in=delete_ids[start:start + self.batch_size]
+                ).delete()
+
+
+class EcoScoreUncertaintyService:
+    """
+    Service for Monte Carlo uncertainty analysis of EcoScores
+    
+    Impacts are sampled from lognormal distributions centred on the
+    deterministic value, as ecoinvent does for its exchanges. All distinct
+    (process, benchmark) pairs are simulated together: the parameter vectors
+    are built once and every batch of iterations is a single matrix draw.
+    """
+    
+    DEFAULT_GEOMETRIC_STD_DEV = 1.5
+    PERCENTILES = (5, 50, 95)
+    GRADES = ('E', 'D', 'C', 'B', 'A')
+    # Normalized impact at or below which each better grade starts (D, C, B, A),
+    # equivalent to the 20/40/60/80 score boundaries in calculate_ecoscore
+    NORMALIZED_GRADE_BOUNDARIES = (0.2, 0.4, 0.6, 0.8)
+    
+    def __init__(self, iterations: int = 1000, batch_size: int = 250, block_size: int = 4096,
+                 seed: Optional[int] = None, default_geometric_std_dev: Optional[float] = None):
+        self.iterations = iterations
+        self.batch_size = batch_size
+        self.block_size = block_size
+        self.seed = seed
+        self.default_geometric_std_dev = default_geometric_std_dev or self.DEFAULT_GEOMETRIC_STD_DEV
+    
+    def get_simulation_inputs(self) -> List[Dict[str, Any]]:
+        """Collect one row per distinct (process, benchmark) pair with a positive impact"""
+        return list(
+            EcoScore.objects.filter(raw_impact__gt=0, benchmark__benchmark_impact__gt=0)
+            .values('ecoinvent_process_id', 'benchmark_id')
+            .annotate(
+                impact_value=Avg('raw_impact'),
+                process_geometric_std_dev=Max('ecoinvent_process__geometric_std_dev'),
+                benchmark_impact=Max('benchmark__benchmark_impact'),
+            )
+            .order_by('ecoinvent_process_id', 'benchmark_id')
+        )
+    
+    def simulate(self, impact_values: Sequence[float], geometric_std_devs: Sequence[float],
+                 benchmark_impacts: Sequence[float]) -> Dict[str, Any]:
+        """
+        Sample impacts for many pairs at once
+        
+        Args:
+            impact_values: Deterministic impact per pair (distribution median)
+            geometric_std_devs: Geometric standard deviation per pair
+            benchmark_impacts: Benchmark impact per pair used for normalization
             
-            # Check Green Shopper achievement (70%+ high eco items)
-            if total_items > 0 and (high_eco_items / total_items) >= 0.7:
-                self._award_achievement(
-                    user, 'green_shopper', 'Green Shopper',
-                    'You consistently choose environmentally friendly products!',
-                    eco_score_threshold=70.0,
-                    purchase_count_threshold=1,
-                    total_co2_saved=total_co2_saved
-                )
+        Returns:
+            Dictionary with impact_percentiles and score_percentiles arrays of
+            shape (3, n) and a grade_probabilities array of shape (n, 5)
+        """
+        mu = np.log(np.asarray(impact_values, dtype=np.float64))
+        sigma = np.log(np.asarray(geometric_std_devs, dtype=np.float64))
+        benchmark = np.asarray(benchmark_impacts, dtype=np.float64)
+        boundaries = np.asarray(self.NORMALIZED_GRADE_BOUNDARIES)
+        pair_count = mu.shape[0]
+        grade_count = len(self.GRADES)
+        
+        rng = np.random.default_rng(self.seed)
+        impact_percentiles = np.empty((len(self.PERCENTILES), pair_count))
+        grade_probabilities = np.empty((pair_count, grade_count))
+        
+        for start in range(0, pair_count, self.block_size):
+            stop = min(start + self.block_size, pair_count)
+            width = stop - start
+            block_mu = mu[start:stop]
+            block_sigma = sigma[start:stop]
             
-            # Check Eco Champion achievement (90%+ A grade items)
-            if total_items > 0 and (eco_score_a_items / total_items) >= 0.9:
-                self._award_achievement(
-                    user, 'eco_champion', 'Eco Champion',
-                    'You are a true champion of sustainability!',
-                    eco_score_threshold=90.0,
-                    purchase_count_threshold=1,
-                    total_co2_saved=total_co2_saved
-                )
+            # Iterations are rows so every batch is a contiguous slice that
+            # the generator fills in place
+            samples = np.empty((self.iterations, width))
+            for batch_start in range(0, self.iterations, self.batch_size):
+                batch = samples[batch_start:batch_start + self.batch_size]
+                rng.standard_normal(out=batch)
+                batch *= block_sigma
+                batch += block_mu
+                np.exp(batch, out=batch)
             
-            # Check Carbon Reducer achievement (significant CO2 savings)
-            if total_co2_saved >= 10.0:  # 10 kg CO2 saved
-                self._award_achievement(
-                    user, 'carbon_reducer', 'Carbon Reducer',
-                    f'You have saved {total_co2_saved:.1f} kg of CO2 through your choices!',
-                    eco_score_threshold=0.0,
-                    purchase_count_threshold=1,
-                    total_co2_saved=total_co2_saved
-                )
-                
-        except Exception as e:
-            logger.error(f"Error checking achievements for user {user.email}: {str(e)}")
+            impact_percentiles[:, start:stop] = np.percentile(samples, self.PERCENTILES, axis=0)
+            
+            # Normalize in place and bucket every sample into a grade index (E=0 .. A=4)
+            samples /= benchmark[start:stop]
+            grade_index = (grade_count - 1) - np.searchsorted(boundaries, samples, side='left')
+            grade_index += np.arange(width) * grade_count
+            counts = np.bincount(grade_index.ravel(), minlength=width * grade_count)
+            grade_probabilities[start:stop] = counts.reshape(width, grade_count) / self.iterations
+        
+        # The score is a decreasing transform of the impact, so its percentiles
+        # follow from the impact percentiles in reverse order
+        normalized = impact_percentiles[::-1] / benchmark
+        score_percentiles = np.clip(100.0 - normalized * 100.0, 0.0, 100.0)
+        
+        return {
+            'impact_percentiles': impact_percentiles,
+            'score_percentiles': score_percentiles,
+            'grade_probabilities': grade_probabilities,
+        }
     
-    def _award_achievement(self, user, achievement_type: str, name: str, description: str,
-                          eco_score_threshold: float, purchase_count_threshold: int,
-                          total_co2_saved: float):
-        """Award an achievement to a user"""
-        try:
-            from .models import UserEcoAchievement
-            
-            achievement, created = UserEcoAchievement.objects.get_or_create(
-                user=user,
-                achievement_type=achievement_type,
-                defaults={
-                    'achievement_name': name,
-                    'description': description,
-                    'eco_score_threshold': eco_score_threshold,
-                    'purchase_count_threshold': purchase_count_threshold,
-                    'total_co2_saved': total_co2_saved,
-                    'is_earned': True,
-                    'earned_at': timezone.now(),
-                    'badge_icon': '🌱',
-                    'badge_color': '#4CAF50'
-                }
+    def run(self) -> Dict[str, Any]:
+        """
+        Simulate every distinct (process, benchmark) pair and store the results
+        
+        Returns:
+            Dictionary with pairs, iterations, samples and seconds spent sampling
+        """
+        inputs = self.get_simulation_inputs()
+        stats = {'pairs': len(inputs), 'iterations': self.iterations, 'samples': 0, 'seconds': 0.0}
+        if not inputs:
+            return stats
+        
+        geometric_std_devs = [
+            row['process_geometric_std_dev'] or self.default_geometric_std_dev for row in inputs
+        ]
+        started = time.perf_counter()
+        results = self.simulate(
+            [row['impact_value'] for row in inputs],
+            geometric_std_devs,
+            [row['benchmark_impact'] for row in inputs],
+        )
+        stats['seconds'] = time.perf_counter() - started
+        stats['samples'] = len(inputs) * self.iterations
+        
+        self._store_results(inputs, geometric_std_devs, results)
+        logger.info(
+            f"Simulated {stats['pairs']} process/benchmark pairs x {self.iterations} iterations "
+            f"in {stats['seconds']:.2f}s"
+        )
+        return stats
+    
+    def _store_results(self, inputs: List[Dict[str, Any]], geometric_std_devs: List[float],
+                       results: Dict[str, Any]):
+        """Upsert one EcoScoreUncertainty row per simulated pair"""
+        impact_pct = results['impact_percentiles']
+        score_pct = results['score_percentiles']
+        grade_probabilities = results['grade_probabilities']
+        
+        rows = []
+        for index, row in enumerate(inputs):
+            probabilities = grade_probabilities[index]
+            rows.append(EcoScoreUncertainty(
+                ecoinvent_process_id=row['ecoinvent_process_id'],
+                benchmark_id=row['benchmark_id'],
+                iterations=self.iterations,
+                impact_value=row['impact_value'],
+                geometric_std_dev=geometric_std_devs[index],
+                impact_p5=float(impact_pct[0, index]),
+                impact_p50=float(impact_pct[1, index]),
+                impact_p95=float(impact_pct[2, index]),
+                score_p5=round(float(score_pct[0, index]), 1),
+                score_p50=round(float(score_pct[1, index]), 1),
+                score_p95=round(float(score_pct[2, index]), 1),
+                grade_probabilities={
+                    grade: round(float(probability), 4)
+                    for grade, probability in zip(self.GRADES, probabilities)
+                },
+                most_likely_grade=self.GRADES[int(probabilities.argmax())],
+            ))
+        
+        EcoScoreUncertainty.objects.bulk_create(
+            rows,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['ecoinvent_process', 'benchmark'],
+            update_fields=[
+                'iterations', 'impact_value', 'geometric_std_dev',
+                'impact_p5', 'impact_p50', 'impact_p95',
+                'score_p5', 'score_p50', 'score_p95',
+                'grade_probabilities', 'most_likely_grade', 'calculated_at'
+            ],
+        )
+
+
+class EcoInventCatalogLoader:
+    """
+    Stream ecoinvent process or benchmark catalogs from CSV/JSONL and upsert them in chunks
+    """
+    
+    CATALOGS = {
+        'processes': {
+            'model': EcoInventProcess,
+            'key': 'code',
+            'required': ['code', 'name', 'category', 'unit'],
+            'defaults': {
+                'subcategory': '',
+                'description': '',
+                'location': 'GLO',
+                'default_impact': None,
+                'geometric_std_dev': None,
+                'is_active': True,
+            },
+            'floats': {'default_impact': 0.0, 'geometric_std_dev': 1.0},
+        },
+        'benchmarks': {
+            'model': EcoScoreBenchmark,
+            'key': 'category',
+            'required': ['category', 'benchmark_impact', 'benchmark_unit', 'source'],
+            'defaults': {
+                'subcategory': '',
+                'description': '',
+                'is_active': True,
+            },
+            'floats': {'benchmark_impact': 0.0},
+        },
+    }
+    MAX_REPORTED_ERRORS = 20
+    
+    def __init__(self, kind: str = 'processes', chunk_size: int = 1000):
+        if kind not in self.CATALOGS:
+            raise ValueError(f"Unsupported catalog '{kind}', expected one of {sorted(self.CATALOGS)}")
+        self.kind = kind
+        self.spec = self.CATALOGS[kind]
+        self.model = self.spec['model']
+        self.key = self.spec['key']
+        self.fields = self.spec['required'] + list(self.spec['defaults'])
+        self.chunk_size = chunk_size
+    
+    @staticmethod
+    def iter_file(path: str, file_format: Optional[str] = None) -> Iterator[Tuple[int, Any]]:
+        """
+        Yield (line number, raw row) pairs from a CSV or JSONL file without loading it into memory
+        
+        A line that cannot be parsed is yielded as a ValueError instead of a row, so one
+        malformed line does not abort the rest of the file
+        """
+        if file_format is None:
+            file_format = 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+        
+        with open(path, newline='', encoding='utf-8') as handle:
+            if file_format == 'csv':
+                reader = csv.DictReader(handle)
+                try:
+                    reader.fieldnames
+                except csv.Error as e:
+                    raise ValueError(f"unreadable header: {e}")
+                while True:
+                    try:
+                        row = next(reader)
+                    except StopIteration:
+                        break
+                    except csv.Error as e:
+                        # The reader has not counted the line it failed on
+                        yield reader.line_num + 1, ValueError(str(e))
+                        continue
+                    yield reader.line_num, row
+            elif file_format == 'jsonl':
+                for line_number, line in enumerate(handle, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield line_number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield line_number, ValueError(f"invalid JSON ({e.msg} at column {e.colno})")
+            else:
+                raise ValueError(f"Unsupported file format '{file_format}'")
+    
+    def load(self, rows: Iterable[Dict[str, Any]], dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Validate and upsert rows, returning created/updated/unchanged/invalid counts
+        """
+        return self._load(enumerate(rows, start=1), 'row', dry_run)
+    
+    def load_file(self, path: str, file_format: Optional[str] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Validate and upsert the rows of a CSV or JSONL file, reporting invalid and
+        unparseable rows by their line in the file
+        """
+        return self._load(self.iter_file(path, file_format), 'line', dry_run)
+    
+    def _load(self, rows: Iterable[Tuple[int, Any]], label: str, dry_run: bool) -> Dict[str, Any]:
+        stats = {'created': 0, 'updated': 0, 'unchanged': 0, 'invalid': 0, 'errors': []}
+        seen = set()
+        chunk = []
+        
+        for number, raw in rows:
+            try:
+                if isinstance(raw, ValueError):
+                    raise raw
+                row = self.clean_row(raw)
+                if row[self.key] in seen:
+                    raise ValueError(f"duplicate {self.key} '{row[self.key]}'")
+            except (ValueError, TypeError) as e:
+                stats['invalid'] += 1
+                if len(stats['errors']) < self.MAX_REPORTED_ERRORS:
+                    stats['errors'].append(f"{label} {number}: {e}")
+                continue
+            
+            seen.add(row[self.key])
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                self._upsert_chunk(chunk, dry_run, stats)
+                chunk = []
+        
+        if chunk:
+            self._upsert_chunk(chunk, dry_run, stats)
+        
+        return stats
+    
+    def clean_row(self, raw: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Normalize a raw row and raise ValueError if it is not loadable
+        
+        Optional columns absent from the file are left out of the row, so updates
+        keep their stored values and defaults are only applied on insert
+        """
+        if not isinstance(raw, dict):
+            raise ValueError("row is not an object")
+        
+        row = {}
+        for field_name in self.fields:
+            if field_name not in raw and field_name not in self.spec['required']:
+                continue
+            value = raw.get(field_name)
+            if isinstance(value, str):
+                value = value.strip()
+            
+            if value in (None, ''):
+                if field_name in self.spec['required']:
+                    raise ValueError(f"missing {field_name}")
+                row[field_name] = self.spec['defaults'][field_name]
+                continue
+            
+            if field_name in self.spec['floats']:
+                value = float(value)
+                if not value >= self.spec['floats'][field_name]:
+                    raise ValueError(f"{field_name} must be at least {self.spec['floats'][field_name]}")
+            elif field_name == 'is_active':
+                if isinstance(value, str):
+                    value = value.lower() not in ('0', 'false', 'no', 'n')
+                value = bool(value)
+            else:
+                value = str(value)
+                max_length = self.model._meta.get_field(field_name).max_length
+                if max_length and len(value) > max_length:
+                    raise ValueError(f"{field_name} longer than {max_length} characters")
+            
+            row[field_name] = value
+        return row
+    
+    def _upsert_chunk(self, chunk: List[Dict[str, Any]], dry_run: bool, stats: Dict[str, Any]):
+        """Diff a chunk against stored rows and write only new or changed ones"""
+        existing = self.model.objects.in_bulk(
+            [row[self.key] for row in chunk], field_name=self.key
+        )
+        
+        # Rows are grouped by the columns they carry, which is what their update may overwrite
+        changed = {}
+        for row in chunk:
+            current = existing.get(row[self.key])
+            if current is None:
+                stats['created'] += 1
+            elif any(getattr(current, name) != value for name, value in row.items()):
+                stats['updated'] += 1
+            else:
+                stats['unchanged'] += 1
+                continue
+            changed.setdefault(tuple(row), []).append(
+                self.model(**{**self.spec['defaults'], **row})
             )
+        
+        if dry_run:
+            return
+        for columns, objs in changed.items():
+            self.model.objects.bulk_create(
+                objs,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=[self.key],
+                update_fields=[name for name in columns if name != self.key] + ['updated_at'],
+            )
+
+
+class EcoInventProcessSearchIndex:
+    """
+    In-memory trigram index over active ecoinvent processes, rebuilt when the catalog changes
+    """
+    
+    FIELD_WEIGHTS = {'name': 1.0, 'code': 0.8, 'category': 0.4}
+    MIN_SIMILARITY = 0.3
+    MAX_RESULTS = 1000
+    
+    _current = None
+    _lock = threading.Lock()
+    
+    def __init__(self, rows: List[Dict[str, Any]], version: Tuple):
+        self.version = version
+        self.ids = [row['id'] for row in rows]
+        self.fields = {}
+        for field_name in self.FIELD_WEIGHTS:
+            postings = defaultdict(list)
+            sizes = np.zeros(len(rows), dtype=np.int32)
+            for position, row in enumerate(rows):
+                grams = self.trigrams(row[field_name])
+                sizes[position] = len(grams)
+                for gram in grams:
+                    postings[gram].append(position)
+            self.fields[field_name] = (
+                {gram: np.array(positions, dtype=np.int32) for gram, positions in postings.items()},
+                sizes,
+            )
+        self._grouped = None
+    
+    @staticmethod
+    def trigrams(text: str) -> set:
+        """Split text into padded word trigrams, as pg_trgm does"""
+        grams = set()
+        for word in re.findall(r'[a-z0-9]+', text.lower()):
+            padded = f'  {word} '
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return grams
+    
+    @staticmethod
+    def get_catalog_version() -> Tuple:
+        """Cheap fingerprint that changes whenever processes are added, edited or removed"""
+        stats = EcoInventProcess.objects.aggregate(
+            latest=Max('updated_at'),
+            total=Count('id'),
+            active=Count('id', filter=Q(is_active=True)),
+        )
+        return stats['latest'], stats['total'], stats['active']
+    
+    @classmethod
+    def current(cls) -> 'EcoInventProcessSearchIndex':
+        """Return the index for the current catalog, rebuilding it if the catalog changed"""
+        version = cls.get_catalog_version()
+        index = cls._current
+        if index is None or index.version != version:
+            with cls._lock:
+                if cls._current is None or cls._current.version != version:
+                    rows = list(
+                        EcoInventProcess.objects.filter(is_active=True)
+                        .values('id', 'name', 'code', 'category')
+                    )
+                    cls._current = cls(rows, version)
+                index = cls._current
+        return index
+    
+    def search(self, query: str, min_similarity: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        Rank processes against the query
+        
+        Returns:
+            List of (process id, score) pairs, best match first
+        """
+        grams = self.trigrams(query)
+        if not grams or not self.ids:
+            return []
+        if min_similarity is None:
+            min_similarity = self.MIN_SIMILARITY
+        
+        scores = np.zeros(len(self.ids))
+        for field_name, weight in self.FIELD_WEIGHTS.items():
+            postings, sizes = self.fields[field_name]
+            hits = [postings[gram] for gram in grams if gram in postings]
+            if not hits:
+                continue
+            shared = np.bincount(np.concatenate(hits), minlength=len(self.ids))
+            # Mostly how much of the query is found, with shorter fields winning ties
+            coverage = shared / len(grams)
+            jaccard = shared / (len(grams) + sizes - shared)
+            np.maximum(scores, weight * (0.7 * coverage + 0.3 * jaccard), out=scores)
+        
+        matches = np.flatnonzero(scores >= min_similarity)
+        ranked = matches[np.argsort(-scores[matches], kind='stable')][:self.MAX_RESULTS]
+        return [(self.ids[position], round(float(scores[position]), 3)) for position in ranked]
+    
+    def grouped(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Serialized active processes grouped by category, built once per catalog version"""
+        if self._grouped is None:
+            from .serializers import EcoInventProcessSerializer
             
-            if created:
-                logger.info(f"Awarded achievement '{name}' to user {user.email}")
+            grouped = {}
+            processes = EcoInventProcess.objects.filter(is_active=True)
+            for data in EcoInventProcessSerializer(processes, many=True).data:
+                grouped.setdefault(data['category'], []).append(data)
+            self._grouped = grouped
+        return self._grouped
+
+
+class ProcessMappingSuggestionService:
+    """
+    Suggest ecoinvent processes for products with hashed n-gram TF-IDF similarity
+    """
+    
+    N_FEATURES = 2 ** 18
+    DESCRIPTION_CHARS = 300
+    # Platt scaling used until enough existing mappings are available to fit it
+    DEFAULT_PLATT = (8.0, -4.0)
+    MIN_CALIBRATION_MAPPINGS = 20
+    
+    def __init__(self, top_k: int = 3, block_size: int = 256):
+        self.top_k = top_k
+        self.block_size = block_size
+        self.process_ids = []
+        self.process_matrix = None
+        self.idf = None
+        self.platt = self.DEFAULT_PLATT
+    
+    def _features(self, text: str) -> Dict[int, int]:
+        """Hash word and character trigram features of a text into column counts"""
+        counts = defaultdict(int)
+        for word in re.findall(r'[a-z0-9]+', text.lower()):
+            counts[zlib.crc32(f'w:{word}'.encode()) % self.N_FEATURES] += 1
+            padded = f' {word} '
+            for i in range(len(padded) - 2):
+                counts[zlib.crc32(padded[i:i + 3].encode()) % self.N_FEATURES] += 1
+        return counts
+    
+    def _vectorize(self, texts: Sequence[str]) -> sparse.csr_matrix:
+        """Build a sublinear term-frequency matrix with one row per text"""
+        indptr = [0]
+        indices = []
+        data = []
+        for text in texts:
+            counts = self._features(text)
+            indices.extend(counts.keys())
+            data.extend(counts.values())
+            indptr.append(len(indices))
+        
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+            shape=(len(texts), self.N_FEATURES),
+        )
+        matrix.data = 1.0 + np.log(matrix.data)
+        return matrix
+    
+    def _weight(self, matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Apply IDF weights and L2-normalize rows"""
+        matrix = matrix @ sparse.diags(self.idf)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix)
+    
+    @staticmethod
+    def process_text(process: Dict[str, Any]) -> str:
+        return ' '.join([process['name'], process['category'], process['subcategory']])
+    
+    @classmethod
+    def product_text(cls, product: Dict[str, Any]) -> str:
+        tags = product.get('tags') or []
+        return ' '.join([
+            product['name'],
+            product.get('category') or '',
+            product.get('subcategory') or '',
+            ' '.join(str(tag) for tag in tags) if isinstance(tags, list) else '',
+            (product.get('description') or '')[:cls.DESCRIPTION_CHARS],
+        ])
+    
+    def fit(self) -> 'ProcessMappingSuggestionService':
+        """Vectorize the active process catalog and calibrate confidences"""
+        processes = list(
+            EcoInventProcess.objects.filter(is_active=True)
+            .values('id', 'name', 'category', 'subcategory')
+        )
+        self.process_ids = [process['id'] for process in processes]
+        counts = self._vectorize([self.process_text(process) for process in processes])
+        
+        document_frequency = np.bincount(counts.indices, minlength=self.N_FEATURES)
+        self.idf = (np.log((1.0 + len(processes)) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        self.process_matrix = self._weight(counts).T.tocsr()
+        
+        self.platt = self.calibrate()
+        return self
+    
+    def similarities(self, texts: Sequence[str]) -> List[List[Tuple[int, float]]]:
+        """Top-k (process id, cosine similarity) pairs per text, best first"""
+        if self.process_matrix is None:
+            self.fit()
+        
+        results = []
+        if not self.process_ids:
+            return [[] for _ in texts]
+        
+        top_k = min(self.top_k, len(self.process_ids))
+        rows = np.arange(min(self.block_size, len(texts)))[:, None]
+        for start in range(0, len(texts), self.block_size):
+            block = self._weight(self._vectorize(texts[start:start + self.block_size]))
+            # Short texts share n-grams with most of the catalog, so the product is dense
+            scores = (block @ self.process_matrix).toarray()
+            block_rows = rows[:scores.shape[0]]
+            top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+            top_scores = scores[block_rows, top]
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            top, top_scores = top[block_rows, order], top_scores[block_rows, order]
+            for columns, values in zip(top, top_scores):
+                results.append([
+                    (self.process_ids[column], float(value))
+                    for column, value in zip(columns, values) if value > 0
+                ])
+        return results
+    
+    def confidence(self, similarity: float) -> float:
+        a, b = self.platt
+        return float(1.0 / (1.0 + np.exp(-(a * similarity + b))))
+    
+    def suggest(self, texts: Sequence[str]) -> List[List[Dict[str, Any]]]:
+        """Top-k suggestions with calibrated confidence for each text"""
+        return [
+            [
+                {
+                    'ecoinvent_process_id': process_id,
+                    'similarity': round(similarity, 4),
+                    'confidence': round(self.confidence(similarity), 4),
+                }
+                for process_id, similarity in ranked
+            ]
+            for ranked in self.similarities(texts)
+        ]
+    
+    def calibrate(self) -> Tuple[float, float]:
+        """
+        Fit Platt scaling on existing mappings: the mapped process is the positive
+        candidate and the other top-k candidates for the same product are negatives
+        """
+        mapped = list(
+            ProductEcoMapping.objects.filter(ecoinvent_process__is_active=True)
+            .values(
+                'ecoinvent_process_id', 'product__name', 'product__description', 'product__tags',
+                'product__category__name', 'product__subcategory__name',
+                'merchant_product__name', 'merchant_product__description', 'merchant_product__tags',
+                'merchant_product__category', 'merchant_product__subcategory',
+            )
+        )
+        if len(mapped) < self.MIN_CALIBRATION_MAPPINGS:
+            return self.DEFAULT_PLATT
+        
+        texts = []
+        for row in mapped:
+            if row['product__name'] is not None:
+                texts.append(self.product_text({
+                    'name': row['product__name'],
+                    'description': row['product__description'],
+                    'tags': row['product__tags'],
+                    'category': row['product__category__name'],
+                    'subcategory': row['product__subcategory__name'],
+                }))
             else:
-                # Update existing achievement
-                achievement.total_co2_saved += total_co2_saved
-                achievement.save()
+                texts.append(self.product_text({
+                    'name': row['merchant_product__name'] or '',
+                    'description': row['merchant_product__description'],
+                    'tags': row['merchant_product__tags'],
+                    'category': row['merchant_product__category'],
+                    'subcategory': row['merchant_product__subcategory'],
+                }))
+        
+        scores = []
+        labels = []
+        for row, ranked in zip(mapped, self.similarities(texts)):
+            for process_id, similarity in ranked:
+                scores.append(similarity)
+                labels.append(1.0 if process_id == row['ecoinvent_process_id'] else 0.0)
+        
+        labels = np.asarray(labels)
+        if labels.size == 0 or labels.min() == labels.max():
+            return self.DEFAULT_PLATT
+        return self._fit_platt(np.asarray(scores), labels)
+    
+    @staticmethod
+    def _fit_platt(scores: np.ndarray, labels: np.ndarray, iterations: int = 50) -> Tuple[float, float]:
+        """Logistic regression of labels on scores via Newton's method, with Platt's smoothed targets"""
+        positives = labels.sum()
+        negatives = labels.size - positives
+        targets = np.where(labels > 0, (positives + 1.0) / (positives + 2.0), 1.0 / (negatives + 2.0))
+        design = np.column_stack([scores, np.ones_like(scores)])
+        weights = np.zeros(2)
+        for _ in range(iterations):
+            predicted = 1.0 / (1.0 + np.exp(-design @ weights))
+            gradient = design.T @ (predicted - targets)
+            hessian = design.T @ (design * (predicted * (1.0 - predicted))[:, None]) + 1e-6 * np.eye(2)
+            step = np.linalg.solve(hessian, gradient)
+            weights -= step
+            if np.abs(step).max() < 1e-8:
+                break
+        return float(weights[0]), float(weights[1])
+    
+    def suggest_unmapped(self) -> Dict[Tuple[str, int], List[Dict[str, Any]]]:
+        """
+        Suggestions for every product and merchant product without a mapping,
+        keyed by ('product' | 'merchant_product', id)
+        """
+        products = [
+            {
+                'key': ('product', row['id']),
+                'name': row['name'],
+                'description': row['description'],
+                'tags': row['tags'],
+                'category': row['category__name'],
+                'subcategory': row['subcategory__name'],
+            }
+            for row in Product.objects.filter(eco_mappings__isnull=True).values(
+                'id', 'name', 'description', 'tags', 'category__name', 'subcategory__name'
+            )
+        ]
+        products.extend(
+            {
+                'key': ('merchant_product', row['id']),
+                'name': row['name'],
+                'description': row['description'],
+                'tags': row['tags'],
+                'category': row['category'],
+                'subcategory': row['subcategory'],
+            }
+            for row in MerchantProduct.objects.filter(eco_mappings__isnull=True).values(
+                'id', 'name', 'description', 'tags', 'category', 'subcategory'
+            )
+        )
+        
+        suggestions = self.suggest([self.product_text(product) for product in products])
+        return {product['key']: ranked for product, ranked in zip(products, suggestions)}
+
+
+class OrderEcoImpactService:
+    """
+    Compute per-order eco savings against category benchmarks and store them as EcoImpact rows
+    """
+    
+    # Orders in these statuses have been confirmed by payment
+    CONFIRMED_STATUSES = ['confirmed', 'processing', 'shipped', 'delivered']
+    PLASTIC_PER_PLASTIC_FREE_ITEM_KG = 0.05
+    WATER_PER_ORGANIC_ITEM_LITERS = 50.0
+    CO2_ABSORBED_PER_TREE_KG = 21.0
+    # Per-user counters passed on to the leaderboard and challenges
+    DELTA_FIELDS = [
+        'total_co2_saved', 'total_ecoscore', 'graded_purchases', 'total_purchases',
+        'orders', 'a_grade_items', 'high_grade_items'
+    ]
+    
+    def __init__(self, chunk_size: int = 500):
+        self.chunk_size = chunk_size
+        self.calculation_service = EcoScoreCalculationService()
+    
+    def get_item_rows(self, order_ids: Sequence[int]) -> List[Dict[str, Any]]:
+        """
+        Order items joined with their product's stored impact and category benchmark in one query
+        """
+        catalog_product = EcommerceProduct.objects.filter(pk=OuterRef('catalog_product_id'))
+        benchmark = EcoScoreBenchmark.objects.annotate(category_key=Lower('category')).filter(
+            category_key=OuterRef('category_key'), is_active=True
+        )
+        return list(
+            OrderItem.objects.filter(order_id__in=order_ids)
+            # product_id is free text; only cast values that are numeric
+            .annotate(catalog_product_id=Case(
+                When(product_id__regex=r'^[0-9]+$', then=Cast('product_id', IntegerField())),
+                default=None,
+                output_field=IntegerField(),
+            ))
+            .annotate(
+                raw_impact=Subquery(catalog_product.values('carbon_footprint')[:1]),
+                category_key=Subquery(
+                    catalog_product.annotate(category_key=Lower('category__name')).values('category_key')[:1]
+                ),
+                is_plastic_free=Subquery(catalog_product.values('is_plastic_free')[:1]),
+                is_organic=Subquery(catalog_product.values('is_organic')[:1]),
+            )
+            .annotate(benchmark_impact=Subquery(benchmark.values('benchmark_impact')[:1]))
+            .values(
+                'id', 'order_id', 'quantity', 'raw_impact',
+                'benchmark_impact', 'is_plastic_free', 'is_organic'
+            )
+            .order_by('order_id', 'id')
+        )
+    
+    def process_orders(self, order_ids: Sequence[int], force: bool = False, challenges: bool = True) -> int:
+        """
+        Write EcoImpact rows for confirmed orders, skipping ones already processed unless forced.
+        Leaderboard totals, and challenge progress when challenges is set, are incremented for
+        new rows only; rebuild the leaderboard after a forced run.
+        
+        Returns:
+            Number of EcoImpact rows created
+        """
+        orders = CustomerOrder.objects.filter(
+            id__in=order_ids, order_status__in=self.CONFIRMED_STATUSES
+        )
+        if not force:
+            orders = orders.filter(eco_impact__isnull=True)
+        order_users = {}
+        placed_at = {}
+        for order_id, user_id, created_at in orders.values_list('id', 'customer__user_id', 'created_at'):
+            order_users[order_id] = user_id
+            placed_at[order_id] = created_at
+        if not order_users:
+            return 0
+        
+        order_ids = list(order_users)
+        rows_by_order = {
+            order_id: list(order_rows)
+            for order_id, order_rows in groupby(self.get_item_rows(order_ids), key=itemgetter('order_id'))
+        }
+        items = []
+        impacts = []
+        order_deltas = {}
+        for order_id, user_id in order_users.items():
+            totals = {'co2_saved': 0.0, 'plastic_avoided': 0.0, 'water_saved': 0.0}
+            deltas = order_deltas[order_id] = dict.fromkeys(self.DELTA_FIELDS, 0)
+            deltas['orders'] = 1
+            for row in rows_by_order.get(order_id, []):
+                co2_saved, score, grade = self._score_item(row)
+                totals['co2_saved'] += co2_saved
+                if row['is_plastic_free']:
+                    totals['plastic_avoided'] += self.PLASTIC_PER_PLASTIC_FREE_ITEM_KG * row['quantity']
+                if row['is_organic']:
+                    totals['water_saved'] += self.WATER_PER_ORGANIC_ITEM_LITERS * row['quantity']
+                items.append(OrderItem(
+                    id=row['id'],
+                    order_id=order_id,
+                    co2_saved=self._to_decimal(co2_saved),
+                    ecoscore_value=score,
+                    ecoscore_grade=grade,
+                ))
                 
-        except Exception as e:
-            logger.error(f"Error awarding achievement to user {user.email}: {str(e)}")
+                deltas['total_co2_saved'] += round(co2_saved, 2)
+                deltas['total_purchases'] += row['quantity']
+                if score is not None:
+                    deltas['total_ecoscore'] += score * row['quantity']
+                    deltas['graded_purchases'] += row['quantity']
+                if grade in ('A', 'B'):
+                    deltas['high_grade_items'] += row['quantity']
+                if grade == 'A':
+                    deltas['a_grade_items'] += row['quantity']
+            
+            impacts.append(EcoImpact(
+                user_id=user_id,
+                order_id=order_id,
+                co2_saved=self._to_decimal(totals['co2_saved']),
+                plastic_avoided=self._to_decimal(totals['plastic_avoided']),
+                water_saved=self._to_decimal(totals['water_saved']),
+                trees_planted=self._to_decimal(totals['co2_saved'] / self.CO2_ABSORBED_PER_TREE_KG),
+            ))
+        
+        with transaction.atomic():
+            if force:
+                EcoImpact.objects.filter(order_id__in=order_ids).delete()
+            else:
+                # A run racing this one (a status save, the backfill) may have processed some orders
+                # since they were read; the order locks make it wait for that run to commit
+                list(CustomerOrder.objects.select_for_update().filter(id__in=order_ids).order_by('id').values_list('id'))
+                processed = set(EcoImpact.objects.filter(order_id__in=order_ids).values_list('order_id', flat=True))
+                impacts = [impact for impact in impacts if impact.order_id not in processed]
+                items = [item for item in items if item.order_id not in processed]
+            OrderItem.objects.bulk_update(
+                items, ['co2_saved', 'ecoscore_value', 'ecoscore_grade'], batch_size=500
+            )
+            # The unique order constraint rolls the chunk back rather than credit an order twice
+            EcoImpact.objects.bulk_create(impacts, batch_size=500)
+            if not force:
+                # Totals are credited to the periods the orders were placed in, not the processing time
+                events = [
+                    (impact.user_id, placed_at[impact.order_id], order_deltas[impact.order_id])
+                    for impact in impacts
+                ]
+                EcoLeaderboardService().record(events)
+                if challenges:
+                    EcoChallengeService().record(events)
+        
+        return len(impacts)
+    
+    def backfill(self, force: bool = False, challenges: bool = False) -> Iterator[int]:
+        """
+        Process historical confirmed orders in id-ordered chunks, yielding rows created per chunk.
+        Challenge progress is left alone unless challenges is set.
+        """
+        orders = CustomerOrder.objects.filter(order_status__in=self.CONFIRMED_STATUSES)
+        if not force:
+            orders = orders.filter(eco_impact__isnull=True)
+        
+        last_id = 0
+        while True:
+            order_ids = list(
+                orders.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:self.chunk_size]
+            )
+            if not order_ids:
+                break
+            last_id = order_ids[-1]
+            yield self.process_orders(order_ids, force=force, challenges=challenges)
+    
+    def _score_item(self, row: Dict[str, Any]) -> Tuple[float, Optional[float], str]:
+        """CO2 saved against the category benchmark, and the score and grade the item's impact earns"""
+        scored = self.calculation_service.score_against_benchmark(row['raw_impact'], row['benchmark_impact'])
+        if scored is None:
+            return 0.0, None, ''
+        
+        score, grade = scored
+        return max(row['benchmark_impact'] - float(row['raw_impact']), 0.0) * row['quantity'], score, grade
+    
+    @staticmethod
+    def _to_decimal(value: float) -> Decimal:
+        return Decimal(str(round(value, 2)))
+
+
+class EcoLeaderboardService:
+    """
+    Maintain per-user running eco totals for each leaderboard window and serve rankings
+    """
+    
+    WINDOWS = ['all_time', 'weekly', 'monthly']
+    ALL_TIME_START = date(1970, 1, 1)
+    TOTAL_FIELDS = ['total_co2_saved', 'total_ecoscore', 'graded_purchases', 'total_purchases']
+    
+    @classmethod
+    def period_start(cls, window: str, when=None) -> date:
+        day = timezone.localdate(when)
+        if window == 'weekly':
+            return day - timedelta(days=day.weekday())
+        if window == 'monthly':
+            return day.replace(day=1)
+        return cls.ALL_TIME_START
+    
+    @classmethod
+    def prune_cutoff(cls, window: str) -> Optional[date]:
+        """Periods before this date have rolled over and can be deleted (the previous one is kept)"""
+        current = cls.period_start(window)
+        if window == 'weekly':
+            return current - timedelta(days=7)
+        if window == 'monthly':
+            return (current - timedelta(days=1)).replace(day=1)
+        return None
+    
+    def record(self, order_deltas: Sequence[Tuple[int, datetime, Dict[str, float]]]):
+        """
+        Add per-order deltas to the running totals of every window
+        
+        Args:
+            order_deltas: (user id, time the order was placed, deltas) per order; each order counts
+                towards the periods it was placed in, and periods already pruned are skipped
+        """
+        for window in self.WINDOWS:
+            cutoff = self.prune_cutoff(window)
+            deltas = defaultdict(lambda: dict.fromkeys(self.TOTAL_FIELDS, 0))
+            for user_id, placed_at, delta in order_deltas:
+                period_start = self.period_start(window, placed_at)
+                if cutoff is not None and period_start < cutoff:
+                    continue
+                for field in self.TOTAL_FIELDS:
+                    deltas[(user_id, period_start)][field] += delta[field]
+            
+            for (user_id, period_start), delta in deltas.items():
+                if not any(delta.values()):
+                    continue
+                entries = EcoLeaderboardEntry.objects.filter(
+                    user_id=user_id, window=window, period_start=period_start
+                )
+                # update() skips auto_now
+                increments = {field: F(field) + delta[field] for field in self.TOTAL_FIELDS}
+                increments['updated_at'] = timezone.now()
+                if entries.update(**increments):
+                    continue
+                try:
+                    with transaction.atomic():
+                        EcoLeaderboardEntry.objects.create(
+                            user_id=user_id, window=window, period_start=period_start, **delta
+                        )
+                except IntegrityError:
+                    entries.update(**increments)
+    
+    def get_leaderboard(self, window: str = 'all_time', limit: int = 10,
+                        around_user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Top places of the current period, or the places around a user when one is given.
+        Every query is a range over the (window, period_start, total_co2_saved) index; ties go to the lower user id.
+        """
+        entries = EcoLeaderboardEntry.objects.filter(
+            window=window, period_start=self.period_start(window)
+        ).select_related('user')
+        if around_user_id is None:
+            ranked = list(enumerate(entries.order_by('-total_co2_saved', 'user_id')[:limit], start=1))
+        else:
+            entry = entries.filter(user_id=around_user_id).first()
+            if entry is None:
+                return []
+            radius = limit // 2
+            total = entry.total_co2_saved
+            ahead = entries.filter(
+                Q(total_co2_saved__gt=total) | Q(total_co2_saved=total, user_id__lt=around_user_id)
+            )
+            behind = entries.filter(
+                Q(total_co2_saved__lt=total) | Q(total_co2_saved=total, user_id__gt=around_user_id)
+            )
+            rank = ahead.count() + 1
+            above = list(ahead.order_by('total_co2_saved', '-user_id')[:radius])[::-1]
+            below = list(behind.order_by('-total_co2_saved', 'user_id')[:radius])
+            ranked = list(enumerate(above + [entry] + below, start=rank - len(above)))
+        
+        user_ids = [entry.user_id for _, entry in ranked]
+        achievement_counts = dict(
+            UserEcoAchievement.objects.filter(user_id__in=user_ids, is_earned=True)
+            .values('user_id').annotate(count=Count('id')).values_list('user_id', 'count')
+        )
+        
+        rows = []
+        for rank, entry in ranked:
+            user_id = entry.user_id
+            rows.append({
+                'user_id': user_id,
+                'user_email': entry.user.email,
+                'total_ecoscore': round(entry.total_ecoscore, 1),
+                'average_ecoscore': round(entry.average_ecoscore, 1),
+                'total_purchases': entry.total_purchases,
+                'eco_achievements_count': achievement_counts.get(user_id, 0),
+                'total_co2_saved': round(entry.total_co2_saved, 2),
+                'rank': rank,
+            })
+        return rows
+    
+    def rebuild(self) -> int:
+        """
+        Recompute every window's totals from order items with recorded eco impact
+        
+        Returns:
+            Number of leaderboard entries written
+        """
+        items = OrderItem.objects.filter(order__eco_impact__isnull=False)
+        graded = Q(ecoscore_value__isnull=False)
+        aggregates = {
+            'total_co2_saved': Coalesce(Sum('co2_saved'), Decimal('0')),
+            'total_ecoscore': Coalesce(Sum(F('ecoscore_value') * F('quantity'), filter=graded), 0.0),
+            'graded_purchases': Coalesce(Sum('quantity', filter=graded), 0),
+            'total_purchases': Coalesce(Sum('quantity'), 0),
+        }
+        # Orders count towards the periods they were placed in, as in record()
+        truncators = {
+            'weekly': TruncWeek('order__created_at', output_field=DateField()),
+            'monthly': TruncMonth('order__created_at', output_field=DateField()),
+        }
+        
+        entries = []
+        for window in self.WINDOWS:
+            if window in truncators:
+                rows = items.annotate(period=truncators[window]).values('order__customer__user_id', 'period')
+            else:
+                rows = items.values('order__customer__user_id')
+            for row in rows.annotate(**aggregates).order_by().iterator():
+                entries.append(EcoLeaderboardEntry(
+                    user_id=row['order__customer__user_id'],
+                    window=window,
+                    period_start=row.get('period', self.ALL_TIME_START),
+                    total_co2_saved=float(row['total_co2_saved']),
+                    total_ecoscore=row['total_ecoscore'],
+                    graded_purchases=row['graded_purchases'],
+                    total_purchases=row['total_purchases'],
+                ))
+        
+        with transaction.atomic():
+            EcoLeaderboardEntry.objects.all().delete()
+            EcoLeaderboardEntry.objects.bulk_create(entries, batch_size=500)
+            self.prune()
+        return len(entries)
+    
+    def prune(self) -> int:
+        """Delete rolled-over weekly and monthly periods"""
+        deleted = 0
+        for window in self.WINDOWS:
+            cutoff = self.prune_cutoff(window)
+            if cutoff is not None:
+                deleted += EcoLeaderboardEntry.objects.filter(window=window, period_start__lt=cutoff).delete()[0]
+        return deleted
+
+
+class EcoChallengeService:
+    """
+    Increment challenge progress counters from order events and close finished windows
+    """
+    
+    # Challenge metric -> key of the per-user order deltas built by OrderEcoImpactService
+    METRIC_DELTAS = {
+        'a_grade_items': 'a_grade_items',
+        'high_grade_items': 'high_grade_items',
+        'items': 'total_purchases',
+        'orders': 'orders',
+        'co2_saved': 'total_co2_saved',
+    }
+    
+    @staticmethod
+    def open_challenges(when=None):
+        when = when or timezone.now()
+        return EcoChallenge.objects.filter(
+            is_active=True, is_closed=False, starts_at__lte=when, ends_at__gt=when
+        )
+    
+    def record(self, order_deltas: Sequence[Tuple[int, datetime, Dict[str, float]]]):
+        """
+        Add per-order deltas to the progress of the open challenges the orders were placed during
+        
+        Args:
+            order_deltas: (user id, time the order was placed, deltas) per order, as for the leaderboard
+        """
+        if not order_deltas:
+            return
+        now = timezone.now()
+        placed = [placed_at for _, placed_at, _ in order_deltas]
+        challenges = EcoChallenge.objects.filter(
+            is_active=True, is_closed=False, starts_at__lte=max(placed), ends_at__gt=min(placed)
+        )
+        for challenge in challenges:
+            delta_key = self.METRIC_DELTAS[challenge.metric]
+            amounts = defaultdict(float)
+            for user_id, placed_at, delta in order_deltas:
+                if challenge.starts_at <= placed_at < challenge.ends_at and delta.get(delta_key):
+                    amounts[user_id] += delta[delta_key]
+            if not amounts:
+                continue
+            
+            # Missing rows are created empty, then every counter is incremented in one statement;
+            # writing computed totals with update_conflicts would drop increments made concurrently
+            ChallengeProgress.objects.bulk_create(
+                [ChallengeProgress(challenge=challenge, user_id=user_id) for user_id in amounts],
+                batch_size=500,
+                ignore_conflicts=True,
+            )
+            progress = ChallengeProgress.objects.filter(challenge=challenge, user_id__in=list(amounts))
+            progress.update(
+                progress=F('progress') + Case(
+                    *[When(user_id=user_id, then=Value(amount)) for user_id, amount in amounts.items()],
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                ),
+                updated_at=now,
+            )
+            progress.filter(is_completed=False, progress__gte=challenge.target).update(
+                is_completed=True, completed_at=now
+            )
+    
+    def close_finished(self, when=None) -> int:
+        """Close every challenge whose window has ended"""
+        when = when or timezone.now()
+        return EcoChallenge.objects.filter(is_closed=False, ends_at__lte=when).update(
+            is_closed=True, updated_at=when
+        )
+
+
+class EcoAlternativeIndex:
+    """
+    In-memory index of active catalog products per category and price bucket, sorted by EcoScore,
+    used to suggest greener swaps for cart items
+    """
+    
+    # Prices fall into geometric buckets; alternatives must cost within PRICE_TOLERANCE times the item
+    PRICE_BUCKET_RATIO = 1.25
+    PRICE_TOLERANCE = 1.5
+    
+    _current = None
+    _lock = threading.Lock()
+    
+    def __init__(self, benchmarks: Dict[str, float], version: Tuple):
+        self.version = version
+        self.benchmarks = benchmarks
+        self.calculation_service = EcoScoreCalculationService()
+        self.known_ids = set()
+        # Every active product, scored or not, so unscored cart items can still be looked up
+        self.products = {}
+        # (category id, price bucket) -> sorted [(-score, price, product id)]
+        self.buckets = {}
+    
+    @staticmethod
+    def get_version() -> Tuple:
+        """Fingerprint of the catalog and the benchmarks scores are computed against"""
+        products = EcommerceProduct.objects.aggregate(latest=Max('updated_at'), total=Count('id'))
+        benchmarks = EcoScoreBenchmark.objects.aggregate(latest=Max('updated_at'), total=Count('id'))
+        return products['latest'], products['total'], benchmarks['latest'], benchmarks['total']
+    
+    @classmethod
+    def current(cls) -> 'EcoAlternativeIndex':
+        """
+        Return the index for the current catalog. Edited and new products are applied to a copy
+        that then replaces it, so readers never see an index mid-update; deletions and benchmark
+        changes trigger a full rebuild.
+        """
+        version = cls.get_version()
+        index = cls._current
+        if index is None or index.version != version:
+            with cls._lock:
+                index = cls._current
+                if index is None or index.version != version:
+                    refreshed = index.refresh(version) if index is not None else None
+                    index = refreshed or cls.build(version)
+                    cls._current = index
+        return index
+    
+    @classmethod
+    def build(cls, version: Tuple) -> 'EcoAlternativeIndex':
+        index = cls(EcoScoreCalculationService.get_category_benchmarks(), version)
+        index.apply_rows(index.get_rows(EcommerceProduct.objects.all()))
+        return index
+    
+    def copy(self) -> 'EcoAlternativeIndex':
+        """Independent copy that can be changed while readers keep using this index"""
+        index = type(self)(self.benchmarks, self.version)
+        index.known_ids = set(self.known_ids)
+        index.products = dict(self.products)
+        index.buckets = {key: list(keys) for key, keys in self.buckets.items()}
+        return index
+    
+    def refresh(self, version: Tuple) -> Optional['EcoAlternativeIndex']:
+        """
+        Copy of the index with the products changed since it was built applied;
+        None when a full rebuild is needed
+        """
+        latest, total, benchmark_latest, benchmark_total = version
+        if self.version[0] is None or self.version[2:] != (benchmark_latest, benchmark_total):
+            return None
+        rows = self.get_rows(EcommerceProduct.objects.filter(updated_at__gte=self.version[0]))
+        new_ids = {row['id'] for row in rows} - self.known_ids
+        if len(self.known_ids) + len(new_ids) != total:
+            # Some products were deleted
+            return None
+        index = self.copy()
+        index.apply_rows(rows)
+        index.version = version
+        return index
+    
+    @staticmethod
+    def get_rows(queryset) -> List[Dict[str, Any]]:
+        return list(
+            queryset.annotate(category_key=Lower('category__name')).values(
+                'id', 'name', 'slug', 'price', 'carbon_footprint',
+                'category_id', 'category_key', 'primary_image_url', 'is_active'
+            )
+        )
+    
+    def bucket(self, price: float) -> int:
+        return math.floor(math.log(max(price, 0.01)) / math.log(self.PRICE_BUCKET_RATIO))
+    
+    def apply_rows(self, rows: Iterable[Dict[str, Any]]):
+        for row in rows:
+            self.known_ids.add(row['id'])
+            self._remove(row['id'])
+            if not row['is_active']:
+                continue
+            
+            score, grade = self.calculation_service.score_against_benchmark(
+                row['carbon_footprint'], self.benchmarks.get(row['category_key'])
+            ) or (None, '')
+            price = float(row['price'])
+            entry = {
+                'product_id': row['id'],
+                'name': row['name'],
+                'slug': row['slug'],
+                'price': price,
+                'carbon_footprint': float(row['carbon_footprint']) if row['carbon_footprint'] is not None else None,
+                'ecoscore': score,
+                'grade': grade,
+                'image': row['primary_image_url'] or None,
+                'category_id': row['category_id'],
+                'bucket': self.bucket(price),
+            }
+            self.products[row['id']] = entry
+            if score is not None:
+                insort(self.buckets.setdefault((entry['category_id'], entry['bucket']), []),
+                       (-score, price, row['id']))
+    
+    def _remove(self, product_id: int):
+        entry = self.products.pop(product_id, None)
+        if entry is None or entry['ecoscore'] is None:
+            return
+        keys = self.buckets[(entry['category_id'], entry['bucket'])]
+        del keys[bisect_left(keys, (-entry['ecoscore'], entry['price'], product_id))]
+    
+    def alternatives(self, product_id: int, limit: int = 3) -> List[Dict[str, Any]]:
+        """
+        Best-scored products in the same category at a similar price that beat the given product
+        
+        Returns:
+            Up to limit alternatives, highest EcoScore first
+        """
+        entry = self.products.get(product_id)
+        if entry is None:
+            return []
+        low = entry['price'] / self.PRICE_TOLERANCE
+        high = entry['price'] * self.PRICE_TOLERANCE
+        floor = entry['ecoscore'] if entry['ecoscore'] is not None else -1.0
+        runs = [
+            self.buckets.get((entry['category_id'], bucket), ())
+            for bucket in range(self.bucket(low), self.bucket(high) + 1)
+        ]
+        
+        results = []
+        for negative_score, price, candidate_id in heapq.merge(*runs):
+            if len(results) >= limit or -negative_score <= floor:
+                break
+            if candidate_id == product_id or not low <= price <= high:
+                continue
+            candidate = self.products[candidate_id]
+            results.append({
+                **self.describe(candidate_id),
+                'score_gain': round(candidate['ecoscore'] - entry['ecoscore'], 1) if entry['ecoscore'] is not None else None,
+                'price_difference': round(candidate['price'] - entry['price'], 2),
+            })
+        return results
+    
+    def describe(self, product_id: int) -> Optional[Dict[str, Any]]:
+        entry = self.products.get(product_id)
+        if entry is None:
+            return None
+        return {
+            key: entry[key]
+            for key in ('product_id', 'name', 'slug', 'price', 'carbon_footprint', 'ecoscore', 'grade', 'image')
+        }
+
+
+class ParetoFrontierService:
+    """
+    Maintain the price vs EcoScore Pareto frontier of every category and subcategory
+    """
+    
+    # Catalog -> ParetoFrontierPoint foreign key holding the product
+    CATALOG_FIELDS = {'product': 'product', 'merchant_product': 'merchant_product'}
+    
+    def __init__(self):
+        self.calculation_service = EcoScoreCalculationService()
+        self._benchmarks = None
+    
+    @property
+    def benchmarks(self) -> Dict[str, float]:
+        if self._benchmarks is None:
+            self._benchmarks = self.calculation_service.get_category_benchmarks()
+        return self._benchmarks
+    
+    def get_rows(self, catalog: str, **filters) -> List[Dict[str, Any]]:
+        """Active, scored products of a catalog with their price, score and frontier groups"""
+        if catalog == 'product':
+            queryset = EcommerceProduct.objects.filter(is_active=True, carbon_footprint__isnull=False).annotate(
+                category_key=Lower('category__name'), parent_key=Lower('category__parent__name')
+            )
+            rows = []
+            for row in queryset.filter(**filters).values(
+                'id', 'price', 'carbon_footprint', 'category_key', 'parent_key'
+            ):
+                scored = self.calculation_service.score_against_benchmark(
+                    row['carbon_footprint'], self.benchmarks.get(row['category_key'])
+                )
+                if scored is None:
+                    continue
+                # Products in a child category count towards the parent's frontier too
+                if row['parent_key']:
+                    groups = [(row['parent_key'], ''), (row['parent_key'], row['category_key'])]
+                else:
+                    groups = [(row['category_key'], '')]
+                rows.append({
+                    'id': row['id'], 'price': row['price'],
+                    'score_value': scored[0], 'score_grade': scored[1], 'groups': groups,
+                })
+            return rows
+        
+        queryset = MerchantProduct.objects.filter(is_active=True, ecoscore_last_calculated__isnull=False).annotate(
+            category_key=Lower('category'), subcategory_key=Lower('subcategory')
+        )
+        rows = []
+        for row in queryset.filter(**filters).values(
+            'id', 'price', 'ecoscore_value', 'ecoscore_grade', 'category_key', 'subcategory_key'
+        ):
+            groups = [(row['category_key'], '')]
+            if row['subcategory_key']:
+                groups.append((row['category_key'], row['subcategory_key']))
+            rows.append({
+                'id': row['id'], 'price': row['price'],
+                'score_value': row['ecoscore_value'], 'score_grade': row['ecoscore_grade'], 'groups': groups,
+            })
+        return rows
+    
+    def get_group_rows(self, catalog: str, category: str, subcategory: str = '') -> List[Dict[str, Any]]:
+        if catalog == 'product':
+            if subcategory:
+                return self.get_rows(catalog, parent_key=category, category_key=subcategory)
+            return self.get_rows(catalog, parent_key__isnull=True, category_key=category) + \
+                self.get_rows(catalog, parent_key=category)
+        if subcategory:
+            return self.get_rows(catalog, category_key=category, subcategory_key=subcategory)
+        return self.get_rows(catalog, category_key=category)
+    
+    @staticmethod
+    def frontier(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rows not dominated on price and score, cheapest first"""
+        points = []
+        best_score = None
+        for row in sorted(rows, key=lambda row: (row['price'], -row['score_value'], row['id'])):
+            if best_score is None or row['score_value'] > best_score:
+                points.append(row)
+                best_score = row['score_value']
+        return points
+    
+    def _build_points(self, catalog: str, category: str, subcategory: str,
+                      rows: List[Dict[str, Any]]) -> List[ParetoFrontierPoint]:
+        field = self.CATALOG_FIELDS[catalog]
+        return [
+            ParetoFrontierPoint(
+                catalog=catalog, category=category, subcategory=subcategory,
+                price=row['price'], score_value=row['score_value'], score_grade=row['score_grade'],
+                **{f'{field}_id': row['id']}
+            )
+            for row in self.frontier(rows)
+        ]
+    
+    def rebuild_group(self, catalog: str, category: str, subcategory: str = '') -> int:
+        points = self._build_points(catalog, category, subcategory, self.get_group_rows(catalog, category, subcategory))
+        with transaction.atomic():
+            ParetoFrontierPoint.objects.filter(catalog=catalog, category=category, subcategory=subcategory).delete()
+            ParetoFrontierPoint.objects.bulk_create(points)
+        return len(points)
+    
+    def rebuild(self) -> int:
+        """Recompute every frontier from scratch"""
+        points = []
+        for catalog in self.CATALOG_FIELDS:
+            groups = defaultdict(list)
+            for row in self.get_rows(catalog):
+                for category, subcategory in row['groups']:
+                    groups[(category, subcategory)].append(row)
+            for (category, subcategory), rows in groups.items():
+                points.extend(self._build_points(catalog, category, subcategory, rows))
+        
+        with transaction.atomic():
+            ParetoFrontierPoint.objects.all().delete()
+            ParetoFrontierPoint.objects.bulk_create(points, batch_size=1000)
+        return len(points)
+    
+    def refresh_product(self, catalog: str, product_id: int):
+        """
+        Bring the frontiers a product belongs to up to date after its price or score changed.
+        A product joining a frontier only evicts the points it dominates; a product already on
+        a frontier may uncover dominated products, so those groups are recomputed.
+        """
+        field = self.CATALOG_FIELDS[catalog]
+        stale_groups = set(
+            ParetoFrontierPoint.objects.filter(catalog=catalog, **{field: product_id})
+            .values_list('category', 'subcategory')
+        )
+        for row in self.get_rows(catalog, id=product_id):
+            for group in row['groups']:
+                if group not in stale_groups:
+                    self._insert(catalog, group, row)
+        for category, subcategory in stale_groups:
+            self.rebuild_group(catalog, category, subcategory)
+    
+    def refresh_category(self, catalog: str, category: str):
+        """Recompute every frontier holding products of a category, e.g. after its benchmark changed"""
+        category = category.lower()
+        groups = set()
+        for row in self.get_rows(catalog, category_key=category):
+            groups.update(row['groups'])
+        # Groups whose products may no longer be scored at all
+        groups.update(
+            ParetoFrontierPoint.objects.filter(catalog=catalog)
+            .filter(Q(category=category) | Q(subcategory=category))
+            .values_list('category', 'subcategory')
+        )
+        for group_category, subcategory in groups:
+            self.rebuild_group(catalog, group_category, subcategory)
+    
+    def _insert(self, catalog: str, group: Tuple[str, str], row: Dict[str, Any]):
+        category, subcategory = group
+        points = ParetoFrontierPoint.objects.filter(catalog=catalog, category=category, subcategory=subcategory)
+        with transaction.atomic():
+            if points.filter(price__lte=row['price'], score_value__gte=row['score_value']).exists():
+                return
+            points.filter(price__gte=row['price'], score_value__lte=row['score_value']).delete()
+            ParetoFrontierPoint.objects.bulk_create(self._build_points(catalog, category, subcategory, [row]))
+    
+    @staticmethod
+    def get_frontier(catalog: str, category: str, subcategory: str = '',
+                     max_price=None, min_score: Optional[float] = None):
+        """
+        Stored frontier of a group, cheapest first. Both filters keep the result exact: a point is
+        only ever dominated by a cheaper, better-scored one.
+        """
+        points = ParetoFrontierPoint.objects.filter(
+            catalog=catalog, category=category.lower(), subcategory=subcategory.lower()
+        )
+        if max_price is not None:
+            points = points.filter(price__lte=max_price)
+        if min_score is not None:
+            points = points.filter(score_value__gte=min_score)
+        return points.order_by('price')
+
+
+class EcoScoreBadgeService:
+    """
+    Render EcoScore grade badges as SVG or PNG into a content-addressed on-disk cache
+    """
+    
+    # Bump when the artwork changes so cached renders are not reused
+    RENDER_VERSION = 1
+    FORMATS = {'svg': 'image/svg+xml', 'png': 'image/png'}
+    # Same palette as EcoScoreLabel.jsx
+    GRADE_COLORS = {
+        'A': ('#4CAF50', '#E8F5E8'),
+        'B': ('#8BC34A', '#F1F8E9'),
+        'C': ('#FFC107', '#FFFDE7'),
+        'D': ('#FF9800', '#FFF3E0'),
+        'E': ('#F44336', '#FFEBEE'),
+    }
+    THEMES = ['light', 'dark']
+    DARK_BACKGROUND = '#263238'
+    # Size -> (width, height, font size)
+    SIZES = {
+        'small': (132, 30, 13),
+        'medium': (176, 40, 17),
+        'large': (236, 54, 23),
+    }
+    FONT_FILES = ['DejaVuSans-Bold.ttf', 'Arial Bold.ttf', 'arialbd.ttf']
+    
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or settings.ECOSCORE_BADGE_CACHE_DIR
+    
+    def get_key(self, grade: str, score: Optional[int], size: str, theme: str, file_format: str) -> str:
+        """Digest of everything that determines the rendered bytes; doubles as the ETag"""
+        spec = f'{self.RENDER_VERSION}:{grade}:{"" if score is None else score}:{size}:{theme}:{file_format}'
+        return hashlib.sha256(spec.encode()).hexdigest()
+    
+    def get_path(self, key: str, file_format: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f'{key}.{file_format}')
+    
+    def get_badge(self, grade: str, score: Optional[int], size: str, theme: str,
+                  file_format: str) -> Tuple[str, str]:
+        """
+        Return the cached badge file, rendering it on first use
+        
+        Returns:
+            Tuple of (file path, cache key)
+        """
+        key = self.get_key(grade, score, size, theme, file_format)
+        path = self.get_path(key, file_format)
+        if not os.path.exists(path):
+            if file_format == 'svg':
+                content = self.render_svg(grade, score, size, theme).encode()
+            else:
+                content = self.render_png(grade, score, size, theme)
+            # Write to a temporary file first so concurrent requests never serve a partial badge
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(descriptor, 'wb') as temp_file:
+                temp_file.write(content)
+            os.replace(temp_path, path)
+        return path, key
+    
+    def get_colors(self, grade: str, theme: str) -> Tuple[str, str]:
+        """(foreground, background) colors of a badge"""
+        color, background = self.GRADE_COLORS[grade]
+        return color, self.DARK_BACKGROUND if theme == 'dark' else background
+    
+    @staticmethod
+    def get_label(grade: str, score: Optional[int]) -> str:
+        return f'EcoScore {grade}' if score is None else f'EcoScore {grade} ({score})'
+    
+    def render_svg(self, grade: str, score: Optional[int], size: str, theme: str) -> str:
+        width, height, font_size = self.SIZES[size]
+        color, background = self.get_colors(grade, theme)
+        label = escape(self.get_label(grade, score))
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}" role="img" aria-label="{label}">'
+            f'<rect x="1" y="1" width="{width - 2}" height="{height - 2}" rx="{height // 4}" '
+            f'fill="{background}" stroke="{color}" stroke-width="2"/>'
+            f'<text x="{width // 2}" y="{height // 2}" fill="{color}" font-family="Arial, Helvetica, sans-serif" '
+            f'font-size="{font_size}" font-weight="bold" text-anchor="middle" dominant-baseline="central">'
+            f'{label}</text></svg>'
+        )
+    
+    def render_png(self, grade: str, score: Optional[int], size: str, theme: str) -> bytes:
+        width, height, font_size = self.SIZES[size]
+        color, background = self.get_colors(grade, theme)
+        image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        draw.rounded_rectangle(
+            (1, 1, width - 2, height - 2), radius=height // 4, fill=background, outline=color, width=2
+        )
+        draw.text(
+            (width / 2, height / 2), self.get_label(grade, score),
+            fill=color, font=self.get_font(font_size), anchor='mm'
+        )
+        output = BytesIO()
+        image.save(output, format='PNG', optimize=True)
+        return output.getvalue()
+    
+    def get_font(self, font_size: int):
+        for font_file in self.FONT_FILES:
+            try:
+                return ImageFont.truetype(font_file, font_size)
+            except OSError:
+                continue
+        return ImageFont.load_default(size=font_size)
\ No newline at end of file
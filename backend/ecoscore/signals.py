@@ -0,0 +1,106 @@
+"""
+Signal handlers for the EcoScore app
+"""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from customers.models import CustomerOrder, CustomerProfile
+from ecommerce.models import Product as EcommerceProduct
+from merchants.models import MerchantProduct
+from .models import EcoScoreBenchmark, ParetoFrontierPoint
+from .services import OrderEcoImpactService, EcoScoreGamificationService, ParetoFrontierService
+
+logger = logging.getLogger(__name__)
+
+# Saves that only touch other fields (stock, flags, ...) cannot move a product on its frontier
+FRONTIER_FIELDS = {
+    'product': {'price', 'carbon_footprint', 'category', 'is_active'},
+    'merchant_product': {
+        'price', 'ecoscore_value', 'ecoscore_grade', 'ecoscore_last_calculated',
+        'category', 'subcategory', 'is_active'
+    },
+}
+
+
+def process_confirmed_order(order_id, customer_id):
+    """Record the order's eco impact and re-evaluate the customer's achievements"""
+    if not OrderEcoImpactService().process_orders([order_id]):
+        return
+    
+    user_id = CustomerProfile.objects.filter(id=customer_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        EcoScoreGamificationService().evaluate_users([user_id])
+
+
+def try_process_confirmed_order(order_id, customer_id):
+    """The order is already committed; backfill_eco_impact picks up an order that failed here"""
+    try:
+        process_confirmed_order(order_id, customer_id)
+    except Exception:
+        logger.exception('Could not record the eco impact of order %s', order_id)
+
+
+@receiver(post_save, sender=CustomerOrder)
+def record_order_eco_impact(sender, instance, **kwargs):
+    """Compute the order's eco impact once it is confirmed"""
+    if instance.order_status not in OrderEcoImpactService.CONFIRMED_STATUSES:
+        return
+    
+    order_id, customer_id = instance.id, instance.customer_id
+    transaction.on_commit(lambda: try_process_confirmed_order(order_id, customer_id))
+
+
+def schedule_frontier_refresh(catalog, instance, update_fields):
+    """Update the product's price vs EcoScore frontiers once the save is committed"""
+    if update_fields is not None and not FRONTIER_FIELDS[catalog].intersection(update_fields):
+        return
+    
+    product_id = instance.id
+    transaction.on_commit(lambda: ParetoFrontierService().refresh_product(catalog, product_id))
+
+
+def schedule_frontier_rebuild(catalog, instance):
+    """Recompute the frontiers a deleted product was on, since it may have hidden other products"""
+    field = ParetoFrontierService.CATALOG_FIELDS[catalog]
+    groups = list(
+        ParetoFrontierPoint.objects.filter(catalog=catalog, **{field: instance.id})
+        .values_list('category', 'subcategory')
+    )
+    if not groups:
+        return
+    
+    def rebuild():
+        service = ParetoFrontierService()
+        for category, subcategory in groups:
+            service.rebuild_group(catalog, category, subcategory)
+    transaction.on_commit(rebuild)
+
+
+@receiver(post_save, sender=EcommerceProduct)
+def refresh_product_frontier(sender, instance, update_fields=None, **kwargs):
+    schedule_frontier_refresh('product', instance, update_fields)
+
+
+@receiver(post_save, sender=MerchantProduct)
+def refresh_merchant_product_frontier(sender, instance, update_fields=None, **kwargs):
+    schedule_frontier_refresh('merchant_product', instance, update_fields)
+
+
+@receiver(pre_delete, sender=EcommerceProduct)
+def rebuild_product_frontier(sender, instance, **kwargs):
+    schedule_frontier_rebuild('product', instance)
+
+
+@receiver(pre_delete, sender=MerchantProduct)
+def rebuild_merchant_product_frontier(sender, instance, **kwargs):
+    schedule_frontier_rebuild('merchant_product', instance)
+
+
+@receiver(post_save, sender=EcoScoreBenchmark)
+def refresh_benchmark_frontiers(sender, instance, **kwargs):
+    """Catalog product scores are relative to their category benchmark"""
+    category = instance.category
+    transaction.on_commit(lambda: ParetoFrontierService().refresh_category('product', category))
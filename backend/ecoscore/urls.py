@@ -8,9 +8,15 @@ from . import views
 router = DefaultRouter()
 router.register(r'processes', views.EcoInventProcessViewSet, basename='ecoinvent-process')
 router.register(r'ecoscores', views.EcoScoreViewSet, basename='ecoscore')
+router.register(r'history', views.EcoScoreHistoryViewSet, basename='ecoscore-history')
+router.register(r'uncertainty', views.EcoScoreUncertaintyViewSet, basename='ecoscore-uncertainty')
+router.register(r'achievements', views.UserEcoAchievementViewSet, basename='ecoscore-achievement')
+router.register(r'challenges', views.EcoChallengeViewSet, basename='eco-challenge')
+router.register(r'frontier', views.ParetoFrontierViewSet, basename='pareto-frontier')
 router.register(r'products-ecoscore', views.ProductEcoScoreViewSet, basename='product-ecoscore')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('gamification/check-achievements/', views.EcoScoreGamificationView.as_view(), name='check-achievements'),
+    path('badges/<str:grade>.<str:file_format>', views.EcoScoreBadgeView.as_view(), name='ecoscore-badge'),
 ]
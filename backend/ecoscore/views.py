@@ -4,25 +4,33 @@ Views for EcoScore app
 from rest_framework import generics, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
+from django.http import FileResponse, HttpResponseNotModified
 from django.db.models import Avg, Count, Q
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
+from decimal import Decimal, InvalidOperation
 
 from .models import (
     EcoInventProcess, ProductEcoMapping, EcoScoreBenchmark, 
-    EcoScore, EcoScoreHistory, UserEcoAchievement
+    EcoScore, EcoScoreHistory, EcoScoreUncertainty, UserEcoAchievement,
+    EcoChallenge, ChallengeProgress, ParetoFrontierPoint
 )
 from merchants.models import MerchantProduct
+from ecoswitch_backend.conditional import ConditionalGetMixin
 from .serializers import (
     EcoInventProcessSerializer, ProductEcoMappingSerializer,
     EcoScoreBenchmarkSerializer, EcoScoreSerializer,
-    EcoScoreHistorySerializer, UserEcoAchievementSerializer,
+    EcoScoreHistorySerializer, EcoScoreUncertaintySerializer, UserEcoAchievementSerializer,
     ProductEcoScoreSummarySerializer, MerchantProductEcoScoreSummarySerializer,
-    EcoScoreLeaderboardSerializer, EcoScoreStatsSerializer
+    EcoScoreLeaderboardSerializer, EcoScoreStatsSerializer,
+    EcoChallengeSerializer, ChallengeProgressSerializer, ParetoFrontierPointSerializer
+)
+from .services import (
+    EcoScoreCalculationService, EcoScoreGamificationService, EcoInventProcessSearchIndex,
+    EcoLeaderboardService, EcoChallengeService, ParetoFrontierService, EcoScoreBadgeService
 )
-from .services import EcoScoreCalculationService, EcoScoreGamificationService
 from products.models import Product
 from merchants.models import MerchantProduct
 
@@ -38,29 +46,58 @@ class EcoInventProcessViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def by_category(self, request):
         """Get processes grouped by category"""
+        categories = EcoInventProcessSearchIndex.current().grouped()
+        
         category = request.query_params.get('category')
         if category:
-            processes = self.queryset.filter(category__icontains=category)
-        else:
-            processes = self.queryset
-        
-        # Group by category
-        categories = {}
-        for process in processes:
-            if process.category not in categories:
-                categories[process.category] = []
-            categories[process.category].append(
-                EcoInventProcessSerializer(process).data
-            )
+            category = category.lower()
+            categories = {
+                name: processes for name, processes in categories.items()
+                if category in name.lower()
+            }
         
         return Response(categories)
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Fuzzy search processes by name, code and category"""
+        query = request.query_params.get('q', '').strip()
+        if len(query) < 2:
+            return Response(
+                {'error': 'Query parameter q must be at least 2 characters'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        ranked = EcoInventProcessSearchIndex.current().search(query)
+        page = self.paginate_queryset(ranked)
+        if page is not None:
+            return self.get_paginated_response(self._serialize_ranked(page))
+        return Response(self._serialize_ranked(ranked))
+    
+    def _serialize_ranked(self, ranked):
+        """Serialize (process id, score) pairs in ranked order with one query"""
+        processes = self.queryset.in_bulk([process_id for process_id, _ in ranked])
+        results = []
+        for process_id, score in ranked:
+            process = processes.get(process_id)
+            if process is None:
+                continue
+            data = self.get_serializer(process).data
+            data['score'] = score
+            results.append(data)
+        return results
 
 
-class EcoScoreViewSet(viewsets.ReadOnlyModelViewSet):
+class EcoScoreViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for EcoScore"""
     queryset = EcoScore.objects.all()
     serializer_class = EcoScoreSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    # Recalculation replaces the score, so a new calculation_date covers its values
+    conditional_fields = (
+        'calculation_date', 'ecoinvent_process__updated_at', 'benchmark__updated_at',
+        'product__updated_at', 'merchant_product__updated_at',
+    )
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -132,13 +169,87 @@ class EcoScoreViewSet(viewsets.ReadOnlyModelViewSet):
         
         serializer = EcoScoreStatsSerializer(stats_data)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def leaderboard(self, request):
+        """Get the eco leaderboard for a window, optionally centred on the current user"""
+        window = request.query_params.get('window', 'all_time')
+        if window not in EcoLeaderboardService.WINDOWS:
+            return Response({
+                'error': f"window must be one of {', '.join(EcoLeaderboardService.WINDOWS)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 100)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        around_user_id = None
+        if request.query_params.get('around_me') in ('1', 'true'):
+            if not request.user.is_authenticated:
+                return Response({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
+            around_user_id = request.user.id
+        
+        rows = EcoLeaderboardService().get_leaderboard(window, limit, around_user_id)
+        serializer = EcoScoreLeaderboardSerializer(rows, many=True)
+        return Response(serializer.data)
+
+
+class EcoScoreHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for per-product EcoScore history"""
+    serializer_class = EcoScoreHistorySerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    
+    def get_queryset(self):
+        queryset = EcoScoreHistory.objects.select_related('product', 'merchant_product')
+        product_id = self.request.query_params.get('product_id')
+        merchant_product_id = self.request.query_params.get('merchant_product_id')
+        
+        # Served by the (product, created_at) indexes
+        if product_id:
+            queryset = queryset.filter(product_id=product_id)
+        elif merchant_product_id:
+            queryset = queryset.filter(merchant_product_id=merchant_product_id)
+        
+        return queryset.order_by('-created_at', '-id')
+    
+    def list(self, request, *args, **kwargs):
+        """List history for a single product, newest first"""
+        if not (request.query_params.get('product_id') or request.query_params.get('merchant_product_id')):
+            return Response({
+                'error': 'product_id or merchant_product_id is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
 
 
-class ProductEcoScoreViewSet(viewsets.ReadOnlyModelViewSet):
+class EcoScoreUncertaintyViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for Monte Carlo confidence bands per process"""
+    serializer_class = EcoScoreUncertaintySerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    
+    def get_queryset(self):
+        queryset = EcoScoreUncertainty.objects.select_related('ecoinvent_process', 'benchmark')
+        process_id = self.request.query_params.get('process_id')
+        benchmark_id = self.request.query_params.get('benchmark_id')
+        grade = self.request.query_params.get('grade')
+        
+        if process_id:
+            queryset = queryset.filter(ecoinvent_process_id=process_id)
+        if benchmark_id:
+            queryset = queryset.filter(benchmark_id=benchmark_id)
+        if grade:
+            queryset = queryset.filter(most_likely_grade=grade)
+        
+        return queryset.order_by('ecoinvent_process_id', 'benchmark_id')
+
+
+class ProductEcoScoreViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for products with EcoScore data"""
     queryset = MerchantProduct.objects.all()
     serializer_class = MerchantProductEcoScoreSummarySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    # Score updates save ecoscore_last_calculated without touching updated_at
+    conditional_fields = ('updated_at', 'ecoscore_last_calculated', 'ecoscores__calculation_date')
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -181,23 +292,153 @@ class ProductEcoScoreViewSet(viewsets.ReadOnlyModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class EcoScoreGamificationView(generics.GenericAPIView):
-    """View for EcoScore gamification features"""
+class UserEcoAchievementViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for the current user's earned achievements"""
+    serializer_class = UserEcoAchievementSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = None
     
-    def post(self, request):
-        """Check and award achievements based on cart items"""
-        cart_items = request.data.get('cart_items', [])
+    def get_queryset(self):
+        return UserEcoAchievement.objects.filter(user=self.request.user, is_earned=True)
+
+
+class EcoChallengeViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for eco challenges and the current user's progress"""
+    serializer_class = EcoChallengeSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    
+    def get_queryset(self):
+        if self.action == 'list' and self.request.query_params.get('include_closed') not in ('1', 'true'):
+            return EcoChallengeService.open_challenges()
+        return EcoChallenge.objects.filter(is_active=True)
+    
+    def get_progress(self, challenges):
+        """The user's progress rows for the given challenges, one query for all of them"""
+        if not self.request.user.is_authenticated:
+            return {}
+        rows = ChallengeProgress.objects.filter(
+            user=self.request.user, challenge__in=challenges
+        ).select_related('challenge')
+        return {row.challenge_id: row for row in rows}
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        challenges = page if page is not None else list(queryset)
         
-        if not cart_items:
+        context = self.get_serializer_context()
+        context['progress'] = self.get_progress(challenges)
+        data = EcoChallengeSerializer(challenges, many=True, context=context).data
+        
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+    
+    def retrieve(self, request, *args, **kwargs):
+        challenge = self.get_object()
+        context = self.get_serializer_context()
+        context['progress'] = self.get_progress([challenge])
+        return Response(EcoChallengeSerializer(challenge, context=context).data)
+    
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
+    def progress(self, request, pk=None):
+        """Get the current user's progress on a challenge"""
+        challenge = self.get_object()
+        progress = ChallengeProgress.objects.filter(
+            challenge=challenge, user=request.user
+        ).select_related('challenge').first()
+        if progress is None:
+            progress = ChallengeProgress(challenge=challenge, user=request.user)
+        return Response(ChallengeProgressSerializer(progress).data)
+
+
+class ParetoFrontierViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for the precomputed price vs EcoScore frontier of a category"""
+    serializer_class = ParetoFrontierPointSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = None
+    
+    def get_queryset(self):
+        if self.action != 'list':
+            return ParetoFrontierPoint.objects.select_related('product', 'merchant_product')
+        
+        params = self.request.query_params
+        max_price = params.get('max_price')
+        min_score = params.get('min_score')
+        return ParetoFrontierService.get_frontier(
+            params.get('catalog', 'product'),
+            params.get('category', ''),
+            params.get('subcategory', ''),
+            max_price=Decimal(max_price) if max_price else None,
+            min_score=float(min_score) if min_score else None,
+        ).select_related('product', 'merchant_product')
+    
+    def list(self, request, *args, **kwargs):
+        """List the frontier of one category, cheapest first, optionally within a budget"""
+        params = request.query_params
+        if not params.get('category'):
+            return Response({'error': 'category is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if params.get('catalog', 'product') not in ParetoFrontierService.CATALOG_FIELDS:
+            return Response({
+                'error': f"catalog must be one of {', '.join(ParetoFrontierService.CATALOG_FIELDS)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return super().list(request, *args, **kwargs)
+        except (InvalidOperation, ValueError):
+            return Response({'error': 'max_price and min_score must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class EcoScoreBadgeView(generics.GenericAPIView):
+    """Static EcoScore badge images for emails, partners and SEO pages"""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    
+    CACHE_CONTROL = 'public, max-age=31536000, immutable'
+    
+    def get(self, request, grade, file_format):
+        """Serve an SVG or PNG badge for a grade, optionally with the score"""
+        badge_service = EcoScoreBadgeService()
+        grade = grade.upper()
+        size = request.query_params.get('size', 'medium')
+        theme = request.query_params.get('theme', 'light')
+        if grade not in badge_service.GRADE_COLORS or file_format not in badge_service.FORMATS:
+            return Response({'error': 'Unknown badge'}, status=status.HTTP_404_NOT_FOUND)
+        if size not in badge_service.SIZES or theme not in badge_service.THEMES:
             return Response({
-                'error': 'No cart items provided'
+                'error': f"size must be one of {', '.join(badge_service.SIZES)} and "
+                         f"theme one of {', '.join(badge_service.THEMES)}"
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        score = request.query_params.get('score')
+        if score is not None:
+            try:
+                score = min(max(round(float(score)), 0), 100)
+            except (ValueError, OverflowError):
+                return Response({'error': 'score must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Keys are content addresses, so a matching ETag needs no disk access at all
+        key = badge_service.get_key(grade, score, size, theme, file_format)
+        etag = f'"{key}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            path, key = badge_service.get_badge(grade, score, size, theme, file_format)
+            response = FileResponse(open(path, 'rb'), content_type=badge_service.FORMATS[file_format])
+        response['ETag'] = etag
+        response['Cache-Control'] = self.CACHE_CONTROL
+        return response
+
+
+class EcoScoreGamificationView(generics.GenericAPIView):
+    """View for EcoScore gamification features"""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        """Check and award achievements based on the user's confirmed orders"""
         gamification_service = EcoScoreGamificationService()
         
         try:
-            gamification_service.check_achievements(request.user, cart_items)
+            gamification_service.check_achievements(request.user)
             
             # Get updated achievements
             achievements = UserEcoAchievement.objects.filter(
@@ -0,0 +1,102 @@
+"""
+Conditional GET for viewsets: ETag and Last-Modified from timestamps, checked before serializing
+"""
+import functools
+import hashlib
+import json
+from calendar import timegm
+from datetime import datetime
+from typing import Callable, Sequence
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """
+    Answers If-None-Match and If-Modified-Since on list and retrieve with a 304 before anything is
+    serialized. The validators are the newest value of each conditional field (columns, or timestamps
+    across relations) and the number of rows behind them. Listings aggregate over the rows of the page
+    they already fetched, never the whole table, and add the page's ids and links so rows entering or
+    leaving the page change the ETag; since membership has no timestamp, pages send no Last-Modified.
+    Last-Modified has one-second resolution; the ETag is the exact validator.
+    """
+    conditional_fields: Sequence[str] = ('updated_at',)
+    # Reverse relations, only aggregated for a single object where the join stays small
+    conditional_detail_fields: Sequence[str] = ()
+    # Responses differ per user, so the ETag includes the user and caches must not share them
+    conditional_per_user = False
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            # Unpaginated listings serialize every row anyway
+            return self.get_conditional_response(
+                request, self.get_validators(queryset, self.conditional_fields),
+                functools.partial(super().list, request, *args, **kwargs),
+            )
+        
+        def render():
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
+        pks = [row.pk for row in page]
+        validators = {
+            'rows': pks,
+            'page': self.get_paginated_response([]).data,
+            **self.get_validators(queryset.model._default_manager.filter(pk__in=pks), self.conditional_fields),
+        }
+        return self.get_conditional_response(request, validators, render, send_last_modified=False)
+    
+    def retrieve(self, request, *args, **kwargs):
+        render = functools.partial(super().retrieve, request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+            validators = self.get_validators(
+                queryset, [*self.conditional_fields, *self.conditional_detail_fields]
+            ) if request.method in ('GET', 'HEAD') else None
+        except (KeyError, ValueError, TypeError, ValidationError):
+            # Let get_object answer malformed lookups
+            return render()
+        if validators is not None and not validators['count']:
+            return render()
+        return self.get_conditional_response(request, validators, render)
+    
+    def get_validators(self, queryset, fields: Sequence[str]) -> dict:
+        aggregates = {f'newest_{index}': Max(field) for index, field in enumerate(fields)}
+        for relation in {field.rsplit('__', 1)[0] for field in fields if '__' in field}:
+            aggregates[f'count_{relation}'] = Count(relation, distinct=True)
+        return queryset.order_by().aggregate(count=Count('pk', distinct=True), **aggregates)
+    
+    def get_conditional_response(self, request, validators, render: Callable, send_last_modified: bool = True):
+        if request.method not in ('GET', 'HEAD') or validators is None:
+            return render()
+        
+        timestamps = [value for value in validators.values() if isinstance(value, datetime)]
+        last_modified = timegm(max(timestamps).utctimetuple()) if timestamps and send_last_modified else None
+        digest = hashlib.sha1(json.dumps([
+            type(self).__name__,
+            self.action,
+            request.get_full_path(),
+            request.accepted_renderer.format,
+            request.user.pk if self.conditional_per_user else None,
+            sorted(validators.items()),
+        ], default=str).encode()).hexdigest()
+        etag = f'"{digest}"'
+        
+        response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = render()
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # Clients keep the body but revalidate it on every use
+            response['Cache-Control'] = 'private, no-cache' if self.conditional_per_user else 'no-cache'
+        return response
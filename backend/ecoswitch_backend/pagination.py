@@ -0,0 +1,200 @@
+"""
+Keyset pagination shared by the product and order listings
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on the queryset's ordering plus the primary key, so a deep page costs the
+    same index range scan as the first one. Cursors are opaque and a capped total is returned on request.
+    Orderings that are not plain non-null columns (search relevance, nullable scores) fall back to an
+    offset carried in the cursor; search results are capped by the catalog index anyway.
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    total_query_param = 'include_total'
+    # Counting stops past this many rows; larger totals are reported as a lower bound
+    max_total = 10000
+    invalid_cursor_message = 'Invalid cursor'
+    
+    def paginate_queryset(self, queryset, request, view=None) -> List[Any]:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.total = None
+        if request.query_params.get(self.total_query_param) == 'true':
+            self.total = queryset.order_by()[:self.max_total + 1].count()
+        
+        cursor = self.decode_cursor(request)
+        self.ordering = self.get_ordering(queryset)
+        if self.ordering is None:
+            return self.paginate_offset(queryset, cursor.get('o', 0) if cursor else 0)
+        
+        reverse = bool(cursor and cursor.get('r'))
+        if cursor:
+            values = cursor.get('k')
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(self.get_keyset_filter(queryset.model, values, reverse))
+        queryset = queryset.order_by(*[
+            f"{'-' if descending != reverse else ''}{name}" for name, descending in self.ordering
+        ])
+        
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+        
+        self.next_cursor = self.previous_cursor = None
+        if results and (has_more if not reverse else cursor):
+            self.next_cursor = {'k': self.get_values(results[-1])}
+        if results and (has_more if reverse else cursor):
+            self.previous_cursor = {'k': self.get_values(results[0]), 'r': 1}
+        return results
+    
+    def paginate_offset(self, queryset, offset: int) -> List[Any]:
+        if not isinstance(offset, int) or offset < 0:
+            raise NotFound(self.invalid_cursor_message)
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.next_cursor = {'o': offset + self.page_size} if len(results) > self.page_size else None
+        self.previous_cursor = {'o': max(offset - self.page_size, 0)} if offset else None
+        return results[:self.page_size]
+    
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+    
+    @staticmethod
+    def get_ordering(queryset) -> Optional[List[Tuple[str, bool]]]:
+        """
+        (field name, descending) pairs ending with the primary key, or None when the ordering
+        cannot be expressed as a keyset
+        """
+        model = queryset.model
+        terms = list(queryset.query.order_by) or (list(model._meta.ordering) if queryset.query.default_ordering else [])
+        ordering = []
+        for term in terms:
+            if not isinstance(term, str) or term == '?':
+                return None
+            name = term.lstrip('-')
+            if name == 'pk':
+                name = model._meta.pk.name
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            # Related fields order by the related model's ordering, and NULLs sort differently per database
+            if field.is_relation or field.null:
+                return None
+            ordering.append((field.name, term.startswith('-')))
+            if field.primary_key or field.unique:
+                return ordering
+        # The primary key breaks ties, in the direction of the last sort key so one index serves both
+        ordering.append((model._meta.pk.name, ordering[-1][1] if ordering else False))
+        return ordering
+    
+    def get_keyset_filter(self, model, values: List[Any], reverse: bool) -> Q:
+        """Rows after the cursor in (key 1, key 2, ..., pk) order"""
+        try:
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, values)
+            ]
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.ordering, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+    
+    def get_values(self, instance) -> List[Any]:
+        return [getattr(instance, name) for name, _ in self.ordering]
+    
+    def encode_cursor(self, cursor: Optional[Dict[str, Any]]) -> Optional[str]:
+        if cursor is None:
+            return None
+        # str keeps full datetime precision, which DjangoJSONEncoder truncates to milliseconds
+        data = json.dumps(cursor, default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+    
+    def decode_cursor(self, request) -> Optional[Dict[str, Any]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(cursor, dict):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+    
+    def get_link(self, cursor: Optional[Dict[str, Any]]) -> Optional[str]:
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        if cursor == {'o': 0}:
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(cursor))
+    
+    def get_next_link(self) -> Optional[str]:
+        return self.get_link(self.next_cursor)
+    
+    def get_previous_link(self) -> Optional[str]:
+        return self.get_link(self.previous_cursor)
+    
+    def get_page_info(self) -> Dict[str, Any]:
+        """Cursors and optional total for views that build their own response"""
+        info = {
+            'next_cursor': self.encode_cursor(self.next_cursor),
+            'previous_cursor': self.encode_cursor(self.previous_cursor),
+            'page_size': self.page_size,
+        }
+        info.update(self.get_total_info())
+        return info
+    
+    def get_total_info(self) -> Dict[str, Any]:
+        if self.total is None:
+            return {}
+        return {'total': min(self.total, self.max_total), 'total_is_exact': self.total <= self.max_total}
+    
+    def get_paginated_response(self, data) -> Response:
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            *self.get_total_info().items(),
+            ('results', data),
+        ]))
+    
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'total': {'type': 'integer'},
+                'total_is_exact': {'type': 'boolean'},
+                'results': schema,
+            },
+        }
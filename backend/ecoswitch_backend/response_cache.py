@@ -0,0 +1,161 @@
+"""
+Response cache for read-mostly endpoints, invalidated by per-model version counters
+"""
+import functools
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+VERSION_KEY = 'response-cache:version:{}'
+RESPONSE_KEY = 'response-cache:{view}:{versions}:{request}'
+# Backends whose entries, version counters included, are private to each process
+PROCESS_LOCAL_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache',)
+
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {'hits': 0, 'misses': 0})
+_stats_lock = threading.Lock()
+_watched_models = set()
+
+
+def get_versions(models: Iterable) -> str:
+    """Current version of each model; a version missing from the cache starts at the current time"""
+    keys = [VERSION_KEY.format(model._meta.label_lower) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def bump_version(model):
+    key = VERSION_KEY.format(model._meta.label_lower)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted: restarting from the clock keeps it above every version still in use
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def is_shared() -> bool:
+    """Whether a version bumped by one worker process is seen by all of them"""
+    return settings.WEB_CONCURRENCY <= 1 or settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def invalidate_model(sender, **kwargs):
+    """Bump once the change is committed, so a request racing the save cannot cache the old rows anew"""
+    transaction.on_commit(lambda: bump_version(sender))
+
+
+def watch(models: Iterable):
+    for model in models:
+        if model in _watched_models:
+            continue
+        _watched_models.add(model)
+        post_save.connect(invalidate_model, sender=model, weak=False)
+        post_delete.connect(invalidate_model, sender=model, weak=False)
+
+
+def get_request_key(request, view_kwargs: Dict[str, Any]) -> str:
+    """Host, path and query parameters with their order normalized"""
+    normalized = [
+        request.get_host(),
+        request.path,
+        sorted(request.query_params.lists()),
+        sorted((key, str(value)) for key, value in view_kwargs.items()),
+    ]
+    return hashlib.sha1(json.dumps(normalized).encode()).hexdigest()
+
+
+def record(view_name: str, outcome: str):
+    with _stats_lock:
+        _stats[view_name][outcome] += 1
+
+
+def get_stats() -> Dict[str, Dict[str, Any]]:
+    """Hits, misses and hit rate of each cached view in this process"""
+    with _stats_lock:
+        return {
+            view_name: {**counts, 'hit_rate': round(counts['hits'] / max(counts['hits'] + counts['misses'], 1), 3)}
+            for view_name, counts in sorted(_stats.items())
+        }
+
+
+def get_cached_response(view_name: str, models, timeout: int, request, view_kwargs, render) -> Response:
+    if request.method != 'GET' or not is_shared():
+        return render()
+    key = RESPONSE_KEY.format(
+        view=view_name, versions=get_versions(models), request=get_request_key(request, view_kwargs)
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        record(view_name, 'hits')
+        data, status_code = cached
+        return Response(data, status=status_code, headers={'X-Cache': 'HIT'})
+    
+    record(view_name, 'misses')
+    response = render()
+    if response.status_code == status.HTTP_200_OK:
+        cache.set(key, (response.data, response.status_code), timeout)
+        response['X-Cache'] = 'MISS'
+    return response
+
+
+def cache_response(*models, timeout: Optional[int] = None, actions=('list', 'retrieve')):
+    """
+    Cache the serialized data of a view until one of the models is saved or deleted.
+    Decorates a viewset class (its list and retrieve actions) or a function view under @api_view.
+    Only public GET endpoints should opt in: the key ignores the user.
+    
+    Invalidation goes through the cache, so it only reaches every process when the cache is shared.
+    With the default per-process memory cache and more than one worker (WEB_CONCURRENCY), responses
+    are rendered uncached rather than served stale for up to the timeout.
+    """
+    watch(models)
+    
+    def decorator(view):
+        if isinstance(view, type):
+            for action in actions:
+                method = getattr(view, action, None)
+                if method is not None:
+                    setattr(view, action, wrap_method(f'{view.__module__}.{view.__qualname__}.{action}', method))
+            return view
+        return wrap_function(f'{view.__module__}.{view.__qualname__}', view)
+    
+    def wrap_method(view_name, method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            return get_cached_response(
+                view_name, models, get_timeout(), request, kwargs, lambda: method(self, request, *args, **kwargs)
+            )
+        return wrapper
+    
+    def wrap_function(view_name, function):
+        @functools.wraps(function)
+        def wrapper(request, *args, **kwargs):
+            return get_cached_response(
+                view_name, models, get_timeout(), request, kwargs, lambda: function(request, *args, **kwargs)
+            )
+        return wrapper
+    
+    def get_timeout() -> int:
+        return timeout if timeout is not None else settings.RESPONSE_CACHE_TIMEOUT
+    
+    return decorator
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def response_cache_stats(request):
+    """Hit rates of the cached endpoints, counted per process since it started"""
+    return Response({'views': get_stats()})
@@ -0,0 +1,73 @@
+"""
+Denormalized review counters shared by the products and ecommerce catalogs
+"""
+from typing import Dict, Optional, Tuple
+
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+RATING_COUNT_FIELDS = {rating: f'rating_{rating}_count' for rating in range(1, 6)}
+COUNTER_FIELDS = ['review_count', 'rating_sum'] + list(RATING_COUNT_FIELDS.values())
+
+
+def get_counted_state(review) -> Optional[Tuple[int, int]]:
+    """(product id, rating) a review contributes to its product's counters, None when it does not count"""
+    if review is None or not getattr(review, 'is_approved', True):
+        return None
+    return review.product_id, review.rating
+
+
+def move_review(product_model, previous: Optional[Tuple[int, int]], current: Optional[Tuple[int, int]]):
+    """
+    Move a review's contribution from its previous to its current (product id, rating).
+    Counters are changed with F() so concurrent reviews of the same product never overwrite each other.
+    """
+    if previous == current:
+        return
+    deltas: Dict[int, Dict[str, int]] = {}
+    for state, sign in ((previous, -1), (current, 1)):
+        if state is None:
+            continue
+        product_id, rating = state
+        product_deltas = deltas.setdefault(product_id, {})
+        for field, amount in (('review_count', 1), ('rating_sum', rating), (RATING_COUNT_FIELDS[rating], 1)):
+            product_deltas[field] = product_deltas.get(field, 0) + sign * amount
+    for product_id, product_deltas in deltas.items():
+        updates = {field: F(field) + amount for field, amount in product_deltas.items() if amount}
+        if updates:
+            # The product's ratings changed, so its ETag and Last-Modified must too
+            product_model.objects.filter(pk=product_id).update(**updates, updated_at=timezone.now())
+
+
+def reconcile(product_model, review_model, counted: Q = Q(), chunk_size: int = 500) -> int:
+    """
+    Recompute every product's counters from its reviews, accepting historical models from migrations
+    
+    Returns:
+        Number of products whose counters were corrected
+    """
+    expected = {
+        row['product_id']: row for row in review_model.objects.filter(counted).values('product_id').annotate(
+            review_count=Count('id'),
+            rating_sum=Sum('rating'),
+            **{field: Count('id', filter=Q(rating=rating)) for rating, field in RATING_COUNT_FIELDS.items()},
+        ).order_by()
+    }
+    empty = dict.fromkeys(COUNTER_FIELDS, 0)
+    
+    corrected = []
+    total = 0
+    for product in product_model.objects.only('pk', *COUNTER_FIELDS).order_by('pk').iterator(chunk_size=chunk_size):
+        counters = expected.get(product.pk, empty)
+        if any(getattr(product, field) != (counters[field] or 0) for field in COUNTER_FIELDS):
+            for field in COUNTER_FIELDS:
+                setattr(product, field, counters[field] or 0)
+            corrected.append(product)
+        if len(corrected) >= chunk_size:
+            product_model.objects.bulk_update(corrected, COUNTER_FIELDS)
+            total += len(corrected)
+            corrected = []
+    if corrected:
+        product_model.objects.bulk_update(corrected, COUNTER_FIELDS)
+        total += len(corrected)
+    return total
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'products',
     'ecommerce',
     'ecoscore',
+    'catalog',
 ]
 
 MIDDLEWARE = [
@@ -112,6 +113,8 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Uploads are stored once per distinct content; run collect_media_blobs to drop unreferenced ones
+DEFAULT_FILE_STORAGE = 'ecoswitch_backend.storage.ContentAddressedStorage'
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -200,6 +203,40 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# EcoScore history retention
+# Rows older than the retention window are compacted to one row per product per period
+ECOSCORE_HISTORY_RETENTION_DAYS = config('ECOSCORE_HISTORY_RETENTION_DAYS', default=365, cast=int)
+ECOSCORE_HISTORY_COMPACTION_PERIOD = config('ECOSCORE_HISTORY_COMPACTION_PERIOD', default='month')
+
+# EcoScore badge images
+# Rendered badges are written once to this directory and served from there afterwards
+ECOSCORE_BADGE_CACHE_DIR = config('ECOSCORE_BADGE_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'badges'))
+
+# Caching
+# Defaults to a per-process memory cache; point CACHE_BACKEND/CACHE_LOCATION at a shared cache (e.g. Redis)
+# when running several processes, so a save invalidates cached responses in all of them
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='ecoswitch'),
+    }
+}
+# Upper bound on how long a cached endpoint response lives; saves invalidate it sooner
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+# Worker processes serving requests (gunicorn reads the same variable). A per-process cache cannot be
+# invalidated across several of them, so with more than one the cached endpoints are served uncached
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=1, cast=int)
+
+# Product image thumbnails
+# Rendered by this many background threads per process; 0 renders them right after the upload commits
+THUMBNAIL_WORKERS = config('THUMBNAIL_WORKERS', default=2, cast=int)
+
+# Trending products
+# Orders, reviews and wishlist adds lose half their weight every TRENDING_HALF_LIFE_HOURS; run
+# update_trending_products periodically (e.g. every 15 minutes from cron) to keep TRENDING_LIST_SIZE per list
+TRENDING_HALF_LIFE_HOURS = config('TRENDING_HALF_LIFE_HOURS', default=72, cast=float)
+TRENDING_LIST_SIZE = config('TRENDING_LIST_SIZE', default=20, cast=int)
+
 # Logging
 # Ensure logs directory exists for file handler
 LOG_DIR = BASE_DIR / 'logs'
@@ -0,0 +1,126 @@
+"""
+Content-addressed media storage: every distinct upload is stored once, under the hash of its content
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections import Counter
+from typing import Iterator, Tuple
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils.deconstruct import deconstructible
+
+BLOB_DIR = 'blobs'
+BLOB_NAME = re.compile(rf'{BLOB_DIR}/[0-9a-f]{{2}}/[0-9a-f]{{64}}(?:\.[0-9a-z]+)?')
+TEMPORARY_PREFIX = '.upload-'
+
+# Fields holding media URLs rather than file names, copied from an image when the row was written
+URL_REFERENCE_FIELDS = {
+    'products.Product': ['additional_images', 'thumbnails'],
+    'products.ProductImage': ['thumbnails'],
+    'ecommerce.Product': ['primary_image_url', 'thumbnails'],
+    'ecommerce.ProductImage': ['thumbnails'],
+    'merchants.MerchantProduct': ['additional_images', 'thumbnails'],
+    'catalog.CatalogEntry': ['image_url'],
+    'customers.CartItem': ['product_image'],
+    'customers.OrderItem': ['product_image'],
+    'customers.CustomerWishlist': ['product_image'],
+    'customers.CustomerRecommendation': ['product_image'],
+}
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Uploads are hashed with SHA-256 while they stream to disk and named after the digest, so identical
+    files share one blob and a duplicate upload writes nothing. Since blobs are shared, delete() keeps
+    them; collect_media_blobs removes the ones no row references. Files saved before this storage keep
+    their names and are deleted as usual.
+    """
+    chunk_size = 64 * 1024
+    
+    @staticmethod
+    def get_blob_name(digest: str, extension: str) -> str:
+        return f'{BLOB_DIR}/{digest[:2]}/{digest}{extension}'
+    
+    def get_available_name(self, name, max_length=None):
+        # The final name depends on the content only, so it never needs a suffix
+        return name
+    
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        if not re.fullmatch(r'\.[0-9a-z]{1,10}', extension):
+            extension = ''
+        directory = self.path(BLOB_DIR)
+        os.makedirs(directory, exist_ok=True)
+        
+        # Streamed beside the blobs so moving it into place is an atomic rename
+        digest = hashlib.sha256()
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=TEMPORARY_PREFIX)
+        try:
+            with os.fdopen(descriptor, 'wb') as temporary:
+                for chunk in content.chunks(self.chunk_size):
+                    digest.update(chunk)
+                    temporary.write(chunk)
+            name = self.get_blob_name(digest.hexdigest(), extension)
+            path = self.path(name)
+            try:
+                # Already stored: refresh the blob's age so a collection running right now keeps it
+                os.utime(path)
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.chmod(temporary_path, self.file_permissions_mode or 0o644)
+                os.replace(temporary_path, path)
+                temporary_path = None
+        finally:
+            if temporary_path is not None and os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        return name
+    
+    def delete(self, name):
+        if BLOB_NAME.fullmatch(name or ''):
+            return
+        super().delete(name)
+    
+    def remove_blob(self, name: str):
+        """Delete a blob for good; callers make sure nothing references it"""
+        path = self.path(name)
+        if os.path.exists(path):
+            os.remove(path)
+    
+    def list_blobs(self) -> Iterator[Tuple[str, int, float]]:
+        """(name, size, modification time) of every blob, including abandoned temporary uploads"""
+        root = self.path(BLOB_DIR)
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                stat = os.stat(path)
+                name = os.path.relpath(path, self.location).replace(os.sep, '/')
+                yield name, stat.st_size, stat.st_mtime
+
+
+def get_reference_counts() -> Counter:
+    """Number of rows referencing each blob, through file fields or stored media URLs"""
+    counts = Counter()
+    for model in apps.get_models():
+        file_fields = [
+            field.name for field in model._meta.concrete_fields
+            if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage)
+        ]
+        url_fields = URL_REFERENCE_FIELDS.get(model._meta.label, [])
+        if not file_fields and not url_fields:
+            continue
+        rows = model._base_manager.values_list(*file_fields, *url_fields).order_by()
+        for row in rows.iterator(chunk_size=2000):
+            for value in row[:len(file_fields)]:
+                if value:
+                    counts[value] += 1
+            for value in row[len(file_fields):]:
+                if value:
+                    text = value if isinstance(value, str) else json.dumps(value)
+                    counts.update(set(BLOB_NAME.findall(text)))
+    return counts
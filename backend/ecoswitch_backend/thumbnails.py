@@ -0,0 +1,145 @@
+"""
+Thumbnails of product images, generated off the request path and stored on the image's row
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Longest side in pixels; images are never upscaled
+THUMBNAIL_SIZES = {'small': 160, 'medium': 480}
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+THUMBNAIL_DIR = 'thumbnails'
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def render_thumbnails(source, storage=default_storage) -> Dict[str, Dict[str, str]]:
+    """
+    Write every size and format of an image file to storage. Variants are content-addressed like
+    any upload, so re-rendering an image reuses its blobs and variants no row references any more
+    are removed by collect_media_blobs.
+    
+    Returns:
+        URLs by size and format, e.g. {'small': {'webp': ..., 'jpeg': ...}}
+    """
+    with source.open('rb'):
+        image = Image.open(source)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    
+    stem = os.path.splitext(os.path.basename(source.name))[0]
+    thumbnails = {}
+    for size, longest_side in THUMBNAIL_SIZES.items():
+        thumbnail = image.copy()
+        thumbnail.thumbnail((longest_side, longest_side), Image.LANCZOS)
+        variants = {}
+        for extension, (image_format, options) in THUMBNAIL_FORMATS.items():
+            variant = thumbnail
+            if image_format == 'JPEG' and variant.mode == 'RGBA':
+                # JPEG has no alpha channel; flatten onto white like the storefront background
+                flattened = Image.new('RGB', variant.size, (255, 255, 255))
+                flattened.paste(variant, mask=variant.getchannel('A'))
+                variant = flattened
+            buffer = BytesIO()
+            variant.save(buffer, image_format, **options)
+            name = storage.save(f'{THUMBNAIL_DIR}/{stem}_{size}.{extension}', ContentFile(buffer.getvalue()))
+            variants[extension] = storage.url(name)
+        thumbnails[size] = variants
+    return thumbnails
+
+
+def needs_thumbnails(instance) -> bool:
+    """Whether the row's thumbnails were rendered from another image than its current one"""
+    source = instance.thumbnail_source
+    return (instance.thumbnails or {}).get('source', '') != (source.name if source else '')
+
+
+def update_thumbnails(model, pk):
+    """
+    Render thumbnails of a row's current image and save them, with updated_at when the model has one.
+    Models provide `thumbnail_source` (an image field file or None) and a `thumbnails` JSON field.
+    """
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not needs_thumbnails(instance):
+        return
+    source = instance.thumbnail_source
+    thumbnails = {'source': source.name, **render_thumbnails(source)} if source else {}
+    
+    # Another upload may have replaced the image while rendering; its own job renders that one
+    current = model.objects.filter(pk=pk).first()
+    if current is None or current.thumbnail_source != source:
+        return
+    current.thumbnails = thumbnails
+    # The variants are serialized with the row, so its updated_at (and ETag) must move too
+    field_names = {field.name for field in model._meta.concrete_fields}
+    current.save(update_fields=[name for name in ('thumbnails', 'updated_at') if name in field_names])
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.THUMBNAIL_WORKERS, thread_name_prefix='thumbnails')
+        return _executor
+
+
+def try_update_thumbnails(model, pk):
+    """A file that cannot be read or decoded keeps the originals in use"""
+    try:
+        update_thumbnails(model, pk)
+    except Exception:
+        logger.exception('Could not render thumbnails of %s %s', model._meta.label, pk)
+
+
+def run_update_thumbnails(model, pk):
+    try:
+        try_update_thumbnails(model, pk)
+    finally:
+        # Worker threads open their own connections
+        connections.close_all()
+
+
+def schedule_thumbnails(instance):
+    """
+    Render thumbnails once the save is committed, in a worker thread unless THUMBNAIL_WORKERS is 0.
+    Saves that keep the same image are skipped.
+    """
+    if not needs_thumbnails(instance):
+        return
+    model, pk = type(instance), instance.pk
+    
+    def submit():
+        if settings.THUMBNAIL_WORKERS:
+            get_executor().submit(run_update_thumbnails, model, pk)
+        else:
+            try_update_thumbnails(model, pk)
+    transaction.on_commit(submit)
+
+
+def get_absolute_thumbnails(thumbnails: Optional[dict], request=None) -> Dict[str, Dict[str, str]]:
+    """Variant URLs of a thumbnails field, absolute when a request is given"""
+    return {
+        size: {
+            extension: request.build_absolute_uri(url) if request else url
+            for extension, url in variants.items()
+        }
+        for size, variants in (thumbnails or {}).items()
+        if size in THUMBNAIL_SIZES
+    }
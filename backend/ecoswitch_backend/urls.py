@@ -5,6 +5,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from ecoswitch_backend.response_cache import response_cache_stats
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -14,6 +15,8 @@ urlpatterns = [
     path('api/products/', include('products.urls')),
     path('api/ecommerce/', include('ecommerce.urls')),
     path('api/ecoscore/', include('ecoscore.urls')),
+    path('api/catalog/', include('catalog.urls')),
+    path('api/cache-stats/', response_cache_stats, name='response_cache_stats'),
 ]
 
 if settings.DEBUG:
@@ -26,7 +26,7 @@ class MerchantProductAdmin(admin.ModelAdmin):
     list_filter = ('category', 'is_active', 'is_featured', 'is_eco_friendly', 'created_at')
     search_fields = ('name', 'merchant__business_name', 'brand', 'sku')
     raw_id_fields = ('merchant',)
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('thumbnails', 'created_at', 'updated_at')
 
 
 @admin.register(MerchantOrder)
@@ -4,6 +4,13 @@ from django.apps import AppConfig
 class MerchantsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'merchants'
+    
+    def ready(self):
+        """Import signal handlers when the app is ready"""
+        try:
+            import merchants.signals
+        except ImportError:
+            pass
 
 
 
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('merchants', '0004_remove_merchantprofile_address_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='merchantorder',
+            index=models.Index(fields=['merchant', 'created_at'], name='merchants_order_merch_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='merchantproduct',
+            index=models.Index(fields=['merchant', 'created_at'], name='merchants_product_merch_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='merchantproduct',
+            index=models.Index(fields=['is_active', 'created_at'], name='merchants_product_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='merchantproduct',
+            index=models.Index(fields=['is_active', 'price'], name='merchants_product_price_idx'),
+        ),
+    ]
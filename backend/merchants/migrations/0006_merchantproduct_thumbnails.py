@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('merchants', '0005_merchantorder_merchants_order_merch_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='merchantproduct',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -92,6 +92,8 @@ class MerchantProduct(models.Model):
     # Images
     primary_image = models.ImageField(upload_to='product_images/', blank=True)
     additional_images = models.JSONField(default=list, blank=True)
+    # Variant URLs of the primary image by size and format (see ecoswitch_backend.thumbnails)
+    thumbnails = models.JSONField(default=dict, blank=True)
     
     # Inventory
     stock_quantity = models.PositiveIntegerField(default=0)
@@ -128,9 +130,19 @@ class MerchantProduct(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of listings reads these in (sort key, id) order
+            models.Index(fields=['merchant', 'created_at'], name='merchants_product_merch_idx'),
+            models.Index(fields=['is_active', 'created_at'], name='merchants_product_active_idx'),
+            models.Index(fields=['is_active', 'price'], name='merchants_product_price_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.merchant.business_name}"
+    
+    @property
+    def thumbnail_source(self):
+        return self.primary_image or None
 
 
 class MerchantOrder(models.Model):
@@ -175,6 +187,9 @@ class MerchantOrder(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['merchant', 'created_at'], name='merchants_order_merch_idx'),
+        ]
     
     def __str__(self):
         return f"Order {self.order_number} - {self.merchant.business_name}"
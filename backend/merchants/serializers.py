@@ -78,7 +78,7 @@ class MerchantProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = MerchantProduct
         fields = '__all__'
-        read_only_fields = ('merchant', 'created_at', 'updated_at')
+        read_only_fields = ('merchant', 'thumbnails', 'created_at', 'updated_at')
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
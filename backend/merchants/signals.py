@@ -0,0 +1,14 @@
+"""
+Signal handlers for Merchants app
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from ecoswitch_backend.thumbnails import schedule_thumbnails
+from .models import MerchantProduct
+
+
+@receiver(post_save, sender=MerchantProduct)
+def render_thumbnails(sender, instance, **kwargs):
+    """Thumbnails of a new or replaced primary image are rendered in the background"""
+    schedule_thumbnails(instance)
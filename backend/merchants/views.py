@@ -14,6 +14,8 @@ from .serializers import (
     MerchantProductSerializer, MerchantOrderSerializer, OrderItemSerializer, 
     MerchantAnalyticsSerializer
 )
+from catalog.services import CatalogSearchIndex
+from ecoswitch_backend.pagination import KeysetPagination
 
 
 class MerchantProfileViewSet(viewsets.ModelViewSet):
@@ -37,21 +39,12 @@ class MerchantProductViewSet(viewsets.ModelViewSet):
     serializer_class = MerchantProductSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         merchant_profile = get_object_or_404(MerchantProfile, user=self.request.user)
         queryset = MerchantProduct.objects.filter(merchant=merchant_profile)
         
-        # Search functionality
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | 
-                Q(description__icontains=search) |
-                Q(category__icontains=search) |
-                Q(brand__icontains=search)
-            )
-        
         # Filter by category
         category = self.request.query_params.get('category', None)
         if category:
@@ -69,6 +62,11 @@ class MerchantProductViewSet(viewsets.ModelViewSet):
         elif stock_status == 'out':
             queryset = queryset.filter(stock_quantity=0)
         
+        # Search functionality, ranked by relevance; merchants also find their inactive products
+        search = self.request.query_params.get('search', None)
+        if search:
+            return CatalogSearchIndex().filter_queryset(queryset, 'merchant_product', search, active_only=False)
+        
         return queryset.order_by('-created_at')
     
     def perform_create(self, serializer):
@@ -134,8 +132,10 @@ class MerchantProductViewSet(viewsets.ModelViewSet):
             brand=original_product.brand,
             tags=original_product.tags,
             specifications=original_product.specifications,
+            # The copy references the same image blobs and thumbnails instead of storing them again
             primary_image=original_product.primary_image,
             additional_images=original_product.additional_images,
+            thumbnails=original_product.thumbnails,
             stock_quantity=0,  # Start with 0 stock
             min_order_quantity=original_product.min_order_quantity,
             max_order_quantity=original_product.max_order_quantity,
@@ -185,6 +185,7 @@ class MerchantOrderViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = MerchantOrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         merchant_profile = get_object_or_404(MerchantProfile, user=self.request.user)
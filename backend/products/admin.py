@@ -36,7 +36,7 @@ class ProductAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description', 'sku', 'brand__name', 'category__name')
     prepopulated_fields = {'slug': ('name',)}
     raw_id_fields = ('brand', 'category', 'subcategory')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('thumbnails', 'created_at', 'updated_at')
 
 
 @admin.register(ProductReview)
@@ -54,7 +54,7 @@ class ProductImageAdmin(admin.ModelAdmin):
     list_filter = ('created_at',)
     search_fields = ('product__name', 'alt_text')
     raw_id_fields = ('product',)
-    readonly_fields = ('created_at',)
+    readonly_fields = ('thumbnails', 'created_at', 'updated_at')
 
 
 @admin.register(ProductVariant)
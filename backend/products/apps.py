@@ -4,6 +4,13 @@ from django.apps import AppConfig
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+    
+    def ready(self):
+        """Import signal handlers when the app is ready"""
+        try:
+            import products.signals
+        except ImportError:
+            pass
 
 
 
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:09
+
+from django.db import migrations, models
+from django.db.models import Q
+
+from ecoswitch_backend.review_counters import reconcile
+
+
+def backfill_review_counters(apps, schema_editor):
+    reconcile(apps.get_model('products', 'Product'), apps.get_model('products', 'ProductReview'), Q())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_products_active_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_review_counters, migrations.RunPython.noop),
+    ]
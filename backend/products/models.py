@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from ecoswitch_backend.review_counters import get_counted_state, move_review
 
 
 class Category(models.Model):
@@ -94,6 +95,8 @@ class Product(models.Model):
     # Images
     primary_image = models.ImageField(upload_to='product_images/')
     additional_images = models.JSONField(default=list, blank=True)
+    # Variant URLs of the primary image by size and format (see ecoswitch_backend.thumbnails)
+    thumbnails = models.JSONField(default=dict, blank=True)
     
     # Inventory
     stock_quantity = models.PositiveIntegerField(default=0)
@@ -135,12 +138,26 @@ class Product(models.Model):
     meta_title = models.CharField(max_length=200, blank=True)
     meta_description = models.TextField(blank=True)
     
+    # Review counters, kept in step with the reviews (see ecoswitch_backend.review_counters)
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of listings reads these in (sort key, id) order
+            models.Index(fields=['is_active', 'created_at'], name='products_active_created_idx'),
+            models.Index(fields=['is_active', 'price'], name='products_active_price_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -154,6 +171,18 @@ class Product(models.Model):
         if self.is_on_sale:
             return self.original_price - self.price
         return 0
+    
+    @property
+    def rating_average(self):
+        return round(self.rating_sum / self.review_count, 1) if self.review_count else 0.0
+    
+    @property
+    def rating_histogram(self):
+        return {rating: getattr(self, f'rating_{rating}_count') for rating in range(1, 6)}
+    
+    @property
+    def thumbnail_source(self):
+        return self.primary_image or None
 
 
 class ProductReview(models.Model):
@@ -177,6 +206,13 @@ class ProductReview(models.Model):
     
     def __str__(self):
         return f"{self.product.name} - {self.user.email} - {self.rating} stars"
+    
+    def save(self, *args, **kwargs):
+        """Save and move the review's contribution to the product counters in one transaction"""
+        with transaction.atomic():
+            previous = ProductReview.objects.select_for_update().filter(pk=self.pk).first() if self.pk else None
+            super().save(*args, **kwargs)
+            move_review(Product, get_counted_state(previous), get_counted_state(self))
 
 
 class ProductImage(models.Model):
@@ -187,14 +223,20 @@ class ProductImage(models.Model):
     image = models.ImageField(upload_to='product_images/')
     alt_text = models.CharField(max_length=200, blank=True)
     sort_order = models.PositiveIntegerField(default=0)
+    thumbnails = models.JSONField(default=dict, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['sort_order']
     
     def __str__(self):
         return f"{self.product.name} - Image {self.sort_order}"
+    
+    @property
+    def thumbnail_source(self):
+        return self.image or None
 
 
 class ProductVariant(models.Model):
@@ -61,21 +61,13 @@ class ProductSerializer(serializers.ModelSerializer):
     brand_name = serializers.CharField(source='brand.name', read_only=True)
     images = ProductImageSerializer(many=True, read_only=True)
     variants = ProductVariantSerializer(many=True, read_only=True)
-    average_rating = serializers.SerializerMethodField()
-    review_count = serializers.SerializerMethodField()
+    # Read from the product's review counters
+    average_rating = serializers.FloatField(source='rating_average', read_only=True)
+    rating_histogram = serializers.ReadOnlyField()
     
     class Meta:
         model = Product
         fields = '__all__'
-    
-    def get_average_rating(self, obj):
-        reviews = obj.reviews.all()
-        if reviews:
-            return sum(review.rating for review in reviews) / len(reviews)
-        return 0
-    
-    def get_review_count(self, obj):
-        return obj.reviews.count()
 
 
 class ProductReviewSerializer(serializers.ModelSerializer):
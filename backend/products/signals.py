@@ -0,0 +1,25 @@
+"""
+Signal handlers for Products app
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ecoswitch_backend.review_counters import get_counted_state, move_review
+from ecoswitch_backend.thumbnails import schedule_thumbnails
+from .models import Product, ProductImage, ProductReview
+
+
+@receiver(post_delete, sender=ProductReview)
+def remove_review_from_counters(sender, instance, **kwargs):
+    """
+    Deletions, including cascades from users, run inside the deletion's transaction;
+    saves update the counters in ProductReview.save
+    """
+    move_review(Product, get_counted_state(instance), None)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=ProductImage)
+def render_thumbnails(sender, instance, **kwargs):
+    """Thumbnails of a new or replaced image are rendered in the background"""
+    schedule_thumbnails(instance)
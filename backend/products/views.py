@@ -1,8 +1,15 @@
 from rest_framework import viewsets, status, permissions, filters
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q, Avg, Count
+from django.conf import settings
+from django.utils.text import slugify
 from django_filters.rest_framework import DjangoFilterBackend
+from catalog.filters import CatalogSearchFilter
+from catalog.models import TrendingEntry
+from catalog.services import CatalogSearchIndex
+from ecoswitch_backend.conditional import ConditionalGetMixin
+from ecoswitch_backend.pagination import KeysetPagination
+from ecoswitch_backend.response_cache import cache_response
 from .models import (
     Category, Subcategory, Brand, Product, ProductReview, 
     ProductImage, ProductVariant, ProductRecommendation
@@ -13,7 +20,11 @@ from .serializers import (
     ProductRecommendationSerializer
 )
 
+# Everything ProductSerializer reads; review saves change the counters stored on the product
+SERIALIZED_PRODUCT_MODELS = (Product, Category, Subcategory, Brand, ProductImage, ProductVariant, ProductReview)
 
+
+@cache_response(Category)
 class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for categories (read-only)
@@ -23,6 +34,7 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.AllowAny]
 
 
+@cache_response(Subcategory, Category)
 class SubcategoryViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for subcategories (read-only)
@@ -34,6 +46,7 @@ class SubcategoryViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_fields = ['category']
 
 
+@cache_response(Brand)
 class BrandViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for brands (read-only)
@@ -43,16 +56,22 @@ class BrandViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.AllowAny]
 
 
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+class ProductViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for products (read-only)
     """
     queryset = Product.objects.filter(is_active=True)
     serializer_class = ProductSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = KeysetPagination
+    # Listings nest images and variants as well
+    conditional_fields = (
+        'updated_at', 'category__updated_at', 'subcategory__updated_at', 'brand__updated_at',
+        'images__updated_at', 'variants__updated_at',
+    )
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, CatalogSearchFilter]
     filterset_fields = ['category', 'subcategory', 'brand', 'is_eco_friendly', 'is_featured']
-    search_fields = ['name', 'description', 'brand__name', 'tags']
+    catalog_source = 'product'
     ordering_fields = ['price', 'created_at', 'sustainability_score']
     ordering = ['-created_at']
 
@@ -112,17 +131,13 @@ def product_search(request):
     min_price = request.GET.get('min_price', '')
     max_price = request.GET.get('max_price', '')
     eco_friendly = request.GET.get('eco_friendly', '')
-    sort_by = request.GET.get('sort_by', '-created_at')
+    sort_by = request.GET.get('sort_by', '')
     
     queryset = Product.objects.filter(is_active=True)
     
     if query:
-        queryset = queryset.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query) |
-            Q(brand__name__icontains=query) |
-            Q(tags__icontains=query)
-        )
+        # Ranked by relevance unless a sort is requested
+        queryset = CatalogSearchIndex().filter_queryset(queryset, 'product', query, order_by_rank=not sort_by)
     
     if category:
         queryset = queryset.filter(category__slug=category)
@@ -139,7 +154,8 @@ def product_search(request):
     if eco_friendly.lower() == 'true':
         queryset = queryset.filter(is_eco_friendly=True)
     
-    queryset = queryset.order_by(sort_by)
+    if sort_by or not query:
+        queryset = queryset.order_by(sort_by or '-created_at')
     
     serializer = ProductSerializer(queryset, many=True)
     return Response(serializer.data)
@@ -147,6 +163,7 @@ def product_search(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@cache_response(*SERIALIZED_PRODUCT_MODELS)
 def featured_products(request):
     """
     Get featured products
@@ -158,19 +175,23 @@ def featured_products(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@cache_response(*SERIALIZED_PRODUCT_MODELS, TrendingEntry)
 def trending_products(request):
     """
-    Get trending products based on reviews and orders
+    Get trending products of the whole catalog or of one category (?category=<slug>),
+    read from the lists kept by update_trending_products
     """
-    products = Product.objects.filter(is_active=True).annotate(
-        review_count=Count('reviews'),
-        avg_rating=Avg('reviews__rating')
-    ).filter(
-        review_count__gte=1,
-        avg_rating__gte=4.0
-    ).order_by('-review_count', '-avg_rating')[:10]
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), settings.TRENDING_LIST_SIZE)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
     
-    serializer = ProductSerializer(products, many=True)
+    ranked = list(TrendingEntry.objects.filter(
+        source='product', category_slug=slugify(request.query_params.get('category', ''))
+    ).order_by('rank').values_list('source_id', flat=True)[:limit])
+    products = Product.objects.filter(pk__in=ranked, is_active=True).in_bulk()
+    
+    serializer = ProductSerializer([products[pk] for pk in ranked if pk in products], many=True)
     return Response(serializer.data)
 
 